@@ -0,0 +1,140 @@
+from operator import itemgetter, methodcaller
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+NUMPY_AVAILABLE = True
+try:
+    import numpy as np
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+LATENCY_NORM_MS = 5000.0
+GOAL_MISMATCH_PENALTY = 0.2
+
+_CLAIMED = itemgetter("est_cost_usd", "est_latency_ms", "confidence")
+_MISMATCH = methodcaller("get", "_goal_mismatch", False)
+_AGENT = methodcaller("get", "_agent", "")
+_CACHED_COMPLETION = methodcaller("get", "_cached_completion", False)
+
+
+def _learned_table(estimator: Any, goal_names: List[str], agent_names: List[str]) -> "np.ndarray":
+    """(goal x agent) rows of has-data, latency samples, latency EWMA, cost samples, cost EWMA, success rate and p90."""
+    table = np.zeros((len(goal_names) * len(agent_names), 7), dtype=np.float64)
+    table[:, 2:] = np.nan
+    table[:, 3] = 0.0
+    table[:, 5] = 1.0
+    if estimator is None:
+        return table
+    for g, goal in enumerate(goal_names):
+        for a, agent in enumerate(agent_names):
+            params = estimator.learned_params(agent, goal)
+            if params is not None:
+                table[g * len(agent_names) + a] = [1.0, *(np.nan if v is None else v for v in params)]
+    return table
+
+
+def rank_batch(
+    groups: List[List[Dict[str, Any]]],
+    goals: List[str],
+    max_usd: List[Optional[float]],
+    deadline_ms: List[Optional[float]],
+    aligned_ids: List[Optional[FrozenSet[str]]],
+    estimator: Any = None,
+    top_k: Optional[int] = None,
+) -> List[List[Tuple[Dict[str, Any], float]]]:
+    """Filter and rank many intents' proposals at once with NumPy.
+
+    ``groups[i]`` holds the raw proposals for intent ``i``; the other lists give
+    its goal, budget, deadline and goal-aligned provider ids. Semantics match
+    ``filter_and_sort_proposals``: learned estimates from ``estimator`` are
+    blended in, score = confidence / (cost * (1 + latency/5000)) with the
+    goal-mismatch penalty, budget and SLA masks (SLA uses the learned p90 when
+    there is one), the capability filter when any proposal for the intent is
+    aligned, and ties broken by lower cost, lower latency, higher confidence,
+    then agent id. Returns (proposal, score) pairs per intent in rank order,
+    truncated to ``top_k`` when given; proposals are returned unmodified.
+    """
+    n_groups = len(groups)
+    sizes = np.fromiter((len(g) for g in groups), dtype=np.int64, count=n_groups)
+    total = int(sizes.sum())
+    if total == 0:
+        return [[] for _ in groups]
+    flat: List[Dict[str, Any]] = [prop for group in groups for prop in group]
+    group_idx = np.repeat(np.arange(n_groups), sizes)
+
+    # Pull columns out of the dicts once; everything after this works on arrays
+    claimed = np.array(list(map(_CLAIMED, flat)), dtype=np.float64).reshape(total, 3)
+    cost, latency, confidence = claimed.T
+    mismatch = np.fromiter(map(_MISMATCH, flat), dtype=bool, count=total)
+    agents = list(map(_AGENT, flat))
+    agent_names = list(dict.fromkeys(agents))
+    agent_codes = {name: k for k, name in enumerate(agent_names)}
+    agent_code = np.fromiter(map(agent_codes.__getitem__, agents), dtype=np.int64, count=total)
+    agent_rank = np.argsort(np.argsort(np.array(agent_names, dtype=str), kind="stable"))[agent_code]
+    goal_names = list(dict.fromkeys(goals))
+    goal_codes = {name: k for k, name in enumerate(goal_names)}
+    goal_code = np.fromiter(map(goal_codes.__getitem__, goals), dtype=np.int64, count=n_groups)
+
+    # Learned estimates, blended with the claimed numbers as LatencyEstimator.adjust does
+    table = _learned_table(estimator, goal_names, agent_names)
+    has, latency_samples, latency_obs, cost_samples, cost_obs, success, p90 = (
+        table[goal_code[group_idx] * len(agent_names) + agent_code].T
+    )
+    # Bids for cached completions keep their own numbers, as in overlay_learned_estimates
+    cached_completion = np.fromiter(map(_CACHED_COMPLETION, flat), dtype=bool, count=total)
+    has = has.astype(bool) & ~cached_completion
+    p90 = np.where(cached_completion, np.nan, p90)
+    weight = estimator.prior_weight if estimator is not None else 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        blend_latency = has & (latency_samples > 0) & ~np.isnan(latency_obs)
+        blend_cost = has & (cost_samples > 0) & ~np.isnan(cost_obs)
+        latency = np.where(
+            blend_latency,
+            np.trunc((weight * latency + latency_samples * latency_obs) / (weight + latency_samples)),
+            latency,
+        )
+        cost = np.where(blend_cost, (weight * cost + cost_samples * cost_obs) / (weight + cost_samples), cost)
+    confidence = np.where(has, confidence * success, confidence)
+    sla_latency = np.where(np.isnan(p90), latency, p90)
+
+    # Scoring with the goal-mismatch penalty
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = confidence / (cost * (1.0 + latency / LATENCY_NORM_MS))
+    score = np.where(cost > 0, score, 0.0)
+    score = np.where(mismatch, score * GOAL_MISMATCH_PENALTY, score)
+
+    # Budget and SLA masks; missing limits never filter
+    budget = np.array([np.inf if v is None else v for v in max_usd], dtype=np.float64)[group_idx]
+    deadline = np.array([np.inf if v is None else v for v in deadline_ms], dtype=np.float64)[group_idx]
+    keep = (cost <= budget) & (sla_latency <= deadline)
+
+    # Capability filter only for intents where at least one proposal is aligned,
+    # looked up through a (distinct goal set x agent) table
+    set_index: Dict[int, int] = {}
+    tables: List[List[bool]] = []
+    group_set = np.empty(n_groups, dtype=np.int64)
+    for g, ids in enumerate(aligned_ids):
+        if id(ids) not in set_index:
+            set_index[id(ids)] = len(tables)
+            tables.append([ids is None or name in ids for name in agent_names])
+        group_set[g] = set_index[id(ids)]
+    aligned = np.array(tables, dtype=bool)[group_set[group_idx], agent_code]
+    mapped = np.fromiter((ids is not None for ids in aligned_ids), dtype=bool, count=n_groups)
+    any_match = np.bincount(group_idx, weights=aligned & mapped[group_idx], minlength=n_groups) > 0
+    keep &= ~any_match[group_idx] | aligned
+
+    # Lexicographic sort: intent, -score, cost, latency, -confidence, agent id
+    kept = np.flatnonzero(keep)
+    order = kept[np.lexsort((
+        agent_rank[kept], -confidence[kept], latency[kept], cost[kept], -score[kept], group_idx[kept]
+    ))]
+
+    if top_k is not None:
+        sorted_groups = group_idx[order]
+        starts = np.searchsorted(sorted_groups, np.arange(n_groups))
+        position = np.arange(len(order)) - starts[sorted_groups]
+        order = order[position < top_k]
+
+    ranked: List[List[Tuple[Dict[str, Any], float]]] = [[] for _ in groups]
+    for i, g, s in zip(order.tolist(), group_idx[order].tolist(), score[order].tolist()):
+        ranked[g].append((flat[i], s))
+    return ranked
@@ -0,0 +1,100 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into calls of a batch tool.
+
+    Items submitted under the same key are held for at most ``max_wait_ms`` after
+    the first one (or until ``max_batch`` are waiting) and then sent together
+    through ``flush(key, items)``, which must return one result per item, in
+    order. A failed flush fails every item of that batch.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        self._flush = flush
+        self.max_batch = max_batch or int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+        self.max_wait_ms = max_wait_ms if max_wait_ms is not None else float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._flushing: set = set()
+        self.stats = {"items": 0, "batches": 0, "errors": 0, "largest_batch": 0}
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+        self.stats["items"] += 1
+        if len(pending) >= self.max_batch:
+            self._start_flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.max_wait_ms / 1000.0, self._start_flush, key
+            )
+        return await future
+
+    async def map(self, key: Hashable, items: List[Any]) -> List[Any]:
+        """Send a known list of items in ``max_batch``-sized chunks, concurrently."""
+        chunks = [items[i:i + self.max_batch] for i in range(0, len(items), self.max_batch)]
+        results = await asyncio.gather(*(self._run(key, chunk) for chunk in chunks))
+        return [r for chunk in results for r in chunk]
+
+    def _start_flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if batch:
+            task = asyncio.ensure_future(self._deliver(key, batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _run(self, key: Hashable, items: List[Any]) -> List[Any]:
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(items))
+        try:
+            results = await self._flush(key, items)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        if len(results) != len(items):
+            self.stats["errors"] += 1
+            raise ValueError(f"Batch of {len(items)} items returned {len(results)} results")
+        return results
+
+    async def _deliver(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._run(key, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def close(self) -> None:
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for batch in self._pending.values():
+            for _, future in batch:
+                future.cancel()
+        self._pending.clear()
+        for task in self._flushing:
+            task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait_ms,
+        }
@@ -0,0 +1,93 @@
+"""Benchmark /jobs ranking: per-dict filter_and_sort_proposals vs NumPy rank_batch.
+
+Usage (from hub/): python bench_scoring.py [--intents 5000] [--providers 8] [--repeat 5] [--observed]
+
+With --observed every provider/goal pair has recorded executions, so both paths
+overlay learned estimates and rescore (the per-dict path builds a Proposal per pair).
+"""
+import argparse
+import random
+import time
+
+import main
+from main import GOAL_CAPABILITIES, Intent, Proposal, calculate_score
+
+
+def make_batch(n_intents: int, n_providers: int, seed: int):
+    rng = random.Random(seed)
+    goals = list(GOAL_CAPABILITIES)
+    agent_ids = sorted({pid for ids in GOAL_CAPABILITIES.values() for pid in ids})[:n_providers]
+    intents, groups = [], []
+    for _ in range(n_intents):
+        goal = rng.choice(goals)
+        intents.append(Intent(
+            goal=goal,
+            inputs={},
+            budget={"max_usd": rng.choice([0.002, 0.005, 0.05])} if rng.random() < 0.7 else None,
+            sla={"deadline_ms": rng.choice([500, 1500, 5000])} if rng.random() < 0.7 else None,
+        ))
+        group = []
+        for pid in agent_ids:
+            cost = rng.choice([0.001, 0.002, 0.003, 0.01])
+            latency = rng.choice([200, 400, 800, 1600])
+            confidence = rng.choice([0.6, 0.75, 0.85, 0.9])
+            mismatch = not main.REGISTRY.is_aligned(goal, pid)
+            score = calculate_score(Proposal(est_cost_usd=cost, est_latency_ms=latency, confidence=confidence, plan=[]))
+            group.append({
+                "est_cost_usd": cost,
+                "est_latency_ms": latency,
+                "confidence": confidence,
+                "plan": [],
+                "needs": {},
+                "_agent": pid,
+                "_score": score * 0.2 if mismatch else score,
+                "_goal_mismatch": mismatch,
+            })
+        groups.append(group)
+    return intents, groups
+
+
+def best_of(repeat: int, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--intents", type=int, default=5000)
+    parser.add_argument("--providers", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--observed", action="store_true", help="seed learned estimates for every pair")
+    args = parser.parse_args()
+
+    intents, groups = make_batch(args.intents, args.providers, args.seed)
+    if args.observed:
+        for goal in GOAL_CAPABILITIES:
+            for pid in {p["_agent"] for p in groups[0]}:
+                for latency in (300, 450, 600, 900, 1200):
+                    main.ESTIMATOR.observe_execution(pid, goal, latency, True, 0.002)
+    per_dict_s, expected = best_of(
+        args.repeat, lambda: main.rank_proposal_batches(intents, groups, vectorized=False)
+    )
+    batch_s, actual = best_of(
+        args.repeat, lambda: main.rank_proposal_batches(intents, groups, vectorized=True)
+    )
+
+    same = expected == actual
+    pairs = sum(len(g) for g in groups)
+    print(f"{args.intents} intents x {args.providers} providers ({pairs} proposals, "
+          f"{'observed' if args.observed else 'no'} estimates)")
+    print(f"per-dict : {per_dict_s * 1000:8.1f} ms")
+    print(f"numpy    : {batch_s * 1000:8.1f} ms  ({per_dict_s / batch_s:.1f}x)")
+    print(f"rankings identical: {same}")
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Bid parameters advertised for known MCP agents; overridable per provider via "bid" in the MCP config
+DEFAULT_BIDS: Dict[str, Dict[str, float]] = {
+    "poster-ocr-regex": {"est_cost_usd": 0.01, "est_latency_ms": 500, "confidence": 0.75},
+    "poster-ocr-dateparser": {"est_cost_usd": 0.02, "est_latency_ms": 800, "confidence": 0.85},
+    "event-normalizer": {"est_cost_usd": 0.005, "est_latency_ms": 100, "confidence": 0.9},
+    "timezone-resolver": {"est_cost_usd": 0.005, "est_latency_ms": 120, "confidence": 0.8},
+    "ics-builder": {"est_cost_usd": 0.01, "est_latency_ms": 200, "confidence": 0.9},
+    "ocr-generic": {"est_cost_usd": 0.008, "est_latency_ms": 500, "confidence": 0.7},
+    "event-validator": {"est_cost_usd": 0.004, "est_latency_ms": 80, "confidence": 0.95},
+    "chatgpt": {"est_cost_usd": 0.02, "est_latency_ms": 700, "confidence": 0.9},
+    "gemini": {"est_cost_usd": 0.015, "est_latency_ms": 600, "confidence": 0.9},
+}
+FALLBACK_BID: Dict[str, float] = {"est_cost_usd": 0.01, "est_latency_ms": 250, "confidence": 0.8}
+
+# Degraded bids used while a provider's tools are unknown (not yet discovered or unreachable)
+UNAVAILABLE_BIDS: Dict[str, Dict[str, float]] = {
+    "chatgpt": {"est_cost_usd": 0.02, "est_latency_ms": 700, "confidence": 0.7},
+    "gemini": {"est_cost_usd": 0.015, "est_latency_ms": 600, "confidence": 0.7},
+}
+UNAVAILABLE_FALLBACK_BID: Dict[str, float] = {"est_cost_usd": 0.02, "est_latency_ms": 800, "confidence": 0.6}
+
+
+@dataclass
+class ProviderCapabilities:
+    """Discovered tool list and bid parameters for one MCP provider."""
+
+    provider_id: str
+    bid: Dict[str, float]
+    tools: List[str] = field(default_factory=list)
+    discovered_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        return self.discovered_at is not None and bool(self.tools)
+
+
+class CapabilityRegistry:
+    """In-memory capability cache so bidding for MCP providers needs no I/O.
+
+    Tool lists are discovered through ``list_tools`` once at startup, refreshed in
+    the background every ``ttl_seconds`` and whenever ``invalidate()`` is called
+    (for example after a provider subprocess restarts).
+    """
+
+    def __init__(
+        self,
+        list_tools: Callable[[str], Awaitable[List[str]]],
+        ttl_seconds: Optional[float] = None,
+    ):
+        self._list_tools = list_tools
+        self.ttl_seconds = ttl_seconds or float(os.getenv("CAPABILITY_TTL_SECONDS", "600"))
+        self._entries: Dict[str, ProviderCapabilities] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def register(self, provider_id: str, bid: Optional[Dict[str, float]] = None) -> None:
+        params = {**DEFAULT_BIDS.get(provider_id, FALLBACK_BID), **(bid or {})}
+        self._entries[provider_id] = ProviderCapabilities(provider_id=provider_id, bid=params)
+
+    def get(self, provider_id: str) -> Optional[ProviderCapabilities]:
+        return self._entries.get(provider_id)
+
+    def unavailable_bid(self, provider_id: str) -> Dict[str, float]:
+        return UNAVAILABLE_BIDS.get(provider_id, UNAVAILABLE_FALLBACK_BID)
+
+    async def discover(self, provider_id: str) -> Optional[ProviderCapabilities]:
+        entry = self._entries.get(provider_id)
+        if entry is None:
+            return None
+        try:
+            entry.tools = list(await self._list_tools(provider_id))
+            entry.error = None
+        except Exception as exc:
+            entry.tools = []
+            entry.error = str(exc)
+        entry.discovered_at = time.time()
+        return entry
+
+    def invalidate(self, provider_id: str) -> None:
+        """Schedule a background re-discovery, coalescing with one already running."""
+
+        if provider_id not in self._entries:
+            return
+        running = self._refreshing.get(provider_id)
+        if running is not None and not running.done():
+            return
+        self._refreshing[provider_id] = asyncio.create_task(self.discover(provider_id))
+
+    async def refresh_all(self) -> None:
+        await asyncio.gather(*(self.discover(pid) for pid in list(self._entries)))
+
+    async def start(self) -> None:
+        await self.refresh_all()
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds)
+            now = time.time()
+            for provider_id, entry in list(self._entries.items()):
+                if entry.discovered_at is None or now - entry.discovered_at >= self.ttl_seconds:
+                    self.invalidate(provider_id)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {
+            provider_id: {
+                "tools": entry.tools,
+                "bid": entry.bid,
+                "discovered_at": entry.discovered_at,
+                "error": entry.error,
+            }
+            for provider_id, entry in self._entries.items()
+        }
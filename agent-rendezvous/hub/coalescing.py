@@ -0,0 +1,65 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def intent_key(intent: Any) -> str:
+    """Canonical hash of an intent's goal, inputs, budget, SLA and constraints.
+
+    Key order and whitespace do not matter, so two requests for the same work
+    map to the same key however the client serialized them.
+    """
+
+    canonical = json.dumps(
+        {
+            "goal": intent.goal,
+            "inputs": intent.inputs,
+            "budget": intent.budget,
+            "sla": intent.sla,
+            "constraints": intent.constraints,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller starts ``fn`` as its own task; callers arriving before it
+    finishes await the same task. Results (and exceptions) are shared as-is, so
+    callers must not mutate them. A caller being cancelled does not cancel the
+    shared call for the others. Nothing is kept once the call completes.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True if another caller started the call."""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["calls"] += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller was cancelled
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,318 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class P2Quantile:
+    """Streaming quantile estimate in O(1) memory (Jain & Chlamtac's P² algorithm)."""
+
+    def __init__(self, p: float):
+        self.p = p
+        self.heights: List[float] = []
+        self.positions = [0.0, 1.0, 2.0, 3.0, 4.0]
+        self.desired = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self.increments = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1.0 if d > 0 else -1.0
+                candidate = self._parabolic(i, step)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    j = i + int(step)
+                    q[i] = q[i] + step * (q[j] - q[i]) / (n[j] - n[i])
+                n[i] += step
+
+    def _parabolic(self, i: int, d: float) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(round(self.p * (len(q) - 1))))]
+        return q[2]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": self.p, "heights": self.heights, "positions": self.positions, "desired": self.desired}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "P2Quantile":
+        est = cls(data["p"])
+        est.heights = list(data["heights"])
+        est.positions = list(data["positions"])
+        est.desired = list(data["desired"])
+        return est
+
+
+class StreamStats:
+    """Count, EWMA and streaming quantiles of one observed quantity."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.count = 0
+        self.ewma: Optional[float] = None
+        self.quantiles = {q: P2Quantile(q) for q in QUANTILES}
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        self.ewma = x if self.ewma is None else self.alpha * x + (1 - self.alpha) * self.ewma
+        for est in self.quantiles.values():
+            est.add(x)
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles[q].value()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "ewma": self.ewma,
+            **{f"p{int(q * 100)}": self.quantile(q) for q in QUANTILES},
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "ewma": self.ewma,
+            "quantiles": [est.to_dict() for est in self.quantiles.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], alpha: float) -> "StreamStats":
+        stats = cls(alpha)
+        stats.count = data["count"]
+        stats.ewma = data["ewma"]
+        for raw in data["quantiles"]:
+            est = P2Quantile.from_dict(raw)
+            stats.quantiles[est.p] = est
+        return stats
+
+
+class ProviderEstimate:
+    """Observed behaviour of one provider for one goal."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.bid_rtt = StreamStats(alpha)
+        self.exec_latency = StreamStats(alpha)
+        self.cost_usd: Optional[float] = None
+        self.cost_samples = 0
+        self.success_rate = 1.0
+        self.attempts = 0
+        # Latency lower bounds from attempts cancelled while still running (e.g. losing hedges)
+        self.censored = 0
+        self.updated_at = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "bid_rtt_ms": self.bid_rtt.summary(),
+            "exec_latency_ms": self.exec_latency.summary(),
+            "cost_usd": self.cost_usd,
+            "cost_samples": self.cost_samples,
+            "success_rate": self.success_rate,
+            "attempts": self.attempts,
+            "censored": self.censored,
+            "updated_at": self.updated_at,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "bid_rtt": self.bid_rtt.to_dict(),
+            "exec_latency": self.exec_latency.to_dict(),
+            "cost_usd": self.cost_usd,
+            "cost_samples": self.cost_samples,
+            "success_rate": self.success_rate,
+            "attempts": self.attempts,
+            "censored": self.censored,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], alpha: float) -> "ProviderEstimate":
+        est = cls(alpha)
+        est.bid_rtt = StreamStats.from_dict(data["bid_rtt"], alpha)
+        est.exec_latency = StreamStats.from_dict(data["exec_latency"], alpha)
+        est.cost_usd = data.get("cost_usd")
+        # State saved before cost was counted separately: assume every success reported a cost
+        est.cost_samples = data.get("cost_samples", est.exec_latency.count if est.cost_usd is not None else 0)
+        est.success_rate = data.get("success_rate", 1.0)
+        est.attempts = data.get("attempts", 0)
+        est.censored = data.get("censored", 0)
+        est.updated_at = data.get("updated_at", time.time())
+        return est
+
+
+class LatencyEstimator:
+    """Online per-provider, per-goal model of latency, cost and success rate.
+
+    Claimed proposal numbers act as a prior worth ``prior_weight`` observations,
+    so estimates move toward observed behaviour as executions accumulate.
+    State can be persisted to a JSON file (``HUB_ESTIMATOR_PATH``).
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        prior_weight: float = 5.0,
+        min_quantile_samples: int = 5,
+        path: Optional[str] = None,
+    ):
+        self.alpha = alpha
+        self.prior_weight = prior_weight
+        self.min_quantile_samples = min_quantile_samples
+        self.path = path if path is not None else os.getenv("HUB_ESTIMATOR_PATH")
+        self._estimates: Dict[Tuple[str, str], ProviderEstimate] = {}
+
+    def _entry(self, provider_id: str, goal: str) -> ProviderEstimate:
+        key = (provider_id, goal)
+        entry = self._estimates.get(key)
+        if entry is None:
+            entry = self._estimates[key] = ProviderEstimate(self.alpha)
+        return entry
+
+    def get(self, provider_id: str, goal: str) -> Optional[ProviderEstimate]:
+        return self._estimates.get((provider_id, goal))
+
+    def has_observations(self) -> bool:
+        """Whether any execution has been recorded, i.e. ``adjust`` can change a proposal."""
+        return any(entry.attempts or entry.censored for entry in self._estimates.values())
+
+    def observe_bid(self, provider_id: str, goal: str, rtt_ms: float) -> None:
+        entry = self._entry(provider_id, goal)
+        entry.bid_rtt.add(rtt_ms)
+        entry.updated_at = time.time()
+
+    def observe_execution(
+        self,
+        provider_id: str,
+        goal: str,
+        latency_ms: float,
+        success: bool,
+        cost_usd: Optional[float] = None,
+    ) -> None:
+        entry = self._entry(provider_id, goal)
+        entry.attempts += 1
+        entry.success_rate = self.alpha * (1.0 if success else 0.0) + (1 - self.alpha) * entry.success_rate
+        if success:
+            entry.exec_latency.add(latency_ms)
+            if cost_usd is not None:
+                entry.cost_samples += 1
+                entry.cost_usd = cost_usd if entry.cost_usd is None else (
+                    self.alpha * cost_usd + (1 - self.alpha) * entry.cost_usd
+                )
+        entry.updated_at = time.time()
+
+    def observe_cancelled(self, provider_id: str, goal: str, elapsed_ms: float, claimed_latency_ms: float) -> None:
+        """Record an attempt cancelled after ``elapsed_ms`` without answering, e.g. a losing hedge.
+
+        Its latency is censored: it would have taken at least ``elapsed_ms``. When that
+        bound exceeds the current estimate (the latency EWMA, else the claimed latency)
+        it is added as a latency sample, so providers that keep losing hedges are not
+        learned from their fast wins alone. Smaller bounds carry no information and
+        are dropped. Success rate and attempts are left alone.
+        """
+        entry = self._entry(provider_id, goal)
+        reference = entry.exec_latency.ewma if entry.exec_latency.ewma is not None else claimed_latency_ms
+        if elapsed_ms <= reference:
+            return
+        entry.exec_latency.add(elapsed_ms)
+        entry.censored += 1
+        entry.updated_at = time.time()
+
+    def _blend(self, claimed: float, observed: Optional[float], samples: int) -> float:
+        if observed is None or samples <= 0:
+            return claimed
+        return (self.prior_weight * claimed + samples * observed) / (self.prior_weight + samples)
+
+    def learned_params(
+        self, provider_id: str, goal: str
+    ) -> Optional[Tuple[int, Optional[float], int, Optional[float], float, Optional[float]]]:
+        """Return (latency samples, latency EWMA, cost samples, cost EWMA, success rate, p90) behind ``adjust``.
+
+        None means nothing has been executed yet; p90 is None until there are
+        ``min_quantile_samples`` latency observations.
+        """
+        entry = self.get(provider_id, goal)
+        if entry is None or (entry.attempts == 0 and entry.censored == 0):
+            return None
+        latency = entry.exec_latency
+        p90 = latency.quantile(0.9) if latency.count >= self.min_quantile_samples else None
+        return latency.count, latency.ewma, entry.cost_samples, entry.cost_usd, entry.success_rate, p90
+
+    def adjust(self, proposal_data: Dict[str, Any], goal: str) -> Dict[str, Any]:
+        """Return learned cost, latency, confidence and p90 latency for a proposal.
+
+        Keys absent from the result mean there is nothing observed to apply.
+        """
+        params = self.learned_params(proposal_data.get("_agent", ""), goal)
+        if params is None:
+            return {}
+        latency_samples, latency_ewma, cost_samples, cost_usd, success_rate, p90 = params
+        learned: Dict[str, Any] = {
+            "est_latency_ms": int(self._blend(proposal_data["est_latency_ms"], latency_ewma, latency_samples)),
+            "est_cost_usd": self._blend(proposal_data["est_cost_usd"], cost_usd, cost_samples),
+            "confidence": proposal_data["confidence"] * success_rate,
+        }
+        if p90 is not None:
+            learned["p90_latency_ms"] = p90
+        return learned
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        for (provider_id, goal), entry in self._estimates.items():
+            result.setdefault(provider_id, {})[goal] = entry.summary()
+        return result
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        data = [
+            {"provider": provider_id, "goal": goal, **entry.to_dict()}
+            for (provider_id, goal), entry in self._estimates.items()
+        ]
+        target = Path(self.path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(target)
+
+    def load(self) -> None:
+        if not self.path or not Path(self.path).exists():
+            return
+        try:
+            data = json.loads(Path(self.path).read_text())
+            for raw in data:
+                key = (raw["provider"], raw["goal"])
+                self._estimates[key] = ProviderEstimate.from_dict(raw, self.alpha)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable estimator state {self.path}: {e}")
@@ -0,0 +1,84 @@
+import asyncio
+import importlib.util
+import os
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees its per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Caps concurrent requests per host on top of httpx's pool-wide limits."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, per_host: int):
+        self._transport = transport
+        self._per_host = per_host
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = f"{request.url.host}:{request.url.port}"
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = asyncio.Semaphore(self._per_host)
+        await slot.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        response.stream = _ReleasingStream(response.stream, slot.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client(
+    max_connections: Optional[int] = None,
+    max_keepalive: Optional[int] = None,
+    per_host: Optional[int] = None,
+    http2: Optional[bool] = None,
+) -> httpx.AsyncClient:
+    """Build a long-lived AsyncClient with keep-alive limits and a per-host cap.
+
+    Defaults come from ``HUB_HTTP_*`` environment variables. HTTP/2 is only
+    enabled when requested and the ``h2`` package is installed. Timeouts are
+    left to each call so bid and execute budgets stay independent.
+    """
+
+    if http2 is None:
+        http2 = os.getenv("HUB_HTTP2", "0") == "1"
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("HUB_HTTP2 requested but 'h2' is not installed; using HTTP/1.1")
+        http2 = False
+    limits = httpx.Limits(
+        max_connections=max_connections or int(os.getenv("HUB_HTTP_MAX_CONNECTIONS", "200")),
+        max_keepalive_connections=max_keepalive or int(os.getenv("HUB_HTTP_MAX_KEEPALIVE", "50")),
+        keepalive_expiry=float(os.getenv("HUB_HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    transport = HostLimitedTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+        per_host or int(os.getenv("HUB_HTTP_MAX_PER_HOST", "20")),
+    )
+    return httpx.AsyncClient(transport=transport)
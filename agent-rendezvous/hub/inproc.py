@@ -0,0 +1,262 @@
+import asyncio
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolResult, TextContent
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class InprocError(Exception):
+    """Raised when an in-process provider cannot be loaded or has no such tool."""
+
+
+@dataclass
+class _InprocProvider:
+    script: Path
+    env: Dict[str, str]
+    server: Optional[FastMCP] = None
+    error: Optional[str] = None
+    loading: Optional[asyncio.Task] = None
+    load_ms: Optional[int] = None
+    calls: int = 0
+    errors: int = 0
+    tools: List[str] = field(default_factory=list)
+
+
+def resolve_script(args: List[str]) -> Optional[Path]:
+    """The provider script from an MCP server's ``args``, relative to the cwd or the project root."""
+    for arg in args:
+        if not arg.endswith(".py"):
+            continue
+        path = Path(arg).expanduser()
+        if not path.is_absolute() and not path.exists():
+            path = PROJECT_ROOT / path
+        return path
+    return None
+
+
+# One provider import at a time, so their environments never overlap
+_IMPORT_LOCK = threading.Lock()
+
+
+@contextmanager
+def provider_environ(env: Dict[str, str]) -> Iterator[None]:
+    """Apply a provider's config ``env`` for the block, then restore the previous values.
+
+    Config values win over the hub's, as they do for a stdio subprocess.
+    """
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def import_provider(module_name: str, script: Path, env: Dict[str, str]) -> FastMCP:
+    """Import a provider script by file path and return its FastMCP server.
+
+    ``env`` is in effect only while the module executes, and ``sys.path`` entries
+    the script adds are removed afterwards, so neither leaks into the hub or
+    other providers. Settings must therefore be read at import time.
+    """
+    spec = importlib.util.spec_from_file_location(module_name, script)
+    if spec is None or spec.loader is None:
+        raise InprocError(f"Cannot import {script}")
+    module = importlib.util.module_from_spec(spec)
+    with _IMPORT_LOCK, provider_environ(env):
+        sys_path = list(sys.path)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+        finally:
+            sys.path[:] = sys_path
+    server = next((v for v in vars(module).values() if isinstance(v, FastMCP)), None)
+    if server is None:
+        raise InprocError(f"{script} does not define a FastMCP server")
+    return server
+
+
+def run_tool_sync(tool: Any, arguments: Dict[str, Any]) -> Any:
+    """Validate arguments, call a synchronous tool and convert its result, as FastMCP does.
+
+    Uses FastMCP's tool manager, which is not public API; ``direct_calls_unsupported``
+    checks it still works before any provider is registered.
+    """
+    meta = tool.fn_metadata
+    try:
+        parsed = meta.arg_model.model_validate(meta.pre_parse_json(arguments)).model_dump_one_level()
+        if tool.context_kwarg is not None:
+            parsed[tool.context_kwarg] = None
+        return meta.convert_result(tool.fn(**parsed))
+    except Exception as e:
+        raise InprocError(f"Error executing tool {tool.name}: {e}") from e
+
+
+@lru_cache(maxsize=1)
+def direct_calls_unsupported() -> Optional[str]:
+    """Why this FastMCP cannot run synchronous tools off the event loop, or None if it can.
+
+    Public ``FastMCP.call_tool`` runs a synchronous tool on the calling event loop,
+    so the hub reaches into the tool manager instead. That is tested against the mcp
+    releases pinned in requirements.txt; this probe runs a tool through the same path
+    so a changed release makes inproc providers fall back to stdio rather than fail.
+    """
+
+    def probe(count: int, label: str = "x") -> str:
+        return label * count
+
+    try:
+        server = FastMCP("inproc-probe")
+        server.add_tool(probe)
+        tool = server._tool_manager.get_tool("probe")
+        if tool is None or tool.is_async:
+            return "tool manager did not register the probe tool"
+        result = to_call_result(run_tool_sync(tool, {"count": "2"}))
+        if result.isError or [c.text for c in result.content if isinstance(c, TextContent)] != ["xx"]:
+            return f"unexpected probe result: {result}"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def to_call_result(converted: Any) -> CallToolResult:
+    if isinstance(converted, CallToolResult):
+        # Tools may build their own result, e.g. to send text chunks with structured content
+        return converted
+    if isinstance(converted, tuple):
+        content, structured = converted
+        return CallToolResult(content=list(content), structuredContent=structured)
+    return CallToolResult(content=list(converted))
+
+
+def error_result(e: Exception) -> CallToolResult:
+    # Same error result a FastMCP server sends for a failing tool
+    return CallToolResult(content=[TextContent(type="text", text=str(e))], isError=True)
+
+
+class InprocProviders:
+    """FastMCP providers imported into the hub process and called directly.
+
+    Each provider script is imported once (its ``mcp.run()`` stays behind the
+    ``__main__`` guard) and its tools are invoked through FastMCP's own argument
+    validation and result conversion, so results have the same shape as over
+    stdio: a ``CallToolResult`` whose failures carry ``isError``. Async tools go
+    through the public ``FastMCP.call_tool``; synchronous tools run on a shared
+    thread pool so blocking code does not stall the event loop. Config ``env``
+    values apply only while the script is imported (see ``import_provider``).
+    If the installed FastMCP fails ``direct_calls_unsupported``,
+    ``register`` declines every provider and they are served over stdio.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("INPROC_MAX_WORKERS", str(min(32, (os.cpu_count() or 1) + 4))))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inproc")
+        self._providers: Dict[str, _InprocProvider] = {}
+
+    def register(self, provider_id: str, args: List[str], env: Optional[Dict[str, str]] = None) -> bool:
+        """Register a provider script; returns False if ``args`` name no Python script
+        or this FastMCP cannot be called directly."""
+
+        script = resolve_script(args)
+        if script is None:
+            return False
+        unsupported = direct_calls_unsupported()
+        if unsupported is not None:
+            print(f"Serving {provider_id} over stdio: in-process calls unsupported by this mcp ({unsupported})")
+            return False
+        self._providers[provider_id] = _InprocProvider(script=script, env=dict(env or {}))
+        return True
+
+    def __contains__(self, provider_id: str) -> bool:
+        return provider_id in self._providers
+
+    def ids(self) -> List[str]:
+        return list(self._providers)
+
+    async def load(self, provider_id: str) -> bool:
+        """Import the provider once (concurrent callers share the import); False if it failed."""
+
+        entry = self._providers.get(provider_id)
+        if entry is None:
+            return False
+        if entry.loading is None:
+            entry.loading = asyncio.ensure_future(self._load(provider_id, entry))
+        await asyncio.shield(entry.loading)
+        return entry.server is not None
+
+    async def _load(self, provider_id: str, entry: _InprocProvider) -> None:
+        t0 = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            module_name = f"inproc_{provider_id.replace('-', '_')}"
+            entry.server = await loop.run_in_executor(
+                self._executor, import_provider, module_name, entry.script, entry.env
+            )
+            entry.tools = [tool.name for tool in await entry.server.list_tools()]
+        except Exception as e:
+            entry.server = None
+            entry.error = f"{type(e).__name__}: {e}"
+            print(f"Could not load {provider_id} in-process: {entry.error}")
+        entry.load_ms = int((time.perf_counter() - t0) * 1000)
+
+    async def list_tools(self, provider_id: str) -> List[str]:
+        if not await self.load(provider_id):
+            raise InprocError(f"Provider '{provider_id}' is not loaded: {self._providers[provider_id].error}")
+        return list(self._providers[provider_id].tools)
+
+    async def call_tool(self, provider_id: str, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Call a tool, returning what the provider would have returned over stdio."""
+
+        if not await self.load(provider_id):
+            raise InprocError(f"Provider '{provider_id}' is not loaded: {self._providers[provider_id].error}")
+        entry = self._providers[provider_id]
+        tool = entry.server._tool_manager.get_tool(name)
+        entry.calls += 1
+        try:
+            if tool is None:
+                raise InprocError(f"Unknown tool: {name}")
+            if tool.is_async:
+                converted = await entry.server.call_tool(name, arguments)
+            else:
+                loop = asyncio.get_running_loop()
+                converted = await loop.run_in_executor(self._executor, run_tool_sync, tool, arguments)
+        except Exception as e:
+            entry.errors += 1
+            return error_result(e)
+        return to_call_result(converted)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            provider_id: {
+                "script": str(entry.script),
+                "loaded": entry.server is not None,
+                "load_ms": entry.load_ms,
+                "error": entry.error,
+                "tools": entry.tools,
+                "calls": entry.calls,
+                "errors": entry.errors,
+            }
+            for provider_id, entry in self._providers.items()
+        }
@@ -5,24 +5,42 @@ from pathlib import Path
 # Add shared directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "shared"))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple, Union
 import time
 import asyncio
 import json
 MCP_AVAILABLE = True
 try:
-    from mcp import ClientSession, StdioServerParameters
-    from mcp.client.stdio import stdio_client
+    from mcp import StdioServerParameters
+    from mcp.types import CallToolResult, TextContent
+    from mcp_pool import McpSessionPool
+    from inproc import InprocProviders
+    from process_providers import ProcessProviders
 except Exception:
     MCP_AVAILABLE = False
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from models import Intent, Proposal, Task, Result
+from cache import TTLCache
 from mcp_config import load_mcp_servers
-from spoonos_client import SpoonOSClient
+from spoonos_client import SandboxPool, SpoonOSClient
+from capabilities import CapabilityRegistry
+from http_pool import create_http_client
+from estimator import LatencyEstimator
+from registry import ProviderRegistry
+from batch_scoring import NUMPY_AVAILABLE, rank_batch
+from coalescing import SingleFlight, intent_key
+from result_cache import ResultCache
+from completion_cache import DEFAULT_SYSTEM_PROMPT, LLM_SETTINGS, CompletionCache, completion_key, completion_settings
+from pipeline import EXTRACT_EVENT_PIPELINE, Stage, finalize_event
+from batching import MicroBatcher
+import metrics
+import tracing
 
 app = FastAPI(title="Agent Rendezvous Hub")
 
@@ -34,11 +52,84 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
-# Dynamic providers list (initially loaded from config)
-PROVIDERS = []
 SPOON = SpoonOSClient()
-LAST_TRACE: Dict[str, Any] = {}
+SPOON_POOL = SandboxPool(SPOON)
+HTTP: Optional[httpx.AsyncClient] = None
+ESTIMATOR = LatencyEstimator()
+ESTIMATOR_SAVE_INTERVAL_SECONDS = 60.0
+MCP_POOL = McpSessionPool() if MCP_AVAILABLE else None
+# Providers configured with "transport": "inproc" (imported into this process) or
+# "process" (run in a pool of pre-warmed worker processes)
+INPROC = InprocProviders() if MCP_AVAILABLE else None
+PROCESS_PROVIDERS = ProcessProviders() if MCP_AVAILABLE else None
+
+
+async def local_backend(provider_id: str) -> Optional[Any]:
+    """The inproc or process backend serving a provider, or None for stdio.
+
+    A provider whose script cannot be imported (or whose workers cannot start)
+    falls back to a stdio session pool.
+    """
+    for backend in (INPROC, PROCESS_PROVIDERS):
+        if backend is None or provider_id not in backend:
+            continue
+        if await backend.load(provider_id):
+            return backend
+        if provider_id not in MCP_POOL:
+            provider = REGISTRY.get(provider_id)
+            MCP_POOL.register(
+                provider_id,
+                StdioServerParameters(command=provider["command"], args=provider["args"], env=provider["env"]),
+                size=provider.get("pool_size"),
+                session_concurrency=provider.get("session_concurrency"),
+            )
+        return None
+    return None
+
+
+async def list_mcp_tools(provider_id: str) -> List[str]:
+    """List tool names of an MCP provider in-process, on a worker process or through a pooled session."""
+    if MCP_POOL is None:
+        return []
+    backend = await local_backend(provider_id)
+    with metrics.track(provider_id, "list_tools"):
+        if backend is not None:
+            return await backend.list_tools(provider_id)
+        async with MCP_POOL.session(provider_id) as session:
+            tools = await session.list_tools()
+            return [t.name for t in tools.tools]
+
+
+async def call_mcp_tool(provider_id: str, tool_name: str, args: Dict[str, Any]) -> Any:
+    """Call an MCP tool in-process, on a worker process or through a pooled session.
+
+    Every transport returns a CallToolResult.
+    """
+    backend = await local_backend(provider_id)
+    with metrics.track(provider_id, "call_tool") as phase:
+        if backend is not None:
+            result = await backend.call_tool(provider_id, tool_name, args)
+        else:
+            async with MCP_POOL.session(provider_id) as session:
+                result = await session.call_tool(tool_name, args)
+        if getattr(result, "isError", False):
+            phase.outcome = "error"
+        return result
+
+
+def http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for HTTP providers; timeouts are set per call."""
+    global HTTP
+    if HTTP is None or HTTP.is_closed:
+        HTTP = create_http_client()
+    return HTTP
+
+
+CAPABILITIES = CapabilityRegistry(list_mcp_tools)
+if MCP_POOL is not None:
+    MCP_POOL.on_restart = CAPABILITIES.invalidate
 
 # Goal-to-agent capability mapping to ensure relevant proposals
 GOAL_CAPABILITIES: Dict[str, List[str]] = {
@@ -58,19 +149,24 @@ GOAL_CAPABILITIES: Dict[str, List[str]] = {
     "parse_invoice": ["ocr-generic", "chatgpt", "gemini"],
 }
 
-def provider_is_eligible(provider: Dict[str, Any], goal: str) -> bool:
-    if goal not in GOAL_CAPABILITIES:
-        return True
-    pid = provider.get("id") or provider.get("name")
-    return pid in GOAL_CAPABILITIES[goal]
+# Dynamic provider registry (initially loaded from config), indexed by id, URL and goal
+REGISTRY = ProviderRegistry(GOAL_CAPABILITIES)
 
 def select_providers_for_intent(intent: Intent) -> List[Dict[str, Any]]:
-    return [p for p in PROVIDERS if provider_is_eligible(p, intent.goal)] or PROVIDERS
+    with tracing.span("select_providers"):
+        eligible = REGISTRY.eligible(intent.goal)
+        tracing.annotate(count=len(eligible))
+        return eligible
 
 @app.on_event("startup")
 async def startup_event():
     """Load MCP agents from configuration on startup."""
-    global PROVIDERS
+    http_client()
+    ESTIMATOR.load()
+    await asyncio.to_thread(COMPLETION_CACHE.load_index)
+    asyncio.create_task(refresh_completion_index())
+    if ESTIMATOR.path:
+        asyncio.create_task(persist_estimates())
     mcp_servers = load_mcp_servers()
     for server in mcp_servers:
         env = server.env or {}
@@ -79,28 +175,100 @@ async def startup_event():
             env["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
         if server.id == "gemini" and "GEMINI_API_KEY" not in env and os.getenv("GEMINI_API_KEY"):
             env["GEMINI_API_KEY"] = os.getenv("GEMINI_API_KEY")
+        # LLM providers share the hub's completion cache file and model choice, so bids can see their cache
+        if server.id in LLM_SETTINGS:
+            for name in ("COMPLETION_CACHE_PATH", LLM_SETTINGS[server.id]["model_env"]):
+                if name not in env and os.getenv(name):
+                    env[name] = os.getenv(name)
         if server.id == "timezone-resolver" and "TIMEZONEDB_API_KEY" not in env and os.getenv("TIMEZONEDB_API_KEY"):
             env["TIMEZONEDB_API_KEY"] = os.getenv("TIMEZONEDB_API_KEY")
-        PROVIDERS.append({
+        REGISTRY.add({
             "id": server.id,
             "name": server.id,
             "url": "stdio",
             "command": server.command,
             "args": server.args,
-            "env": env
+            "env": env,
+            "deterministic": server.deterministic,
+            "cache_results": server.cache_results,
+            "transport": server.transport,
+            "pool_size": server.pool_size,
+            "session_concurrency": server.session_concurrency
         })
+        # Inproc and process providers get a stdio pool only if their module cannot be imported
+        local = False
+        if server.transport == "inproc" and INPROC is not None:
+            local = INPROC.register(server.id, server.args, env)
+        elif server.transport == "process" and PROCESS_PROVIDERS is not None:
+            local = PROCESS_PROVIDERS.register(server.id, server.args, env, size=server.pool_size)
+        if MCP_POOL is not None and not local:
+            MCP_POOL.register(
+                server.id,
+                StdioServerParameters(command=server.command, args=server.args, env=env),
+                size=server.pool_size,
+                session_concurrency=server.session_concurrency,
+            )
+        CAPABILITIES.register(server.id, server.bid)
     manifest_map = {
         "poster-ocr-regex": str(Path(__file__).parent.parent / "providers" / "agent_1" / "spoonos.manifest.json"),
         "ics-builder": str(Path(__file__).parent.parent / "providers" / "agent_8" / "spoonos.manifest.json"),
         "timezone-resolver": str(Path(__file__).parent.parent / "providers" / "agent_6" / "spoonos.manifest.json"),
     }
-    for p in PROVIDERS:
+    for p in REGISTRY.all():
         mp = manifest_map.get(p["id"])
         if mp and Path(mp).exists():
             with open(mp, "r") as f:
                 p["spoonos"] = True
                 p["manifest"] = json.load(f)
-    print(f"Loaded {len(PROVIDERS)} MCP agents from config.")
+            SPOON_POOL.register(p["manifest"])
+    print(f"Loaded {len(REGISTRY)} MCP agents from config.")
+    asyncio.create_task(SPOON_POOL.start())
+    if MCP_POOL is not None:
+        # Warm sessions and discover tools in the background so startup is not blocked on subprocesses
+        asyncio.create_task(warm_mcp_providers())
+
+
+async def persist_estimates():
+    while True:
+        await asyncio.sleep(ESTIMATOR_SAVE_INTERVAL_SECONDS)
+        try:
+            ESTIMATOR.save()
+        except OSError as e:
+            print(f"Could not save estimator state: {e}")
+
+
+async def refresh_completion_index():
+    # Completions other processes store (or this hub missed) become biddable within one interval
+    while True:
+        await asyncio.sleep(COMPLETION_INDEX_REFRESH_SECONDS)
+        await asyncio.to_thread(COMPLETION_CACHE.refresh_index)
+
+
+async def warm_mcp_providers():
+    # Import inproc providers and start worker pools first, so any that fail are pooled over stdio before warming
+    local_ids = INPROC.ids() + PROCESS_PROVIDERS.ids()
+    await asyncio.gather(*(local_backend(provider_id) for provider_id in local_ids))
+    await MCP_POOL.start()
+    await CAPABILITIES.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist learned estimates and tear down pooled MCP sessions and HTTP connections."""
+    ESTIMATOR.save()
+    RESULT_CACHE.close()
+    COMPLETION_CACHE.close()
+    TOOL_BATCHER.close()
+    await CAPABILITIES.close()
+    if INPROC is not None:
+        INPROC.close()
+        PROCESS_PROVIDERS.close()
+    if MCP_POOL is not None:
+        await MCP_POOL.close()
+    await SPOON_POOL.close()
+    if HTTP is not None:
+        await HTTP.aclose()
+    await SPOON.aclose()
 
 class AgentRegistration(BaseModel):
     name: str
@@ -108,23 +276,58 @@ class AgentRegistration(BaseModel):
 
 @app.post("/register")
 async def register_agent(agent: AgentRegistration):
-    """Register a new agent in the marketplace."""
-    # Check if already exists by URL
-    for p in PROVIDERS:
-        if p["url"] == agent.url:
-            p["name"] = agent.name  # Update name
-            return {"status": "updated", "id": p["id"]}
-    
-    # Add new agent
-    new_id = f"agent-{len(PROVIDERS) + 1}"
-    PROVIDERS.append({
-        "id": new_id,
-        "name": agent.name,
-        "url": agent.url
-    })
-    return {"status": "registered", "id": new_id}
+    """Register a new agent in the marketplace, or rename the one already at this URL."""
+    status, provider = REGISTRY.register_url(agent.name, agent.url)
+    invalidate_provider_proposals(provider["id"])
+    return {"status": status, "id": provider["id"]}
 
 TIMEOUT_SECONDS = 2.5
+EXECUTE_TIMEOUT_SECONDS = 30.0
+# Bidding closes after this fraction of sla.deadline_ms (capped at TIMEOUT_SECONDS), or once
+# BID_QUORUM goal-aligned proposals have arrived (0 waits for every bid within the window)
+BID_DEADLINE_FRACTION = float(os.getenv("BID_DEADLINE_FRACTION", "0.3"))
+BID_QUORUM = int(os.getenv("BID_QUORUM", "0"))
+BID_MIN_WINDOW_SECONDS = 0.05
+BID_STATS: Dict[str, int] = {
+    "rounds": 0,
+    "requested": 0,
+    "received": 0,
+    "failed": 0,
+    "late": 0,
+    "closed_by_deadline": 0,
+    "closed_by_quorum": 0,
+    "coalesced": 0
+}
+# Identical concurrent bid rounds, and identical executions on deterministic providers,
+# share one in-flight call (keyed by intent_key)
+BID_FLIGHTS = SingleFlight()
+EXEC_FLIGHTS = SingleFlight()
+# Bids keyed by (intent_key, provider id), reused by /execute, /orchestrate and /jobs while fresh
+PROPOSAL_CACHE = TTLCache(
+    maxsize=int(os.getenv("PROPOSAL_CACHE_SIZE", "2048")),
+    ttl_seconds=float(os.getenv("PROPOSAL_CACHE_TTL_SECONDS", "15"))
+)
+
+
+def invalidate_provider_proposals(provider_id: str) -> None:
+    PROPOSAL_CACHE.discard_where(lambda key: key[1] == provider_id)
+
+
+# Tool results of providers with "cache_results": true in the MCP config, keyed by content
+RESULT_CACHE = ResultCache()
+# Completions stored by the chatgpt and gemini providers; bids only consult its in-memory key
+# index, which is loaded at startup, refreshed on a timer and told of each LLM completion the hub runs
+COMPLETION_CACHE = CompletionCache(index=True)
+COMPLETION_INDEX_REFRESH_SECONDS = float(os.getenv("COMPLETION_INDEX_REFRESH_SECONDS", "5"))
+# Bid of an LLM provider whose completion for the intent is already cached
+CACHED_COMPLETION_BID = {"est_cost_usd": 0.0001, "est_latency_ms": 5}
+# Batch jobs bid for at most JOBS_MAX_CONCURRENCY intents at once across all requests, and each
+# provider serves at most PROVIDER_MAX_CONCURRENCY bids at once. Time spent waiting for a
+# provider slot counts against the bid window, so a saturated provider misses the round.
+JOBS_MAX_CONCURRENCY = int(os.getenv("JOBS_MAX_CONCURRENCY", "16"))
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "8"))
+JOB_SLOTS = asyncio.Semaphore(JOBS_MAX_CONCURRENCY)
+PROVIDER_SLOTS: Dict[str, asyncio.Semaphore] = {}
 
 
 def calculate_score(proposal: Proposal) -> float:
@@ -139,7 +342,7 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
     """Fetch proposal from a single provider (HTTP or MCP)."""
 
     def apply_goal_penalty(pid: str, score: float) -> (float, bool):
-        if intent.goal in GOAL_CAPABILITIES and pid not in GOAL_CAPABILITIES[intent.goal]:
+        if not REGISTRY.is_aligned(intent.goal, pid):
             return score * 0.2, True
         return score, False
 
@@ -147,7 +350,6 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
         t0 = time.perf_counter()
         try:
             manifest = provider.get("manifest", {})
-            sandbox = await SPOON.spawn(manifest)
             perm = {}
             if manifest.get("permissions"):
                 if manifest["permissions"].get("fs_write") or manifest["permissions"].get("fs_read"):
@@ -161,15 +363,17 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
                 "ics-builder": {"est_cost_usd": 0.01, "est_latency_ms": 200, "confidence": 0.9}
             }
             defaults = agent_defaults.get(provider["name"], {"est_cost_usd": 0.01, "est_latency_ms": 250, "confidence": 0.8})
-            resp = await SPOON.call_json(sandbox, "proposal", {"intent": intent.model_dump()})
+            async with SPOON_POOL.lease(manifest) as sandbox:
+                with metrics.track(provider["id"], "spoonos_call"):
+                    resp = await SPOON.call_json(sandbox, "proposal", {"intent": intent.model_dump()})
             proposal_data = {
                 "est_cost_usd": resp.get("est_cost_usd", defaults["est_cost_usd"]),
                 "est_latency_ms": resp.get("est_latency_ms", defaults["est_latency_ms"]),
                 "confidence": resp.get("confidence", defaults["confidence"]),
                 "plan": resp.get("plan", ["Run in SpoonOS sandbox"]),
                 "needs": resp.get("needs", {}),
-                "permissions": {**perm, "cpu": resources.get("cpu"), "ram_mb": resources.get("ram_mb"), "timeout_ms": resources.get("timeout_ms")},
-                "sandboxId": sandbox
+                # No sandboxId: the sandbox went back to the pool when the lease ended, and execution leases its own
+                "permissions": {**perm, "cpu": resources.get("cpu"), "ram_mb": resources.get("ram_mb"), "timeout_ms": resources.get("timeout_ms")}
             }
             proposal = Proposal(**{k: v for k, v in proposal_data.items() if k in ["est_cost_usd","est_latency_ms","confidence","plan","needs"]})
             score = calculate_score(proposal)
@@ -197,8 +401,7 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
                 "confidence": defaults["confidence"],
                 "plan": ["Run in SpoonOS sandbox"],
                 "needs": {},
-                "permissions": {},
-                "sandboxId": None
+                "permissions": {}
             }
             proposal = Proposal(**{k: v for k, v in proposal_data.items() if k in ["est_cost_usd","est_latency_ms","confidence","plan","needs"]})
             score = calculate_score(proposal)
@@ -227,65 +430,57 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
                 "needs": {},
                 "_telemetry": {"rtt_ms": int((time.perf_counter() - t0) * 1000)}
             }
-        server_params = StdioServerParameters(
-            command=provider["command"],
-            args=provider.get("args", []),
-            env=provider.get("env", {})
-        )
-        try:
-            async with stdio_client(server_params) as (read_stream, write_stream, _):
-                async with ClientSession(read_stream, write_stream) as session:
-                    await session.initialize()
-                    tools = await session.list_tools()
-                    agent_defaults = {
-                        "poster-ocr-regex": {"est_cost_usd": 0.01, "est_latency_ms": 500, "confidence": 0.75},
-                        "poster-ocr-dateparser": {"est_cost_usd": 0.02, "est_latency_ms": 800, "confidence": 0.85},
-                        "event-normalizer": {"est_cost_usd": 0.005, "est_latency_ms": 100, "confidence": 0.9},
-                        "timezone-resolver": {"est_cost_usd": 0.005, "est_latency_ms": 120, "confidence": 0.8},
-                        "ics-builder": {"est_cost_usd": 0.01, "est_latency_ms": 200, "confidence": 0.9},
-                        "ocr-generic": {"est_cost_usd": 0.008, "est_latency_ms": 500, "confidence": 0.7},
-                        "event-validator": {"est_cost_usd": 0.004, "est_latency_ms": 80, "confidence": 0.95},
-                        "chatgpt": {"est_cost_usd": 0.02, "est_latency_ms": 700, "confidence": 0.9},
-                        "gemini": {"est_cost_usd": 0.015, "est_latency_ms": 600, "confidence": 0.9}
-                    }
-                    defaults = agent_defaults.get(provider["name"], {"est_cost_usd": 0.01, "est_latency_ms": 250, "confidence": 0.8})
-                    proposal_data = {
-                        "est_cost_usd": defaults["est_cost_usd"],
-                        "est_latency_ms": defaults["est_latency_ms"],
-                        "confidence": defaults["confidence"],
-                        "plan": [f"Use MCP tools: {[t.name for t in tools.tools]}"],
-                        "needs": {}
-                    }
-                    proposal = Proposal(**proposal_data)
-                    score = calculate_score(proposal)
-                    score, mismatch = apply_goal_penalty(provider["id"], score)
-                    rtt_ms = int((time.perf_counter() - t0) * 1000)
-                    return {
-                        "_agent": provider["id"],
-                        "_agent_name": provider["name"],
-                        "_score": score,
-                        "_goal_mismatch": mismatch,
-                        "_telemetry": {"rtt_ms": rtt_ms},
-                        **proposal_data
-                    }
-        except Exception as e:
-            print(f"MCP proposal error from {provider['name']}: {e}")
-            rtt_ms = int((time.perf_counter() - t0) * 1000)
-            agent_defaults = {
-                "chatgpt": {"est_cost_usd": 0.02, "est_latency_ms": 700, "confidence": 0.7},
-                "gemini": {"est_cost_usd": 0.015, "est_latency_ms": 600, "confidence": 0.7}
-            }
-            defaults = agent_defaults.get(provider["name"], {"est_cost_usd": 0.02, "est_latency_ms": 800, "confidence": 0.6})
-            proposal_data = {
-                "est_cost_usd": defaults["est_cost_usd"],
-                "est_latency_ms": defaults["est_latency_ms"],
-                "confidence": defaults["confidence"],
-                "plan": ["LLM tool unavailable; using defaults"],
-                "needs": {}
-            }
+        # Bids come from the capability registry; no subprocess or MCP round-trip here
+        caps = CAPABILITIES.get(provider["id"])
+        if caps is not None and caps.available:
+            bid = caps.bid
+            plan = [f"Use MCP tools: {caps.tools}"]
+        else:
+            if caps is not None and caps.discovered_at is None:
+                CAPABILITIES.invalidate(provider["id"])
+            bid = CAPABILITIES.unavailable_bid(provider["id"])
+            plan = ["LLM tool unavailable; using defaults"]
+        cached_completion = caps is not None and caps.available and completion_cached(provider, intent)
+        if cached_completion:
+            bid = {**bid, **CACHED_COMPLETION_BID}
+            plan = ["Reuse cached completion"]
+        proposal_data = {
+            "est_cost_usd": bid["est_cost_usd"],
+            "est_latency_ms": int(bid["est_latency_ms"]),
+            "confidence": bid["confidence"],
+            "plan": plan,
+            "needs": {}
+        }
+        proposal = Proposal(**proposal_data)
+        score = calculate_score(proposal)
+        score, mismatch = apply_goal_penalty(provider["id"], score)
+        rtt_ms = int((time.perf_counter() - t0) * 1000)
+        return {
+            "_agent": provider["id"],
+            "_agent_name": provider["name"],
+            "_score": score,
+            "_goal_mismatch": mismatch,
+            "_cached_completion": cached_completion,
+            "_telemetry": {"rtt_ms": rtt_ms},
+            **proposal_data
+        }
+
+    try:
+        t0 = time.perf_counter()
+        with metrics.track(provider["id"], "http_intent") as phase:
+            response = await http_client().post(
+                f"{provider['url']}/intent",
+                json=intent.model_dump(),
+                timeout=TIMEOUT_SECONDS
+            )
+            if response.status_code != 200:
+                phase.outcome = "error"
+        if response.status_code == 200:
+            proposal_data = response.json()
             proposal = Proposal(**proposal_data)
             score = calculate_score(proposal)
             score, mismatch = apply_goal_penalty(provider["id"], score)
+            rtt_ms = int((time.perf_counter() - t0) * 1000)
             return {
                 "_agent": provider["id"],
                 "_agent_name": provider["name"],
@@ -294,28 +489,6 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
                 "_telemetry": {"rtt_ms": rtt_ms},
                 **proposal_data
             }
-
-    try:
-        t0 = time.perf_counter()
-        async with httpx.AsyncClient(timeout=TIMEOUT_SECONDS) as client:
-            response = await client.post(
-                f"{provider['url']}/intent",
-                json=intent.model_dump()
-            )
-            if response.status_code == 200:
-                proposal_data = response.json()
-                proposal = Proposal(**proposal_data)
-                score = calculate_score(proposal)
-                score, mismatch = apply_goal_penalty(provider["id"], score)
-                rtt_ms = int((time.perf_counter() - t0) * 1000)
-                return {
-                    "_agent": provider["id"],
-                    "_agent_name": provider["name"],
-                    "_score": score,
-                    "_goal_mismatch": mismatch,
-                    "_telemetry": {"rtt_ms": rtt_ms},
-                    **proposal_data
-                }
     except (httpx.TimeoutException, httpx.ConnectError, httpx.RequestError) as e:
         print(f"Error fetching from {provider['name']}: {e}")
     except Exception as e:
@@ -323,43 +496,267 @@ async def fetch_proposal(provider: Dict[str, str], intent: Intent) -> Dict[str,
     return None
 
 
+async def fetch_proposal_bounded(provider: Dict[str, Any], intent: Intent) -> Optional[Dict[str, Any]]:
+    """Fetch a proposal while holding one of the provider's concurrency slots."""
+    slot = PROVIDER_SLOTS.get(provider["id"])
+    if slot is None:
+        slot = PROVIDER_SLOTS[provider["id"]] = asyncio.Semaphore(PROVIDER_MAX_CONCURRENCY)
+    with tracing.span("bid", provider=provider["id"]):
+        async with slot:
+            return await fetch_proposal(provider, intent)
+
+
+def bid_window_seconds(intent: Intent) -> float:
+    if intent.sla and intent.sla.get("deadline_ms"):
+        window = intent.sla["deadline_ms"] / 1000.0 * BID_DEADLINE_FRACTION
+        return min(TIMEOUT_SECONDS, max(BID_MIN_WINDOW_SECONDS, window))
+    return TIMEOUT_SECONDS
+
+
+async def collect_proposals(
+    providers: List[Dict[str, Any]],
+    intent: Intent,
+    use_cache: bool = True
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Collect bids for an intent, reusing fresh cached bids where possible.
+
+    Providers without a cached bid are asked in one round, joining an identical
+    round already in flight. With ``use_cache`` false every provider is asked
+    again; fresh bids always refresh the cache. Proposals may be shared with
+    other callers and must not be mutated. The bidding stats report how many bids
+    came from the cache and whether the set was ``cached``, ``fresh`` or ``mixed``;
+    a joined round also carries ``"coalesced": true``.
+    """
+    with tracing.span("bidding", providers=len(providers)):
+        key = intent_key(intent)
+        cached: List[Dict[str, Any]] = []
+        missing = providers
+        if use_cache:
+            missing = []
+            for provider in providers:
+                prop = PROPOSAL_CACHE.get((key, provider["id"]))
+                if prop is None:
+                    missing.append(provider)
+                else:
+                    cached.append(prop)
+        if cached and not missing:
+            fresh: List[Dict[str, Any]] = []
+            stats = {
+                "requested": 0,
+                "received": 0,
+                "failed": 0,
+                "late": 0,
+                "closed_by": "cached",
+                "window_ms": 0,
+                "elapsed_ms": 0
+            }
+        else:
+            flight = (key, tuple(sorted(p["id"] for p in missing)))
+            (fresh, stats), shared = await BID_FLIGHTS.do(flight, lambda: run_bid_round(missing, intent))
+            if shared:
+                BID_STATS["coalesced"] += 1
+                stats = {**stats, "coalesced": True}
+        for prop in cached:
+            metrics.BIDS.labels(prop["_agent"], "cached").inc()
+        source = "fresh" if not cached else ("mixed" if fresh else "cached")
+        tracing.annotate(
+            count=len(cached) + len(fresh),
+            cached=len(cached),
+            late=stats["late"],
+            closed_by=stats["closed_by"],
+            coalesced=bool(stats.get("coalesced"))
+        )
+        return cached + fresh, {**stats, "cached": len(cached), "source": source}
+
+
+async def run_bid_round(
+    providers: List[Dict[str, Any]],
+    intent: Intent
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Collect bids concurrently until the bid window closes or the quorum is met.
+
+    Bids still outstanding when bidding closes are cancelled and reported as late.
+    Returns the proposals received and per-round bidding stats.
+    """
+    t0 = time.perf_counter()
+    window = bid_window_seconds(intent)
+    quorum = int((intent.constraints or {}).get("bid_quorum", BID_QUORUM))
+    aligned_ids = REGISTRY.aligned_ids(intent.goal)
+    key = intent_key(intent)
+    owners = {asyncio.create_task(fetch_proposal_bounded(provider, intent)): provider["id"] for provider in providers}
+    pending = set(owners)
+    proposals: List[Dict[str, Any]] = []
+    aligned = 0
+    failed = 0
+    closed_by = "complete"
+    try:
+        while pending:
+            remaining = window - (time.perf_counter() - t0)
+            if remaining <= 0:
+                closed_by = "deadline"
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                try:
+                    prop = finished.result()
+                except Exception:
+                    prop = None
+                if prop is None:
+                    failed += 1
+                    invalidate_provider_proposals(owners[finished])
+                    metrics.BIDS.labels(owners[finished], "failed").inc()
+                    continue
+                proposals.append(prop)
+                metrics.BIDS.labels(prop["_agent"], "received").inc()
+                PROPOSAL_CACHE.set((key, prop["_agent"]), prop)
+                ESTIMATOR.observe_bid(prop["_agent"], intent.goal, prop.get("_telemetry", {}).get("rtt_ms", 0))
+                if aligned_ids is None or prop.get("_agent") in aligned_ids:
+                    aligned += 1
+            if quorum and aligned >= quorum and pending:
+                closed_by = "quorum"
+                break
+    finally:
+        for late in pending:
+            late.cancel()
+            metrics.BIDS.labels(owners[late], "late").inc()
+    stats = {
+        "requested": len(providers),
+        "received": len(proposals),
+        "failed": failed,
+        "late": len(pending),
+        "closed_by": closed_by,
+        "window_ms": int(window * 1000),
+        "elapsed_ms": int((time.perf_counter() - t0) * 1000)
+    }
+    BID_STATS["rounds"] += 1
+    BID_STATS["requested"] += stats["requested"]
+    BID_STATS["received"] += stats["received"]
+    BID_STATS["failed"] += failed
+    BID_STATS["late"] += stats["late"]
+    if closed_by in ("deadline", "quorum"):
+        BID_STATS[f"closed_by_{closed_by}"] += 1
+    metrics.BID_ROUNDS.labels(closed_by).inc()
+    metrics.BID_ROUND_SECONDS.labels().observe(time.perf_counter() - t0)
+    return proposals, stats
+
+
+def overlay_learned_estimates(prop: Dict[str, Any], intent: Intent) -> Dict[str, Any]:
+    """Overlay observed latency, cost and success rate on a proposal without rescoring it."""
+    # Observations of real completions say nothing about replaying a cached one
+    if prop.get("_cached_completion"):
+        return prop
+    learned = ESTIMATOR.adjust(prop, intent.goal)
+    if not learned:
+        return prop
+    adjusted = {
+        **prop,
+        "est_cost_usd": learned["est_cost_usd"],
+        "est_latency_ms": learned["est_latency_ms"],
+        "confidence": learned["confidence"],
+        "_claimed": {k: prop[k] for k in ("est_cost_usd", "est_latency_ms", "confidence")}
+    }
+    if "p90_latency_ms" in learned:
+        adjusted["_p90_latency_ms"] = learned["p90_latency_ms"]
+    return adjusted
+
+
+def apply_learned_estimates(prop: Dict[str, Any], intent: Intent) -> Dict[str, Any]:
+    """Overlay observed latency, cost and success rate on a proposal and rescore it."""
+    adjusted = overlay_learned_estimates(prop, intent)
+    if adjusted is prop:
+        return prop
+    score = calculate_score(Proposal(
+        est_cost_usd=adjusted["est_cost_usd"],
+        est_latency_ms=adjusted["est_latency_ms"],
+        confidence=adjusted["confidence"],
+        plan=prop.get("plan", []),
+        needs=prop.get("needs", {})
+    ))
+    adjusted["_score"] = score * 0.2 if prop.get("_goal_mismatch") else score
+    return adjusted
+
+
 def filter_and_sort_proposals(
     proposals: List[Dict[str, Any]],
     intent: Intent
 ) -> List[Dict[str, Any]]:
-    """Filter proposals by budget and SLA, then sort by score."""
-    filtered = []
+    """Apply learned estimates, filter proposals by budget and SLA, then sort by score."""
+    with tracing.span("filter", proposals=sum(1 for p in proposals if p is not None)):
+        filtered = []
+        # Capability filter applies only when at least one proposal is goal-aligned; otherwise allow fallback
+        aligned_ids = REGISTRY.aligned_ids(intent.goal)
+        any_match = aligned_ids is not None and any(p and p.get("_agent") in aligned_ids for p in proposals)
     
-    for prop in proposals:
-        if prop is None:
-            continue
-            
-        # Filter by budget
-        if intent.budget and "max_usd" in intent.budget:
-            if prop["est_cost_usd"] > intent.budget["max_usd"]:
+        for prop in proposals:
+            if prop is None:
                 continue
+            prop = apply_learned_estimates(prop, intent)
+            
+            # Filter by budget
+            if intent.budget and "max_usd" in intent.budget:
+                if prop["est_cost_usd"] > intent.budget["max_usd"]:
+                    continue
         
-        # Filter by SLA deadline
-        if intent.sla and "deadline_ms" in intent.sla:
-            if prop["est_latency_ms"] > intent.sla["deadline_ms"]:
-                continue
+            # Filter by SLA deadline, using observed p90 latency once there are enough samples
+            if intent.sla and "deadline_ms" in intent.sla:
+                if prop.get("_p90_latency_ms", prop["est_latency_ms"]) > intent.sla["deadline_ms"]:
+                    continue
         
-        # Filter by capability when at least one proposal matches; otherwise allow fallback
-        if intent.goal in GOAL_CAPABILITIES:
-            any_match = any(p and p.get("_agent") in GOAL_CAPABILITIES[intent.goal] for p in proposals)
-            if any_match and prop.get("_agent") not in GOAL_CAPABILITIES[intent.goal]:
+            if any_match and prop.get("_agent") not in aligned_ids:
                 continue
-        filtered.append(prop)
+            filtered.append(prop)
     
-    # Sort by score descending with fair tie-breakers: lower cost, lower latency, higher confidence, stable id
-    filtered.sort(key=lambda x: (
-        -x["_score"],
-        x.get("est_cost_usd", float("inf")),
-        x.get("est_latency_ms", float("inf")),
-        -x.get("confidence", 0.0),
-        x.get("_agent", "")
-    ))
-    return filtered
+        # Sort by score descending with fair tie-breakers: lower cost, lower latency, higher confidence, stable id
+        filtered.sort(key=lambda x: (
+            -x["_score"],
+            x.get("est_cost_usd", float("inf")),
+            x.get("est_latency_ms", float("inf")),
+            -x.get("confidence", 0.0),
+            x.get("_agent", "")
+        ))
+        tracing.annotate(count=len(filtered))
+        return filtered
+
+
+# Batches with at least this many intents are ranked with NumPy instead of per dict
+BATCH_SCORING_MIN_INTENTS = int(os.getenv("HUB_BATCH_SCORING_MIN_INTENTS", "32"))
+
+
+def rank_proposal_batches(
+    intents: List[Intent],
+    proposal_groups: List[List[Dict[str, Any]]],
+    top_k: Optional[int] = None,
+    vectorized: Optional[bool] = None
+) -> List[List[Dict[str, Any]]]:
+    """Filter and rank proposals for many intents.
+
+    By default large batches are ranked with NumPy once learned estimates exist;
+    before that the per-dict path only sorts bid-time scores and is the cheaper
+    of the two. ``vectorized`` forces either path.
+    """
+    if vectorized is None:
+        vectorized = len(intents) >= BATCH_SCORING_MIN_INTENTS and ESTIMATOR.has_observations()
+    if not (vectorized and NUMPY_AVAILABLE):
+        ranked = [filter_and_sort_proposals(props, i) for i, props in zip(intents, proposal_groups)]
+        return [r[:top_k] for r in ranked] if top_k is not None else ranked
+    ranked = rank_batch(
+        proposal_groups,
+        goals=[i.goal for i in intents],
+        max_usd=[(i.budget or {}).get("max_usd") for i in intents],
+        deadline_ms=[(i.sla or {}).get("deadline_ms") for i in intents],
+        aligned_ids=[REGISTRY.aligned_ids(i.goal) for i in intents],
+        estimator=ESTIMATOR,
+        top_k=top_k,
+    )
+    # Only the surviving proposals get the learned overlay and their batch score
+    results = []
+    for i, group in zip(intents, ranked):
+        rows = []
+        for prop, score in group:
+            adjusted = overlay_learned_estimates(prop, i)
+            rows.append(adjusted if adjusted.get("_score") == score else {**adjusted, "_score": score})
+        results.append(rows)
+    return results
 
 
 @app.post("/post_intent")
@@ -367,29 +764,628 @@ async def post_intent(intent: Intent):
     """Broadcast intent to all providers and return scored proposals."""
     # Fetch proposals from eligible providers concurrently (fallback to all if none mapped)
     eligible = select_providers_for_intent(intent)
-    tasks = [fetch_proposal(provider, intent) for provider in eligible]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Filter out None and exceptions
-    proposals = [r for r in results if r is not None and not isinstance(r, Exception)]
+    proposals, bidding = await collect_proposals(eligible, intent, use_cache=False)
     
     # Filter and sort
     filtered_proposals = filter_and_sort_proposals(proposals, intent)
     with_explanations = [
         {**prop, "explanation": build_explanation(prop, intent)} for prop in filtered_proposals
     ]
-    return {"proposals": with_explanations}
+    return {"proposals": with_explanations, "bidding": bidding}
+
+
+# Tool invoked on each MCP agent and the intent input it receives
+TOOL_MAP: Dict[str, Dict[str, str]] = {
+    "poster-ocr-regex": {"name": "extract_event_regex", "arg_key": "text"},
+    "poster-ocr-dateparser": {"name": "parse_date", "arg_key": "text"},
+    "event-normalizer": {"name": "normalize_event", "arg_key": "data"},
+    "timezone-resolver": {"name": "resolve_timezone", "arg_key": "location"},
+    "ics-builder": {"name": "build_ics", "arg_key": "event_data"},
+    "ocr-generic": {"name": "ocr_image", "arg_key": "image_path"},
+    "event-validator": {"name": "validate_event", "arg_key": "event_json"},
+    "chatgpt": {"name": "chat_complete", "arg_key": "text"},
+    "gemini": {"name": "gemini_complete", "arg_key": "text"}
+}
+# Tool arguments that name a file; result cache keys hash the file contents instead of the path
+FILE_ARG_KEYS = ("image_path",)
+# Batch variants of TOOL_MAP tools: concurrent single-item calls are sent together as one JSON
+# array, and each item's result carries the single tool's output under result_key, or
+# "ok": false and an "error" when that item failed
+BATCH_TOOL_MAP: Dict[str, Dict[str, str]] = {
+    "event-validator": {"name": "validate_events", "arg_key": "events_json", "result_key": "result"},
+    "ocr-generic": {"name": "ocr_images", "arg_key": "image_paths", "result_key": "text"},
+}
+
+
+async def call_batch_tool(provider_id: str, items: List[Any]) -> List[Any]:
+    """Call a provider's batch tool with a list of items and return its per-item results."""
+    tool_def = BATCH_TOOL_MAP[REGISTRY.get(provider_id)["name"]]
+    result = await call_mcp_tool(provider_id, tool_def["name"], {tool_def["arg_key"]: json.dumps(items)})
+    text = "".join(c.get("text", "") for c in normalize_mcp_content(result))
+    if getattr(result, "isError", False):
+        raise ExecutionError(f"Batch tool {tool_def['name']} failed on {provider_id}: {text}")
+    return json.loads(text)
+
+
+TOOL_BATCHER = MicroBatcher(call_batch_tool)
+
+
+def batch_tool_for(provider: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """The batch tool for a provider's mapped tool, if the provider has advertised it."""
+    tool_def = BATCH_TOOL_MAP.get(provider["name"])
+    caps = CAPABILITIES.get(provider["id"])
+    if tool_def is None or caps is None or tool_def["name"] not in caps.tools:
+        return None
+    return tool_def
+
+
+def tool_call_for(provider: Dict[str, Any], intent: Intent) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Tool name and arguments an MCP provider is called with for this intent."""
+    tool_def = TOOL_MAP.get(provider["name"])
+    if not tool_def:
+        return None
+    arg_key = tool_def["arg_key"]
+    arg_val = intent.inputs.get(arg_key) or intent.inputs.get("text") or ""
+    return tool_def["name"], {arg_key: arg_val}
+
+
+def completion_cache_key(provider: Dict[str, Any], intent: Intent) -> Optional[str]:
+    """Key an LLM provider caches the completion for this intent under, or None for other providers."""
+    if provider["name"] not in LLM_SETTINGS:
+        return None
+    call = tool_call_for(provider, intent)
+    if call is None:
+        return None
+    _, args = call
+    # Same key the provider computes: its model from its env, and the tool's default system prompt
+    model, temperature = completion_settings(provider["name"], {**os.environ, **(provider.get("env") or {})})
+    prompt = args[TOOL_MAP[provider["name"]]["arg_key"]]
+    return completion_key(provider["name"], model, DEFAULT_SYSTEM_PROMPT, prompt, temperature)
+
+
+def completion_cached(provider: Dict[str, Any], intent: Intent) -> bool:
+    """Whether an LLM provider already has the completion this intent would ask it for."""
+    key = completion_cache_key(provider, intent)
+    return key is not None and COMPLETION_CACHE.contains(key)
+
+
+def result_cache_allowed(intent: Intent) -> bool:
+    return bool((intent.constraints or {}).get("use_result_cache", True))
+
+
+def result_cache_key(provider: Dict[str, Any], intent: Intent) -> Optional[str]:
+    if not provider.get("cache_results"):
+        return None
+    call = tool_call_for(provider, intent)
+    if call is None:
+        return None
+    tool_name, args = call
+    return RESULT_CACHE.key(provider["id"], tool_name, args, FILE_ARG_KEYS)
+
+# Hedging policy per goal: after delay_ms (or min(observed p90 latency, or latency_multiplier *
+# est_latency_ms before there is one, and delay_fraction * sla deadline)) without an answer, the next-best provider is started
+# in parallel, up to max_parallel attempts at once. max_parallel=1 means plain fallback.
+HEDGE_POLICIES: Dict[str, Dict[str, float]] = {
+    "default": {"delay_fraction": 0.25, "latency_multiplier": 2.0, "max_parallel": 2},
+    "summarize_text": {"delay_fraction": 0.4, "max_parallel": 2},
+    "translate_text": {"delay_fraction": 0.4, "max_parallel": 2},
+}
+HEDGE_POLICY_FIELDS = ("delay_ms", "delay_fraction", "latency_multiplier", "max_parallel")
+
+
+def load_hedge_policies(raw: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """HEDGE_POLICIES merged with per-goal overrides: inline JSON, or the path of a JSON file.
+
+    ``{"extract_event": {"max_parallel": 3}, "default": {"delay_fraction": 0.3}}`` changes
+    only the fields given. Unknown fields or non-numeric values raise ``ValueError``.
+    """
+    if not raw or not raw.strip():
+        return HEDGE_POLICIES
+    text = raw if raw.lstrip().startswith("{") else Path(raw).expanduser().read_text(encoding="utf-8")
+    overrides = json.loads(text)
+    if not isinstance(overrides, dict):
+        raise ValueError("HEDGE_POLICIES must be a JSON object of goal -> policy")
+    policies = {goal: dict(policy) for goal, policy in HEDGE_POLICIES.items()}
+    for goal, policy in overrides.items():
+        if not isinstance(policy, dict):
+            raise ValueError(f"HEDGE_POLICIES[{goal!r}] must be an object")
+        for name, value in policy.items():
+            if name not in HEDGE_POLICY_FIELDS:
+                raise ValueError(f"HEDGE_POLICIES[{goal!r}] has unknown field {name!r}")
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"HEDGE_POLICIES[{goal!r}][{name!r}] must be a number")
+        policies[goal] = {**policies.get(goal, {}), **policy}
+    return policies
+
+
+HEDGE_POLICIES = load_hedge_policies(os.getenv("HEDGE_POLICIES"))
+
+
+class ExecutionError(Exception):
+    """Raised when a single execution attempt on a provider fails."""
+
+
+def hedge_policy(goal: str) -> Dict[str, float]:
+    return {**HEDGE_POLICIES["default"], **HEDGE_POLICIES.get(goal, {})}
+
+
+def hedge_delay_seconds(policy: Dict[str, float], proposal_data: Dict[str, Any], intent: Intent) -> float:
+    """How long to wait on an attempt before starting the next-best provider."""
+    if policy.get("delay_ms"):
+        return policy["delay_ms"] / 1000.0
+    candidates = []
+    p90 = proposal_data.get("_p90_latency_ms")
+    est_latency = proposal_data.get("est_latency_ms")
+    if p90:
+        candidates.append(p90)
+    elif est_latency:
+        candidates.append(est_latency * policy.get("latency_multiplier", 2.0))
+    if intent.sla and intent.sla.get("deadline_ms"):
+        candidates.append(intent.sla["deadline_ms"] * policy.get("delay_fraction", 0.25))
+    if not candidates:
+        return EXECUTE_TIMEOUT_SECONDS
+    return min(candidates) / 1000.0
+
+
+def normalize_mcp_content(result: Any) -> List[Any]:
+    """Normalize an MCP tool result into a list of JSON-able content items."""
+    try:
+        if hasattr(result, "content") and isinstance(result.content, list):
+            return [c.model_dump() if hasattr(c, "model_dump") else c for c in result.content]
+        elif isinstance(result, str):
+            return [{"type": "text", "text": result}]
+        elif isinstance(result, dict):
+            return [{"type": "json", "json": result}]
+        else:
+            return [{"type": "text", "text": str(result)}]
+    except Exception:
+        return [{"type": "text", "text": ""}]
+
+
+async def execute_on_provider(
+    provider: Dict[str, Any],
+    proposal_data: Dict[str, Any],
+    intent: Intent,
+    task: Task
+) -> Dict[str, Any]:
+    """Run the task on a single provider and build the /execute response."""
+    provider_id = provider["id"]
+    public_proposal = {k: v for k, v in proposal_data.items() if not k.startswith("_")}
+
+    if provider.get("spoonos"):
+        try:
+            manifest = provider.get("manifest", {})
+            payload = {"intent": intent.model_dump()}
+            async with SPOON_POOL.lease(manifest) as sandbox:
+                with metrics.track(provider_id, "spoonos_call"):
+                    result = await SPOON.call_json(sandbox, "execute", payload)
+            return {
+                "winner": provider_id,
+                "winner_name": provider["name"],
+                "proposal": public_proposal,
+                "result": result,
+                "explanation": build_explanation(proposal_data, intent),
+                "sandboxId": sandbox,
+                "logs_url": SPOON.logs_url(sandbox)
+            }
+        except Exception as e:
+            raise ExecutionError(f"SpoonOS execution error on {provider_id}: {str(e)}") from e
+
+    # Handle MCP execution
+    if provider.get("url") == "stdio":
+        if not MCP_AVAILABLE:
+            return {
+                "winner": provider_id,
+                "winner_name": provider["name"],
+                "proposal": public_proposal,
+                "result": {"status": "OK", "data": {"message": f"Executed via MCP on {provider['name']} (simulated)"}}
+            }
+        call = tool_call_for(provider, intent)
+        if call is None:
+            raise ExecutionError(f"No tool mapping for {provider['name']}")
+        tool_name, args = call
+        cache_key = result_cache_key(provider, intent)
+        content = RESULT_CACHE.get(cache_key) if cache_key and result_cache_allowed(intent) else None
+        cached = content is not None
+
+        async def call_tool():
+            batch_def = batch_tool_for(provider)
+            if batch_def is None:
+                return await call_mcp_tool(provider_id, tool_name, args)
+            item = await TOOL_BATCHER.submit(provider_id, args[TOOL_MAP[provider["name"]]["arg_key"]])
+            if item.get("ok") is False:
+                # Raised rather than returned, so the failure is neither cached nor shared as a result
+                raise ExecutionError(f"{batch_def['name']} item failed: {item.get('error') or 'unknown error'}")
+            return CallToolResult(content=[TextContent(type="text", text=item[batch_def["result_key"]])])
+
+        if not cached:
+            try:
+                if provider.get("deterministic"):
+                    result, _ = await EXEC_FLIGHTS.do((provider_id, intent_key(intent)), call_tool)
+                else:
+                    result = await call_tool()
+            except Exception as e:
+                raise ExecutionError(f"MCP execution error on {provider_id}: {str(e)}") from e
+            content = normalize_mcp_content(result)
+            if cache_key and not getattr(result, "isError", False):
+                RESULT_CACHE.set(cache_key, provider_id, content)
+            completion = completion_cache_key(provider, intent)
+            if completion and not proposal_data.get("_cached_completion") and not getattr(result, "isError", False):
+                # The provider has stored the completion; index it and rebid instead of reusing the full-price bid
+                COMPLETION_CACHE.remember(completion)
+                PROPOSAL_CACHE.pop((intent_key(intent), provider_id))
+        response = {
+            "winner": provider_id,
+            "winner_name": provider["name"],
+            "proposal": public_proposal,
+            "result": {"status": "OK", "data": {"content": content}},
+            "explanation": build_explanation(proposal_data, intent)
+        }
+        if cached:
+            response["cached_result"] = True
+        if proposal_data.get("_cached_completion"):
+            response["cached_completion"] = True
+        return response
+
+    try:
+        with metrics.track(provider_id, "http_a2a") as phase:
+            response = await http_client().post(
+                f"{provider['url']}/a2a",
+                json=task.model_dump(),
+                timeout=EXECUTE_TIMEOUT_SECONDS
+            )
+            if response.status_code != 200:
+                phase.outcome = "error"
+    except (httpx.TimeoutException, httpx.ConnectError, httpx.RequestError) as e:
+        raise ExecutionError(f"Provider {provider_id} error: {str(e)}") from e
+    if response.status_code != 200:
+        raise ExecutionError(f"Provider {provider_id} returned status {response.status_code}")
+    try:
+        result_data = response.json()
+    except Exception as e:
+        raise ExecutionError(f"Provider {provider_id} unexpected error: {str(e)}") from e
+    return {
+        "winner": provider_id,
+        "winner_name": provider["name"],
+        "proposal": public_proposal,
+        "result": result_data,
+        "explanation": build_explanation(proposal_data, intent)
+    }
+
+
+async def execute_hedged(
+    candidates: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    intent: Intent,
+    task: Task
+) -> Dict[str, Any]:
+    """Execute on ranked candidates, hedging slow attempts and falling back on failure.
+
+    The top candidate starts first. If it has not answered within its hedge delay,
+    the runner-up starts in parallel (up to the goal's max_parallel); a failed
+    attempt immediately starts the next candidate in the slot it freed. The first
+    successful response wins and the attempts still running are cancelled.
+    """
+    policy = hedge_policy(intent.goal)
+    max_parallel = max(1, int(policy.get("max_parallel", 1)))
+    t0 = time.perf_counter()
+    attempts: List[Dict[str, Any]] = []
+    running: Dict[asyncio.Task, int] = {}
+    next_index = 0
+    hedge_at: Optional[float] = None
+    last_error = None
+
+    def elapsed_ms() -> int:
+        return int((time.perf_counter() - t0) * 1000)
+
+    async def run_attempt(provider: Dict[str, Any], proposal_data: Dict[str, Any], kind: str) -> Dict[str, Any]:
+        with tracing.span("attempt", provider=provider["id"], kind=kind):
+            return await execute_on_provider(provider, proposal_data, intent, task)
+
+    def launch(kind: str) -> None:
+        nonlocal next_index, hedge_at
+        provider, proposal_data = candidates[next_index]
+        attempt = asyncio.create_task(run_attempt(provider, proposal_data, kind))
+        running[attempt] = next_index
+        attempts.append({
+            "index": next_index,
+            "agent": provider["id"],
+            "kind": kind,
+            "started_ms": elapsed_ms(),
+            "outcome": "running"
+        })
+        hedge_at = time.perf_counter() + hedge_delay_seconds(policy, proposal_data, intent)
+        next_index += 1
+
+    try:
+        launch("primary")
+        while running:
+            can_hedge = next_index < len(candidates) and len(running) < max_parallel
+            timeout = max(0.0, hedge_at - time.perf_counter()) if can_hedge and hedge_at else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch("hedge")
+                continue
+            # Settle everything that finished before picking a winner, so none of it counts as cancelled
+            winner = None
+            failed = 0
+            for finished in sorted(done, key=running.get):
+                index = running.pop(finished)
+                record = next(a for a in attempts if a["index"] == index)
+                record["elapsed_ms"] = elapsed_ms() - record["started_ms"]
+                try:
+                    response = finished.result()
+                except Exception as e:
+                    record["outcome"] = "failed"
+                    last_error = str(e) if isinstance(e, ExecutionError) else f"Provider {record['agent']} unexpected error: {str(e)}"
+                    record["error"] = last_error
+                    invalidate_provider_proposals(record["agent"])
+                    ESTIMATOR.observe_execution(record["agent"], intent.goal, record["elapsed_ms"], success=False)
+                    failed += 1
+                    continue
+                # A second success in the same wake-up finished too; it is learned from but not used
+                record["outcome"] = "finished" if winner else "won"
+                # A cached result or completion says nothing about the provider's latency or cost
+                if not (response.get("cached_result") or response.get("cached_completion")):
+                    reported = response.get("result", {}).get("metrics") if isinstance(response.get("result"), dict) else None
+                    ESTIMATOR.observe_execution(
+                        record["agent"],
+                        intent.goal,
+                        record["elapsed_ms"],
+                        success=True,
+                        cost_usd=reported.get("cost_usd") if isinstance(reported, dict) else None
+                    )
+                if winner is None:
+                    winner = (index, record, response)
+            if winner is not None:
+                index, record, response = winner
+                for other, other_index in running.items():
+                    other.cancel()
+                    loser = next(a for a in attempts if a["index"] == other_index)
+                    loser["elapsed_ms"] = elapsed_ms() - loser["started_ms"]
+                    _, loser_proposal = candidates[other_index]
+                    # A losing attempt would have taken at least this long; only winners were learned before
+                    if not loser_proposal.get("_cached_completion"):
+                        claimed = loser_proposal.get("_claimed", loser_proposal)
+                        ESTIMATOR.observe_cancelled(
+                            loser["agent"], intent.goal, loser["elapsed_ms"], claimed["est_latency_ms"]
+                        )
+                for a in attempts:
+                    if a["outcome"] == "running":
+                        a["outcome"] = "cancelled"
+                response["attempt"] = {
+                    "index": index,
+                    "hedged": record["kind"] == "hedge",
+                    "attempts": attempts
+                }
+                return response
+            # Each failure frees a slot for the next candidate now, not at the next hedge delay
+            for _ in range(failed):
+                if next_index < len(candidates) and len(running) < max_parallel:
+                    launch("fallback")
+    finally:
+        for attempt in running:
+            attempt.cancel()
+        for a in attempts:
+            outcome = "cancelled" if a["outcome"] == "running" else a["outcome"]
+            metrics.EXECUTION_ATTEMPTS.labels(a["agent"], a["kind"], outcome).inc()
+
+    # All providers failed
+    raise HTTPException(
+        status_code=503,
+        detail=f"All providers failed. Last error: {last_error}"
+    )
+
+
+def cached_execution(providers: List[Dict[str, Any]], intent: Intent) -> Optional[Dict[str, Any]]:
+    """Answer from the result cache, without bidding, if a goal-aligned provider has this input cached.
+
+    Providers with a hit are ranked on their registry bids exactly as in a bid round,
+    budget and SLA filters included, and the top one answers.
+    """
+    hits: Dict[str, Any] = {}
+    candidates = []
+    for provider in providers:
+        if not REGISTRY.is_aligned(intent.goal, provider["id"]):
+            continue
+        key = result_cache_key(provider, intent)
+        content = RESULT_CACHE.get(key) if key else None
+        if content is None:
+            continue
+        caps = CAPABILITIES.get(provider["id"])
+        bid = caps.bid if caps is not None and caps.available else CAPABILITIES.unavailable_bid(provider["id"])
+        proposal_data = {
+            "est_cost_usd": bid["est_cost_usd"],
+            "est_latency_ms": int(bid["est_latency_ms"]),
+            "confidence": bid["confidence"],
+            "plan": [],
+            "needs": {}
+        }
+        hits[provider["id"]] = (provider, content)
+        candidates.append({
+            "_agent": provider["id"],
+            "_agent_name": provider["name"],
+            "_score": calculate_score(Proposal(**proposal_data)),
+            "_goal_mismatch": False,
+            **proposal_data
+        })
+    ranked = filter_and_sort_proposals(candidates, intent) if candidates else []
+    if not ranked:
+        return None
+    provider, content = hits[ranked[0]["_agent"]]
+    confidence = ranked[0]["confidence"]
+    tool_name, _ = tool_call_for(provider, intent)
+    proposal = {
+        "est_cost_usd": 0.0,
+        "est_latency_ms": 0,
+        "confidence": confidence,
+        "plan": [f"Reuse cached {tool_name} result"],
+        "needs": {}
+    }
+    return {
+        "winner": provider["id"],
+        "winner_name": provider["name"],
+        "proposal": proposal,
+        "result": {"status": "OK", "data": {"content": content}},
+        "explanation": build_explanation({**proposal, "_agent": provider["id"]}, intent),
+        "cached_result": True,
+        "bidding": {"skipped": True, "reason": "result_cache"}
+    }
+
+
+def stage_output(response: Dict[str, Any], result_key: Optional[str]) -> str:
+    """Text output of an execution response: MCP text content, else ``result_key`` of structured data.
+
+    Raises ``ExecutionError`` when a structured result lacks ``result_key`` or is only
+    ``PARTIAL`` (e.g. a timezone the sandbox could not resolve and reports as UTC).
+    """
+    result = response.get("result") if isinstance(response.get("result"), dict) else {}
+    data = result.get("data") if isinstance(result.get("data"), dict) else {}
+    if "content" in data:
+        return "".join(c.get("text", "") for c in data["content"] if isinstance(c, dict))
+    if result.get("status") == "PARTIAL":
+        raise ExecutionError(f"{response.get('winner')} returned a partial result")
+    if not result_key:
+        return json.dumps(data)
+    if result_key not in data:
+        raise ExecutionError(f"{response.get('winner')} result has no '{result_key}'")
+    value = data[result_key]
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def pipeline_requested(intent: Intent) -> bool:
+    return intent.goal == EXTRACT_EVENT_PIPELINE.name and bool((intent.constraints or {}).get("pipeline"))
+
+
+async def run_pipeline_stage(
+    intent: Intent,
+    stage: Stage,
+    args: Dict[str, Any],
+    budget_ms: int
+) -> Tuple[str, Dict[str, Any]]:
+    """Bid, rank and execute one pipeline stage among its providers within ``budget_ms``."""
+    with tracing.span("stage", stage=stage.name, budget_ms=budget_ms):
+        constraints = {k: v for k, v in (intent.constraints or {}).items() if k != "pipeline"}
+        sub_intent = Intent(
+            goal=intent.goal,
+            inputs=args,
+            constraints=constraints or None,
+            budget=intent.budget,
+            sla={"deadline_ms": budget_ms}
+        )
+        providers = [p for p in (REGISTRY.get(pid) for pid in stage.providers) if p]
+        if not providers:
+            raise ExecutionError(f"No provider registered for stage {stage.name}")
+        proposals, bidding = await collect_proposals(providers, sub_intent)
+        # The stage timeout enforces the deadline, so a provider bidding over it is still worth trying
+        ranked = (
+            filter_and_sort_proposals(proposals, sub_intent)
+            or filter_and_sort_proposals(proposals, sub_intent.model_copy(update={"sla": None}))
+        )
+        candidates = [(REGISTRY.get(p["_agent"]), p) for p in ranked if REGISTRY.get(p["_agent"])]
+        if not candidates:
+            raise ExecutionError(f"No available providers for stage {stage.name}")
+        task = Task(goal=sub_intent.goal, inputs=args, sla_ms=budget_ms)
+        response = await execute_hedged(candidates, sub_intent, task)
+        if response.get("result", {}).get("status") == "ERROR":
+            raise ExecutionError(f"Stage {stage.name} failed on {response['winner']}")
+        details = {
+            "agent": response["winner"],
+            "cost_usd": 0.0 if response.get("cached_result") else response["proposal"].get("est_cost_usd", 0.0),
+            "cached_result": bool(response.get("cached_result")),
+            "attempt": response.get("attempt"),
+            "bidding": bidding
+        }
+        return stage_output(response, stage.result_key), details
+
+
+async def execute_pipeline(intent: Intent) -> Dict[str, Any]:
+    """Run the extract_event pipeline and shape the outcome like an /execute response."""
+    budget_ms = intent.sla.get("deadline_ms") if intent.sla else None
+    budget_ms = budget_ms or int(EXECUTE_TIMEOUT_SECONDS * 1000)
+    outputs, records = await EXTRACT_EVENT_PIPELINE.run(
+        intent.inputs,
+        budget_ms,
+        lambda stage, args, stage_budget_ms: run_pipeline_stage(intent, stage, args, stage_budget_ms)
+    )
+    stages = [
+        {
+            **{k: v for k, v in vars(record).items() if k != "details"},
+            "cached_result": record.details.get("cached_result", False),
+            "attempt": record.details.get("attempt"),
+            "bidding": record.details.get("bidding")
+        }
+        for record in records.values()
+    ]
+    failed = [r.name for r in records.values() if r.status in ("failed", "blocked")]
+    event = finalize_event(intent.inputs, outputs)
+    ics = outputs.get("ics")
+    if ics:
+        status = "OK"
+    elif outputs.get("normalize"):
+        status = "PARTIAL"
+    else:
+        status = "ERROR"
+    ran = [r for r in records.values() if r.status == "ok"]
+    cost = sum(r.cost_usd for r in ran)
+    elapsed_ms = max((r.started_ms + r.elapsed_ms for r in records.values() if r.elapsed_ms is not None), default=0)
+    result = {
+        "status": status,
+        "data": {
+            "event": event,
+            "timezone": event.get("timezone"),
+            "validation": outputs.get("validate"),
+            "ics": ics
+        },
+        "metrics": {"cost_usd": cost, "latency_ms": elapsed_ms}
+    }
+    if failed:
+        result["error"] = "; ".join(f"{r.name}: {r.error}" for r in records.values() if r.name in failed)
+    proposal = {
+        "est_cost_usd": cost,
+        "est_latency_ms": elapsed_ms,
+        "confidence": 1.0 if status == "OK" else 0.0,
+        "plan": [f"{r.name} via {r.agent}" for r in ran],
+        "needs": {}
+    }
+    return {
+        "winner": "pipeline",
+        "winner_name": EXTRACT_EVENT_PIPELINE.name,
+        "proposal": proposal,
+        "result": result,
+        "explanation": {
+            "notes": [
+                "Each stage picked its provider by score among its candidates",
+                "Stages without unmet dependencies ran concurrently",
+                f"Each stage was given its share of a {budget_ms} ms SLA budget"
+            ]
+        },
+        "pipeline": {"budget_ms": budget_ms, "stages": stages}
+    }
 
 
 @app.post("/execute")
 async def execute(intent: Intent):
-    """Execute task on best available provider with fallback."""
+    """Execute task on best available provider with hedging and fallback.
+
+    The response carries the ``trace_id`` of the request's trace.
+    """
+    with tracing.trace("execute", goal=intent.goal) as trace:
+        response = await execute_intent(intent)
+    return {**response, "trace_id": trace.trace_id}
+
+
+async def execute_intent(intent: Intent) -> Dict[str, Any]:
+    if pipeline_requested(intent):
+        return await execute_pipeline(intent)
     # Re-run scoring on eligible providers to get current best provider
     eligible = select_providers_for_intent(intent)
-    tasks = [fetch_proposal(provider, intent) for provider in eligible]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    proposals = [r for r in results if r is not None and not isinstance(r, Exception)]
+    if result_cache_allowed(intent):
+        with tracing.span("result_cache"):
+            cached = cached_execution(eligible, intent)
+            tracing.annotate(hit=cached is not None)
+        if cached:
+            return cached
+    proposals, bidding = await collect_proposals(eligible, intent)
     filtered_proposals = filter_and_sort_proposals(proposals, intent)
     
     if not filtered_proposals:
@@ -398,128 +1394,23 @@ async def execute(intent: Intent):
             detail="No available providers matching constraints"
         )
     
-    # Try providers in order of score
     task = Task(
         goal=intent.goal,
         inputs=intent.inputs,
         sla_ms=intent.sla.get("deadline_ms", 120000) if intent.sla else 120000
     )
-    
-    last_error = None
+    candidates = []
     for proposal_data in filtered_proposals:
-        provider_id = proposal_data["_agent"]
-        provider = next((p for p in PROVIDERS if p["id"] == provider_id), None)
-        
-        if not provider:
-            continue
-
-        if provider.get("spoonos"):
-            try:
-                manifest = provider.get("manifest", {})
-                sandbox = proposal_data.get("sandboxId") or await SPOON.spawn(manifest)
-                payload = {"intent": intent.model_dump()}
-                result = await SPOON.call_json(sandbox, "execute", payload)
-                return {
-                    "winner": provider_id,
-                    "winner_name": provider["name"],
-                    "proposal": {k: v for k, v in proposal_data.items() if not k.startswith("_")},
-                    "result": result,
-                    "explanation": build_explanation(proposal_data, intent),
-                    "sandboxId": sandbox,
-                    "logs_url": SPOON.logs_url(sandbox)
-                }
-            except Exception as e:
-                last_error = f"SpoonOS execution error on {provider_id}: {str(e)}"
-                continue
-
-        # Handle MCP execution
-        if provider.get("url") == "stdio":
-            if not MCP_AVAILABLE:
-                return {
-                    "winner": provider_id,
-                    "winner_name": provider["name"],
-                    "proposal": {k: v for k, v in proposal_data.items() if not k.startswith("_")},
-                    "result": {"status": "OK", "data": {"message": f"Executed via MCP on {provider['name']} (simulated)"}}
-                }
-            try:
-                server_params = StdioServerParameters(
-                    command=provider["command"],
-                    args=provider.get("args", []),
-                    env=provider.get("env", {})
-                )
-                async with stdio_client(server_params) as (read_stream, write_stream, _):
-                    async with ClientSession(read_stream, write_stream) as session:
-                        await session.initialize()
-                        tool_map = {
-                            "poster-ocr-regex": {"name": "extract_event_regex", "arg_key": "text"},
-                            "poster-ocr-dateparser": {"name": "parse_date", "arg_key": "text"},
-                            "event-normalizer": {"name": "normalize_event", "arg_key": "data"},
-                            "timezone-resolver": {"name": "resolve_timezone", "arg_key": "location"},
-                            "ics-builder": {"name": "build_ics", "arg_key": "event_data"},
-                            "ocr-generic": {"name": "ocr_image", "arg_key": "image_path"},
-                            "event-validator": {"name": "validate_event", "arg_key": "event_json"},
-                            "chatgpt": {"name": "chat_complete", "arg_key": "text"},
-                            "gemini": {"name": "gemini_complete", "arg_key": "text"}
-                        }
-                        agent_id = provider["name"]
-                        tool_def = tool_map.get(agent_id)
-                        if not tool_def:
-                            last_error = f"No tool mapping for {agent_id}"
-                        else:
-                            arg_key = tool_def["arg_key"]
-                            arg_val = intent.inputs.get(arg_key) or intent.inputs.get("text") or ""
-                            result = await session.call_tool(tool_def["name"], {arg_key: arg_val})
-                            # Normalize MCP result content
-                            data_content: List[Any] = []
-                            try:
-                                if hasattr(result, "content") and isinstance(result.content, list):
-                                    data_content = [c.model_dump() if hasattr(c, "model_dump") else c for c in result.content]
-                                elif isinstance(result, str):
-                                    data_content = [{"type": "text", "text": result}]
-                                elif isinstance(result, dict):
-                                    data_content = [{"type": "json", "json": result}]
-                                else:
-                                    data_content = [{"type": "text", "text": str(result)}]
-                            except Exception:
-                                data_content = [{"type": "text", "text": ""}]
-                            return {
-                                "winner": provider_id,
-                                "winner_name": provider["name"],
-                                "proposal": {k: v for k, v in proposal_data.items() if not k.startswith("_")},
-                                "result": {"status": "OK", "data": {"content": data_content}},
-                                "explanation": build_explanation(proposal_data, intent)
-                            }
-            except Exception as e:
-                last_error = f"MCP execution error on {provider_id}: {str(e)}"
-                continue
-
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{provider['url']}/a2a",
-                    json=task.model_dump()
-                )
-                if response.status_code == 200:
-                    result_data = response.json()
-                    return {
-                        "winner": provider_id,
-                        "winner_name": provider["name"],
-                        "proposal": {k: v for k, v in proposal_data.items() if not k.startswith("_")},
-                        "result": result_data,
-                        "explanation": build_explanation(proposal_data, intent)
-                    }
-                else:
-                    last_error = f"Provider {provider_id} returned status {response.status_code}"
-        except (httpx.TimeoutException, httpx.ConnectError, httpx.RequestError) as e:
-            last_error = f"Provider {provider_id} error: {str(e)}"
-        except Exception as e:
-            last_error = f"Provider {provider_id} unexpected error: {str(e)}"
-    
-    # All providers failed
-    raise HTTPException(
-        status_code=503,
-        detail=f"All providers failed. Last error: {last_error}"
-    )
+        provider = REGISTRY.get(proposal_data["_agent"])
+        if provider:
+            candidates.append((provider, proposal_data))
+    if not candidates:
+        raise HTTPException(status_code=503, detail="All providers failed. Last error: None")
+    with tracing.span("execute", candidates=len(candidates)):
+        response = await execute_hedged(candidates, intent, task)
+        tracing.annotate(winner=response["winner"])
+    response["bidding"] = bidding
+    return response
 
 
 @app.get("/")
@@ -530,35 +1421,255 @@ async def root():
             "POST /post_intent": "Broadcast intent and get scored proposals",
             "POST /execute": "Execute task on best provider"
         },
-        "providers": PROVIDERS
+        "providers": REGISTRY.all()
     }
 
 class JobsRequest(BaseModel):
     intents: List[Intent]
+    top_k: Optional[int] = None
+
+
+def job_result(intent: Intent, filtered: List[Dict[str, Any]], bidding: Dict[str, Any]) -> Dict[str, Any]:
+    winner = filtered[0] if filtered else None
+    return {
+        "intent": intent.model_dump(),
+        "proposals": filtered,
+        "winner": winner.get("_agent") if winner else None,
+        "winner_name": winner.get("_agent_name") if winner else None,
+        "bidding": bidding,
+    }
+
+
+async def bid_for_job(
+    intent: Intent,
+    index: int,
+    parent: Optional[tracing.Span] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    with tracing.span("job", parent=parent, index=index):
+        async with JOB_SLOTS:
+            return await collect_proposals(select_providers_for_intent(intent), intent)
+
+
+class ValidationJobsRequest(BaseModel):
+    events: List[Any]
+    provider: str = "event-validator"
+
+
+@app.post("/jobs/validate")
+async def validate_jobs(req: ValidationJobsRequest):
+    """Validate many events with a provider's batch tool, in chunks of ``BATCH_MAX_ITEMS``.
+
+    Events are objects or their JSON text. Results keep the request order and
+    list every schema error of each event.
+    """
+    provider = REGISTRY.get(req.provider)
+    batch_def = BATCH_TOOL_MAP.get(provider["name"]) if provider else None
+    if batch_def is None or batch_def["name"] != "validate_events" or not MCP_AVAILABLE:
+        raise HTTPException(status_code=503, detail=f"No batch validator registered as '{req.provider}'")
+    t0 = time.perf_counter()
+    try:
+        results = await TOOL_BATCHER.map(provider["id"], req.events)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Batch validation failed on {provider['id']}: {str(e)}")
+    valid = sum(1 for r in results if r.get("valid"))
+    return {
+        "provider": provider["id"],
+        "valid": valid,
+        "invalid": len(results) - valid,
+        "batches": (len(req.events) + TOOL_BATCHER.max_batch - 1) // TOOL_BATCHER.max_batch,
+        "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+        "results": results
+    }
+
 
 @app.post("/jobs")
 async def jobs(req: JobsRequest):
-    async def run_one(i: Intent):
-        eligible = select_providers_for_intent(i)
-        tasks = [fetch_proposal(p, i) for p in eligible]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        proposals = [r for r in results if r is not None and not isinstance(r, Exception)]
-        filtered = filter_and_sort_proposals(proposals, i)
-        winner = filtered[0] if filtered else None
-        return {
-            "intent": i.model_dump(),
-            "proposals": filtered,
-            "winner": winner.get("_agent") if winner else None,
-            "winner_name": winner.get("_agent_name") if winner else None,
-        }
-    jobs = await asyncio.gather(*[run_one(i) for i in req.intents])
-    return {"jobs": jobs}
+    with tracing.trace("jobs", intents=len(req.intents)) as trace:
+        rounds = await asyncio.gather(*[bid_for_job(i, n) for n, i in enumerate(req.intents)])
+        with tracing.span("rank"):
+            ranked = rank_proposal_batches(req.intents, [proposals for proposals, _ in rounds], req.top_k)
+    jobs = [
+        job_result(i, filtered, bidding)
+        for i, filtered, (_, bidding) in zip(req.intents, ranked, rounds)
+    ]
+    return {"jobs": jobs, "trace_id": trace.trace_id}
+
+
+async def iter_listed_intents(intents: List[Intent]) -> AsyncIterator[Union[Intent, ValidationError]]:
+    for intent in intents:
+        yield intent
+
+
+async def iter_ndjson_intents(body: bytes) -> AsyncIterator[Union[Intent, ValidationError]]:
+    """Parse one intent per line, only as the stream asks for the next job."""
+    start = 0
+    while start < len(body):
+        end = body.find(b"\n", start)
+        if end == -1:
+            end = len(body)
+        line = body[start:end]
+        start = end + 1
+        if not line.strip():
+            continue
+        try:
+            yield Intent.model_validate_json(line)
+        except ValidationError as e:
+            yield e
+
+
+async def run_streamed_job(
+    index: int,
+    intent: Union[Intent, ValidationError],
+    top_k: Optional[int],
+    parent: tracing.Span
+) -> Dict[str, Any]:
+    """One streamed result; failures are reported with the job's ``index`` too, since results arrive out of order."""
+    if isinstance(intent, ValidationError):
+        return {"index": index, "error": str(intent)}
+    try:
+        proposals, bidding = await bid_for_job(intent, index, parent)
+        filtered = filter_and_sort_proposals(proposals, intent)
+    except Exception as e:
+        return {"index": index, "error": str(getattr(e, "detail", None) or e)}
+    return {"index": index, **job_result(intent, filtered[:top_k] if top_k is not None else filtered, bidding)}
+
+
+async def stream_jobs(
+    intents: AsyncIterator[Union[Intent, ValidationError]],
+    top_k: Optional[int],
+    sse: bool
+) -> AsyncIterator[str]:
+    """Yield each job as soon as its bid round closes, keeping a bounded number in flight."""
+    def encode(payload: Dict[str, Any]) -> str:
+        line = json.dumps(payload)
+        return f"data: {line}\n\n" if sse else line + "\n"
+
+    t0 = time.perf_counter()
+    # The generator runs across many sends, so the trace is passed down instead of made current
+    trace = tracing.Trace("jobs_stream")
+    pending = set()
+    next_index = 0
+    completed = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < JOBS_MAX_CONCURRENCY:
+                try:
+                    intent = await intents.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.create_task(run_streamed_job(next_index, intent, top_k, trace.root)))
+                next_index += 1
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                completed += 1
+                yield encode(task.result())
+        yield encode({
+            "done": True,
+            "jobs": completed,
+            "elapsed_ms": int((time.perf_counter() - t0) * 1000),
+            "trace_id": trace.trace_id
+        })
+    finally:
+        # Client went away or the stream failed: stop bidding for the remaining jobs
+        for task in pending:
+            task.cancel()
+        trace.root.attrs["jobs"] = completed
+        tracing.finish(trace)
+
+
+@app.post("/jobs/stream")
+async def jobs_stream(request: Request, top_k: Optional[int] = None):
+    """Stream one result per intent as each bid round closes.
+
+    The body is either a JSON ``JobsRequest`` or NDJSON with one intent per line
+    (``Content-Type: application/x-ndjson``). NDJSON lines are parsed only as jobs
+    start, so at most ``JOBS_MAX_CONCURRENCY`` intents are materialized at a time.
+    Results are NDJSON lines tagged with the intent's ``index``, or SSE events when
+    the client accepts ``text/event-stream``; a final ``{"done": true}`` line ends the stream.
+    """
+    if "ndjson" in request.headers.get("content-type", ""):
+        # The body is read up front: once the response starts, Starlette consumes
+        # the receive channel to watch for client disconnects
+        intents = iter_ndjson_intents(await request.body())
+    else:
+        try:
+            req = JobsRequest.model_validate(await request.json())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be JSON or NDJSON")
+        intents = iter_listed_intents(req.intents)
+        if top_k is None:
+            top_k = req.top_k
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    return StreamingResponse(
+        stream_jobs(intents, top_k, sse),
+        media_type="text/event-stream" if sse else "application/x-ndjson"
+    )
 
 
 @app.get("/agents")
 async def get_agents():
     """Return the list of currently registered agents."""
-    return PROVIDERS
+    return REGISTRY.all()
+
+
+@app.get("/bids/stats")
+async def get_bid_stats():
+    """Return cumulative bidding counters, including late (cancelled) bids."""
+    return BID_STATS
+
+
+@app.get("/estimates")
+async def get_estimates():
+    """Return learned latency, cost and success estimates per provider and goal."""
+    return ESTIMATOR.snapshot()
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Phase latency histograms, bid and execution counters and in-flight gauges in the Prometheus text format."""
+    return PlainTextResponse(metrics.METRICS.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Return hit/miss counters for the proposal, result and completion caches."""
+    return {
+        "proposals": PROPOSAL_CACHE.stats(),
+        "results": RESULT_CACHE.stats(),
+        "completions": COMPLETION_CACHE.stats()
+    }
+
+
+@app.get("/coalescing")
+async def get_coalescing():
+    """Return single-flight counters for bid rounds and deterministic executions, and tool batching counters."""
+    return {
+        "bids": {**BID_FLIGHTS.stats, "inflight": len(BID_FLIGHTS)},
+        "executions": {**EXEC_FLIGHTS.stats, "inflight": len(EXEC_FLIGHTS)},
+        "batching": TOOL_BATCHER.snapshot()
+    }
+
+
+@app.get("/transports")
+async def get_transports():
+    """Return load state and call counters for inproc providers and process worker pools, and stdio session pools."""
+    return {
+        "inproc": INPROC.stats() if INPROC is not None else {},
+        "process": PROCESS_PROVIDERS.stats() if PROCESS_PROVIDERS is not None else {},
+        "stdio": MCP_POOL.stats() if MCP_POOL is not None else {}
+    }
+
+
+@app.get("/capabilities")
+async def get_capabilities():
+    """Return discovered MCP tools and bid parameters per provider."""
+    return CAPABILITIES.snapshot()
 
 
 if __name__ == "__main__":
@@ -584,7 +1695,7 @@ def build_explanation(proposal_data: Dict[str, Any], intent: Intent) -> Dict[str
             "Filtered by budget and deadline before ranking",
             "Ties broken by lower cost, then lower latency, then higher confidence"
         ]
-        if intent.goal in GOAL_CAPABILITIES and proposal_data.get("_agent") not in GOAL_CAPABILITIES[intent.goal]:
+        if not REGISTRY.is_aligned(intent.goal, proposal_data.get("_agent")):
             notes.append("Agent is not goal-aligned; fallback with penalty applied")
         return {
             "score": score,
@@ -606,33 +1717,58 @@ def build_explanation(proposal_data: Dict[str, Any], intent: Intent) -> Dict[str
         return {}
 @app.post("/orchestrate")
 async def orchestrate(intent: Intent):
-    trace: List[Dict[str, Any]] = []
-    eligible = select_providers_for_intent(intent)
-    trace.append({"event": "select_providers", "count": len(eligible)})
-    tasks = [fetch_proposal(provider, intent) for provider in eligible]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    proposals = [r for r in results if r is not None and not isinstance(r, Exception)]
-    trace.append({"event": "proposals_received", "count": len(proposals)})
-    filtered = filter_and_sort_proposals(proposals, intent)
-    trace.append({"event": "filtered_sorted", "count": len(filtered)})
-    if not filtered:
-        heavy = [p for p in PROVIDERS if p.get("id") in {"chatgpt", "gemini"}]
-        if heavy:
-            trace.append({"event": "escalate_heavy", "count": len(heavy)})
-            tasks2 = [fetch_proposal(provider, intent) for provider in heavy]
-            results2 = await asyncio.gather(*tasks2, return_exceptions=True)
-            proposals2 = [r for r in results2 if r is not None and not isinstance(r, Exception)]
-            filtered = filter_and_sort_proposals(proposals2, intent)
-            trace.append({"event": "filtered_sorted_after_escalation", "count": len(filtered)})
-    with_explanations = [{**prop, "explanation": build_explanation(prop, intent)} for prop in filtered]
-    winner = with_explanations[0] if with_explanations else None
-    if winner:
-        trace.append({"event": "winner_selected", "agent": winner.get("_agent"), "name": winner.get("_agent_name")})
-    result = {"proposals": with_explanations, "trace": trace, "winner": winner.get("_agent") if winner else None, "winner_name": winner.get("_agent_name") if winner else None}
-    global LAST_TRACE
-    LAST_TRACE = {"timestamp": int(time.time()*1000), "data": result}
-    return result
+    with tracing.trace("orchestrate", goal=intent.goal) as trace:
+        eligible = select_providers_for_intent(intent)
+        proposals, bidding = await collect_proposals(eligible, intent)
+        filtered = filter_and_sort_proposals(proposals, intent)
+        if not filtered:
+            heavy = [p for p in (REGISTRY.get("chatgpt"), REGISTRY.get("gemini")) if p]
+            if heavy:
+                with tracing.span("escalate_heavy", count=len(heavy)):
+                    proposals2, _ = await collect_proposals(heavy, intent)
+                    filtered = filter_and_sort_proposals(proposals2, intent)
+        with_explanations = [{**prop, "explanation": build_explanation(prop, intent)} for prop in filtered]
+        winner = with_explanations[0] if with_explanations else None
+        if winner:
+            tracing.annotate(winner=winner.get("_agent"), winner_name=winner.get("_agent_name"))
+            tracing.event("winner_selected", agent=winner.get("_agent"), name=winner.get("_agent_name"))
+        events = trace.events()
+        trace.result = {
+            "proposals": with_explanations,
+            "trace": events,
+            "winner": winner.get("_agent") if winner else None,
+            "winner_name": winner.get("_agent_name") if winner else None
+        }
+    return {**trace.result, "trace_id": trace.trace_id}
+
 
 @app.get("/orchestrate/trace")
 async def orchestrate_trace():
-    return LAST_TRACE or {}
+    """The most recent /orchestrate response (proposals, winner and flat event list) under ``data``."""
+    trace = tracing.TRACES.latest("orchestrate")
+    if trace is None or trace.result is None:
+        return {}
+    return {
+        "trace_id": trace.trace_id,
+        "timestamp": trace.timestamp,
+        "duration_ms": trace.duration_ms,
+        "data": trace.result
+    }
+
+
+@app.get("/orchestrate/trace/slowest")
+async def slowest_traces(n: int = 10, kind: Optional[str] = None):
+    """The ``n`` slowest stored traces, optionally only those of one ``kind`` (orchestrate, execute, jobs, jobs_stream)."""
+    return {
+        "traces": [trace.to_dict() for trace in tracing.TRACES.slowest(n, kind)],
+        "store": tracing.TRACES.stats()
+    }
+
+
+@app.get("/orchestrate/trace/{trace_id}")
+async def get_trace(trace_id: str):
+    """The span tree of one stored trace."""
+    trace = tracing.TRACES.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Trace '{trace_id}' not found (it may have been evicted)")
+    return trace.to_dict()
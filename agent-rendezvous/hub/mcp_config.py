@@ -1,9 +1,11 @@
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
+TRANSPORTS = ("stdio", "inproc", "process")
+
 
 @dataclass
 class McpServer:
@@ -13,6 +15,15 @@ class McpServer:
     command: str
     args: List[str]
     env: Dict[str, str]
+    pool_size: Optional[int] = None
+    # Calls a pooled stdio session serves at once; >1 suits async providers
+    session_concurrency: Optional[int] = None
+    bid: Dict[str, float] = field(default_factory=dict)
+    deterministic: bool = False
+    cache_results: bool = False
+    # "stdio" (pooled subprocesses), or for Python FastMCP scripts "inproc" (imported into the hub)
+    # or "process" (a pool of pre-warmed worker processes; pool_size sets the worker count)
+    transport: str = "stdio"
 
 
 class McpConfigError(Exception):
@@ -56,6 +67,16 @@ def load_mcp_servers() -> List[McpServer]:
 
             args = config.get("args", [])
             env = config.get("env", {})
+            pool_size = config.get("pool_size")
+            session_concurrency = config.get("session_concurrency")
+            bid = config.get("bid", {})
+            deterministic = bool(config.get("deterministic", False))
+            cache_results = bool(config.get("cache_results", False))
+            transport = config.get("transport", "stdio")
+            if transport not in TRANSPORTS:
+                raise McpConfigError(
+                    f"MCP server '{server_id}' in {path} has unknown transport '{transport}'"
+                )
 
             parsed.append(
                 McpServer(
@@ -63,6 +84,12 @@ def load_mcp_servers() -> List[McpServer]:
                     command=command,
                     args=[str(arg) for arg in args],
                     env={k: str(v) for k, v in env.items()},
+                    pool_size=int(pool_size) if pool_size else None,
+                    session_concurrency=int(session_concurrency) if session_concurrency else None,
+                    bid={k: float(v) for k, v in bid.items()},
+                    deterministic=deterministic,
+                    cache_results=cache_results,
+                    transport=transport,
                 )
             )
 
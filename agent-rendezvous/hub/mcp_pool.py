@@ -0,0 +1,363 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+import metrics
+
+
+class McpPoolError(Exception):
+    """Raised when a pooled MCP session cannot be spawned or checked out."""
+
+
+# Raised when the subprocess exits or its pipes close under a call
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    BrokenPipeError,
+    ConnectionError,
+    EOFError,
+)
+
+
+def transport_failed(pooled: "PooledSession", exc: BaseException) -> bool:
+    """Whether an error raised during a call means the session itself is gone.
+
+    Cancellation, timeouts and tool or protocol errors leave the connection
+    usable; only a dead owner task, closed pipes or a closed read stream do not.
+    """
+    if not pooled.alive:
+        return True
+    if isinstance(exc, McpError):
+        return exc.error.code == CONNECTION_CLOSED
+    return isinstance(exc, TRANSPORT_ERRORS)
+
+
+class PooledSession:
+    """One long-lived MCP stdio subprocess with an initialized ClientSession.
+
+    ``stdio_client`` and ``ClientSession`` are context managers bound to the task
+    that entered them, so every pooled session owns a background task that keeps
+    both open until ``close()`` is requested or the subprocess dies.
+    """
+
+    def __init__(self, provider_id: str, params: StdioServerParameters, call_timeout: float):
+        self.provider_id = provider_id
+        self.params = params
+        self.call_timeout = call_timeout
+        self.session: Optional[ClientSession] = None
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.error: Optional[BaseException] = None
+        # Set when the transport failed; no new calls are routed here
+        self.broken = False
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and not self._closing.is_set()
+            and not self.broken
+        )
+
+    async def start(self, timeout: float) -> None:
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            self.close_nowait()
+            raise McpPoolError(f"Timed out starting MCP server '{self.provider_id}'")
+        if not self.alive:
+            raise McpPoolError(f"Failed to start MCP server '{self.provider_id}': {self.error}")
+
+    async def _run(self) -> None:
+        started = time.perf_counter()
+        spawned = False
+        try:
+            async with stdio_client(self.params) as (read_stream, write_stream):
+                spawned = True
+                metrics.observe_phase(self.provider_id, "spawn", time.perf_counter() - started)
+                async with ClientSession(
+                    read_stream,
+                    write_stream,
+                    read_timeout_seconds=timedelta(seconds=self.call_timeout),
+                ) as session:
+                    with metrics.track(self.provider_id, "initialize"):
+                        await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as exc:
+            self.error = exc
+            if not spawned:
+                metrics.observe_phase(self.provider_id, "spawn", time.perf_counter() - started, "error")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def closing(self) -> bool:
+        return self._closing.is_set()
+
+    def close_nowait(self) -> None:
+        """Ask the owner task to tear down the session without waiting for it."""
+
+        self._closing.set()
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self._closing.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class _ProviderSessions:
+    """Idle and checked-out sessions and the concurrency cap for a single provider."""
+
+    def __init__(self, params: StdioServerParameters, size: int, session_concurrency: int = 1):
+        self.params = params
+        self.size = size
+        self.session_concurrency = session_concurrency
+        self.idle: List[PooledSession] = []
+        # Checked-out sessions and the calls each one is serving
+        self.leases: Dict[PooledSession, int] = {}
+        self.spawned = 0
+        self.crashed = 0
+        self.restart_pending = False
+        self.slots = asyncio.Semaphore(size * session_concurrency)
+
+    def mark_crashed(self, pooled: PooledSession) -> None:
+        """Retire a dead session; it is closed once no call holds it any more."""
+        if pooled.closing or pooled.broken:
+            # Already retired by another call sharing the session
+            return
+        self.crashed += 1
+        self.restart_pending = True
+        pooled.broken = True
+        if not self.leases.get(pooled):
+            pooled.close_nowait()
+
+    @property
+    def busy(self) -> int:
+        return len(self.leases)
+
+    @property
+    def live(self) -> int:
+        return self.busy + len(self.idle)
+
+
+class McpSessionPool:
+    """Pool of long-lived MCP stdio sessions keyed by provider id.
+
+    Sessions are checked out through ``session()``; at most ``size`` sessions exist
+    per provider, each serving up to ``session_concurrency`` calls at once (1, the
+    default, means exclusive checkout). Sharing suits async providers, whose
+    servers interleave concurrent requests on one connection. A call that is
+    cancelled, times out or fails with a tool error leaves its session in the
+    pool; only a session whose transport died is treated as crashed, taken
+    out of rotation, closed once its other calls finish and replaced on the
+    next checkout. The background reaper pings idle sessions, evicts those idle
+    for longer than ``idle_seconds`` and keeps ``min_idle`` sessions warm.
+    ``on_restart`` is called with the provider id when a session is spawned to
+    replace a crashed one.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        min_idle: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        start_timeout: float = 20.0,
+        call_timeout: Optional[float] = None,
+        reap_interval: float = 15.0,
+    ):
+        self.size = size or int(os.getenv("MCP_POOL_SIZE", "2"))
+        self.min_idle = min_idle if min_idle is not None else int(os.getenv("MCP_POOL_MIN_IDLE", "1"))
+        self.idle_seconds = idle_seconds or float(os.getenv("MCP_POOL_IDLE_SECONDS", "300"))
+        self.call_timeout = call_timeout or float(os.getenv("MCP_POOL_CALL_TIMEOUT", "30"))
+        self.session_concurrency = int(os.getenv("MCP_POOL_SESSION_CONCURRENCY", "1"))
+        self.start_timeout = start_timeout
+        self.reap_interval = reap_interval
+        self._providers: Dict[str, _ProviderSessions] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self.on_restart: Optional[Callable[[str], None]] = None
+
+    def register(
+        self,
+        provider_id: str,
+        params: StdioServerParameters,
+        size: Optional[int] = None,
+        session_concurrency: Optional[int] = None,
+    ) -> None:
+        """Register (or replace) the server parameters for a provider."""
+
+        previous = self._providers.get(provider_id)
+        self._providers[provider_id] = _ProviderSessions(
+            params, size or self.size, session_concurrency or self.session_concurrency
+        )
+        if previous:
+            for pooled in previous.idle:
+                pooled.close_nowait()
+
+    def __contains__(self, provider_id: str) -> bool:
+        return provider_id in self._providers
+
+    async def start(self) -> None:
+        """Pre-warm ``min_idle`` sessions per provider and start the reaper."""
+
+        await self._refill()
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        closing = []
+        for entry in self._providers.values():
+            # Checked-out sessions too, or their subprocesses outlive the pool; their calls see a closed connection
+            closing.extend(pooled.close() for pooled in [*entry.idle, *entry.leases])
+            entry.idle.clear()
+        await asyncio.gather(*closing, return_exceptions=True)
+
+    @asynccontextmanager
+    async def session(self, provider_id: str) -> AsyncIterator[ClientSession]:
+        """Check out an initialized session, returning it to the pool afterwards."""
+
+        entry = self._providers.get(provider_id)
+        if entry is None:
+            raise McpPoolError(f"No MCP server registered for '{provider_id}'")
+        async with entry.slots:
+            pooled = await self._acquire(provider_id, entry)
+            entry.leases[pooled] = entry.leases.get(pooled, 0) + 1
+            try:
+                assert pooled.session is not None
+                yield pooled.session
+            except BaseException as exc:
+                if transport_failed(pooled, exc):
+                    entry.mark_crashed(pooled)
+                raise
+            finally:
+                entry.leases[pooled] -= 1
+                if entry.leases[pooled] == 0:
+                    del entry.leases[pooled]
+                    if pooled.alive and self._providers.get(provider_id) is entry:
+                        pooled.last_used = time.monotonic()
+                        entry.idle.append(pooled)
+                    else:
+                        # Crashed, or the provider was re-registered while checked out
+                        pooled.close_nowait()
+
+    async def _acquire(self, provider_id: str, entry: _ProviderSessions) -> PooledSession:
+        while entry.idle:
+            pooled = entry.idle.pop()
+            if pooled.alive:
+                return pooled
+            entry.mark_crashed(pooled)
+        # Join the least-loaded checked-out session with room before paying for a new subprocess
+        shared = [
+            pooled for pooled, calls in entry.leases.items()
+            if calls < entry.session_concurrency and pooled.alive
+        ]
+        if shared:
+            return min(shared, key=entry.leases.__getitem__)
+        return await self._spawn(provider_id, entry)
+
+    async def _spawn(self, provider_id: str, entry: _ProviderSessions) -> PooledSession:
+        pooled = PooledSession(provider_id, entry.params, self.call_timeout)
+        await pooled.start(self.start_timeout)
+        entry.spawned += 1
+        if entry.restart_pending:
+            entry.restart_pending = False
+            if self.on_restart is not None:
+                self.on_restart(provider_id)
+        return pooled
+
+    async def _refill(self) -> None:
+        async def warm(provider_id: str, entry: _ProviderSessions) -> None:
+            missing = min(self.min_idle, entry.size) - entry.live
+            for _ in range(max(missing, 0)):
+                try:
+                    pooled = await self._spawn(provider_id, entry)
+                except McpPoolError as exc:
+                    print(f"MCP pool could not warm {provider_id}: {exc}")
+                    return
+                if self._providers.get(provider_id) is entry:
+                    entry.idle.append(pooled)
+                else:
+                    pooled.close_nowait()
+
+        await asyncio.gather(*(warm(pid, entry) for pid, entry in list(self._providers.items())))
+
+    async def _reap_once(self) -> None:
+        now = time.monotonic()
+        for entry in list(self._providers.values()):
+            keep: List[PooledSession] = []
+            # Most recently used sessions sit at the end of the idle list.
+            for pooled in reversed(entry.idle):
+                if not pooled.alive:
+                    entry.mark_crashed(pooled)
+                elif len(keep) >= self.min_idle and now - pooled.last_used > self.idle_seconds:
+                    pooled.close_nowait()
+                else:
+                    keep.append(pooled)
+            entry.idle[:] = list(reversed(keep))
+        await self._ping_idle()
+        await self._refill()
+
+    async def _ping_idle(self) -> None:
+        # Sessions stay in the idle list while pinged, so checkouts meanwhile still find them
+        # instead of spawning; a ping can share the connection with a call that took one.
+        async def ping(entry: _ProviderSessions, pooled: PooledSession) -> None:
+            try:
+                if pooled.session is None:
+                    raise McpPoolError("session closed")
+                await asyncio.wait_for(pooled.session.send_ping(), 5.0)
+            except Exception:
+                if pooled in entry.idle:
+                    entry.idle.remove(pooled)
+                entry.mark_crashed(pooled)
+
+        checks = []
+        for entry in self._providers.values():
+            checks.extend(ping(entry, pooled) for pooled in list(entry.idle))
+        await asyncio.gather(*checks)
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self._reap_once()
+            except Exception as exc:
+                print(f"MCP pool reaper error: {exc}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            provider_id: {
+                "size": entry.size,
+                "session_concurrency": entry.session_concurrency,
+                "idle": len(entry.idle),
+                "busy": entry.busy,
+                "in_flight": sum(entry.leases.values()),
+                "spawned": entry.spawned,
+                "crashed": entry.crashed,
+            }
+            for provider_id, entry in self._providers.items()
+        }
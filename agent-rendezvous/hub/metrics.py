@@ -0,0 +1,305 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Seconds; from in-process tool calls (~1 ms) up to slow LLM completions and cold spawns
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """A metric family with a fixed set of label names; children are created on first use.
+
+    Children are looked up by label tuple in a dict, and each update takes one
+    uncontended lock, so recording costs about a microsecond.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child: Any) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"]
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, values: Tuple[str, ...], child: _HistogramValue) -> List[str]:
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            le = 'le="' + _number(bound) + '"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}")
+        label_text = _labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{label_text} {_number(total)}")
+        lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metric families rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+PHASE_SECONDS = METRICS.histogram(
+    "agentbridge_phase_duration_seconds",
+    "Time spent per provider in each phase (spawn, initialize, list_tools, call_tool, http_intent, "
+    "http_a2a, spoonos_spawn, spoonos_call).",
+    ("provider", "phase"),
+)
+PHASE_TOTAL = METRICS.counter(
+    "agentbridge_phase_total",
+    "Completed phases per provider by outcome (ok, error, timeout, cancelled).",
+    ("provider", "phase", "outcome"),
+)
+PHASE_IN_FLIGHT = METRICS.gauge(
+    "agentbridge_phase_in_flight",
+    "Phases currently running per provider.",
+    ("provider", "phase"),
+)
+BID_ROUNDS = METRICS.counter(
+    "agentbridge_bid_rounds_total",
+    "Bid rounds by how bidding closed (complete, deadline, quorum).",
+    ("closed_by",),
+)
+BID_ROUND_SECONDS = METRICS.histogram(
+    "agentbridge_bid_round_duration_seconds",
+    "Time from opening a bid round to closing it.",
+)
+BIDS = METRICS.counter(
+    "agentbridge_bids_total",
+    "Bids per provider by outcome (received, failed, late, cached).",
+    ("provider", "outcome"),
+)
+EXECUTION_ATTEMPTS = METRICS.counter(
+    "agentbridge_execution_attempts_total",
+    "Execution attempts per provider by kind (primary, hedge, fallback) and outcome (won, failed, cancelled).",
+    ("provider", "kind", "outcome"),
+)
+REQUEST_SECONDS = METRICS.histogram(
+    "agentbridge_request_duration_seconds",
+    "Hub HTTP request latency per route, up to the response headers.",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = METRICS.gauge(
+    "agentbridge_requests_in_flight",
+    "Hub HTTP requests currently being handled.",
+)
+
+TIMEOUT_ERRORS = (asyncio.TimeoutError, httpx.TimeoutException)
+
+
+def outcome_of(exc: Optional[BaseException]) -> str:
+    if exc is None:
+        return "ok"
+    if isinstance(exc, asyncio.CancelledError):
+        return "cancelled"
+    if isinstance(exc, TIMEOUT_ERRORS):
+        return "timeout"
+    return "error"
+
+
+def observe_phase(provider: str, phase: str, seconds: float, outcome: str = "ok") -> None:
+    PHASE_SECONDS.labels(provider, phase).observe(seconds)
+    PHASE_TOTAL.labels(provider, phase, outcome).inc()
+
+
+class track:
+    """Time a provider phase, counting it in flight while it runs.
+
+    ``with track(provider_id, "call_tool"):`` records the duration and an outcome
+    derived from the exception, if any; set ``outcome`` inside the block to
+    report a failure that did not raise (e.g. a non-200 response). Cancelled
+    phases are counted but left out of the histogram.
+    """
+
+    __slots__ = ("provider", "phase", "outcome", "_start", "_in_flight")
+
+    def __init__(self, provider: str, phase: str):
+        self.provider = provider
+        self.phase = phase
+        self.outcome: Optional[str] = None
+
+    def __enter__(self) -> "track":
+        self._in_flight = PHASE_IN_FLIGHT.labels(self.provider, self.phase)
+        self._in_flight.inc()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        self._in_flight.dec()
+        outcome = outcome_of(exc) if exc is not None else (self.outcome or "ok")
+        if outcome == "cancelled":
+            PHASE_TOTAL.labels(self.provider, self.phase, outcome).inc()
+        else:
+            observe_phase(self.provider, self.phase, elapsed, outcome)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by route template, so path parameters do not add series."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                # The router has stored the matched route in the scope by now
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_SECONDS.labels(scope["method"], route, str(message["status"])).observe(
+                    time.perf_counter() - start
+                )
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.labels().inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.labels().dec()
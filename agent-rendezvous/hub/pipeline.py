@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# (inputs, outputs of finished stages) -> tool arguments, or None to skip the stage
+ArgBuilder = Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]
+# (stage, tool arguments, stage budget in ms) -> (tool output text, execution details)
+StageRunner = Callable[["Stage", Dict[str, Any], int], Awaitable[Tuple[str, Dict[str, Any]]]]
+
+
+@dataclass
+class Stage:
+    """One step of a pipeline, executed on the best-scoring of ``providers``."""
+
+    name: str
+    providers: List[str]
+    build_args: ArgBuilder
+    depends_on: Tuple[str, ...] = ()
+    sla_share: float = 0.2
+    parse: Callable[[str], Any] = str
+    # Field of a structured (non-MCP) result's data that holds the stage output
+    result_key: Optional[str] = None
+    # Dependents still run when an optional stage fails
+    optional: bool = False
+
+
+@dataclass
+class StageRecord:
+    name: str
+    status: str = "pending"
+    agent: Optional[str] = None
+    started_ms: Optional[int] = None
+    elapsed_ms: Optional[int] = None
+    budget_ms: Optional[int] = None
+    cost_usd: float = 0.0
+    error: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+class Pipeline:
+    """DAG of stages; each starts once its dependencies finish, independent ones run concurrently.
+
+    Stage outputs are parsed and kept in memory for later stages' argument
+    builders. When a stage starts it gets a slice of the time left, in the
+    ratio of its ``sla_share`` to the shares of the stages that still have to
+    run after it, so time saved by fast or skipped stages flows downstream.
+    """
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = stages
+        names = {s.name for s in stages}
+        seen: set = set()
+        for stage in stages:
+            missing = [d for d in stage.depends_on if d not in names]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+            if any(d not in seen for d in stage.depends_on):
+                raise ValueError(f"Stage '{stage.name}' must come after its dependencies")
+            seen.add(stage.name)
+        # Sum of sla_share over each stage and everything downstream of it
+        self._path_share: Dict[str, float] = {}
+        for stage in reversed(stages):
+            downstream = self._descendants(stage.name)
+            self._path_share[stage.name] = stage.sla_share + sum(
+                s.sla_share for s in stages if s.name in downstream
+            )
+
+    def _descendants(self, name: str) -> set:
+        found: set = set()
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for stage in self.stages:
+                if current in stage.depends_on and stage.name not in found:
+                    found.add(stage.name)
+                    frontier.append(stage.name)
+        return found
+
+    async def run(
+        self, inputs: Dict[str, Any], budget_ms: int, run_stage: StageRunner
+    ) -> Tuple[Dict[str, Any], Dict[str, StageRecord]]:
+        t0 = time.perf_counter()
+        deadline = t0 + budget_ms / 1000.0
+        outputs: Dict[str, Any] = {}
+        records = {stage.name: StageRecord(stage.name) for stage in self.stages}
+        optional = {stage.name for stage in self.stages if stage.optional}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def elapsed_ms() -> int:
+            return int((time.perf_counter() - t0) * 1000)
+
+        async def run_one(stage: Stage) -> None:
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[d] for d in stage.depends_on))
+            record = records[stage.name]
+            blocked = [
+                d for d in stage.depends_on
+                if records[d].status in ("failed", "blocked") and d not in optional
+            ]
+            if blocked:
+                record.status = "blocked"
+                record.error = f"Blocked by {', '.join(blocked)}"
+                return
+            args = stage.build_args(inputs, outputs)
+            if args is None:
+                record.status = "skipped"
+                return
+            remaining_ms = int((deadline - time.perf_counter()) * 1000)
+            record.budget_ms = int(remaining_ms * stage.sla_share / self._path_share[stage.name])
+            record.started_ms = elapsed_ms()
+            if record.budget_ms <= 0:
+                record.status = "failed"
+                record.error = "SLA budget exhausted"
+                return
+            try:
+                text, details = await asyncio.wait_for(
+                    run_stage(stage, args, record.budget_ms), timeout=record.budget_ms / 1000.0
+                )
+                outputs[stage.name] = stage.parse(text)
+                record.status = "ok"
+                record.agent = details.get("agent")
+                record.cost_usd = details.get("cost_usd", 0.0)
+                record.details = details
+            except asyncio.TimeoutError:
+                record.status = "failed"
+                record.error = f"Timed out after {record.budget_ms} ms"
+            except Exception as e:
+                record.status = "failed"
+                record.error = str(getattr(e, "detail", None) or e)
+            finally:
+                record.elapsed_ms = elapsed_ms() - record.started_ms
+
+        for stage in self.stages:
+            tasks[stage.name] = asyncio.create_task(run_one(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return outputs, records
+
+
+def _parse_json(text: str) -> Dict[str, Any]:
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _localize(value: str, tz: str) -> str:
+    """Attach ``tz`` to a naive ISO timestamp; anything else is returned unchanged."""
+    try:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=ZoneInfo(tz)).isoformat()
+    except (ValueError, KeyError):
+        pass
+    return value
+
+
+def finalize_event(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized event with the resolved timezone applied to naive start/end times."""
+    event = dict(outputs.get("normalize") or {})
+    tz = outputs.get("timezone") or inputs.get("timezone")
+    if tz:
+        event["timezone"] = tz
+        for key in ("start", "end"):
+            if event.get(key):
+                event[key] = _localize(event[key], tz)
+    return event
+
+
+def _ocr_args(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return {"image_path": inputs["image_path"]} if inputs.get("image_path") else None
+
+
+def _extract_args(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    text = outputs.get("ocr") or inputs.get("text")
+    return {"text": text} if text else None
+
+
+def _normalize_args(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    event = dict(outputs.get("extract") or {})
+    # Fields the client already knows fill gaps the extractor left
+    for key in ("title", "start", "end", "location"):
+        if inputs.get(key) and not event.get(key):
+            event[key] = inputs[key]
+    return {"data": json.dumps(event)} if event else None
+
+
+def _timezone_args(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if inputs.get("timezone") or not inputs.get("location"):
+        return None
+    return {"location": inputs["location"]}
+
+
+def _validate_args(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return {"event_json": json.dumps(finalize_event(inputs, outputs))}
+
+
+def _ics_args(inputs: Dict[str, Any], outputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if outputs.get("validate") != "Valid":
+        return None
+    return {"event_data": json.dumps(finalize_event(inputs, outputs))}
+
+
+# OCR -> regex extract -> normalize, timezone resolution alongside, then validate -> ICS
+EXTRACT_EVENT_PIPELINE = Pipeline("extract_event", [
+    Stage("ocr", ["ocr-generic"], _ocr_args, sla_share=0.3, optional=True),
+    Stage("timezone", ["timezone-resolver"], _timezone_args, sla_share=0.3, parse=str.strip, optional=True,
+          result_key="timezone"),
+    Stage("extract", ["poster-ocr-regex"], _extract_args, ("ocr",), sla_share=0.15, parse=_parse_json),
+    Stage("normalize", ["event-normalizer"], _normalize_args, ("extract",), sla_share=0.1, parse=_parse_json),
+    Stage("validate", ["event-validator"], _validate_args, ("normalize", "timezone"), sla_share=0.1, parse=str.strip),
+    Stage("ics", ["ics-builder"], _ics_args, ("validate",), sla_share=0.15, result_key="ics"),
+])
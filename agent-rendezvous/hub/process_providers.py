@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolResult
+
+from inproc import InprocError, error_result, import_provider, resolve_script, to_call_result
+from worker_pool import WorkerPool
+
+# The provider's FastMCP server inside a worker process
+_SERVER: Optional[FastMCP] = None
+
+
+def _warm_worker(provider_id: str, script: str, env: Dict[str, str]) -> None:
+    """Worker initializer: import the provider script, and with it its heavy dependencies."""
+    global _SERVER
+    # The worker process belongs to this provider, so its env stays in effect for tool calls too
+    os.environ.update(env)
+    _SERVER = import_provider(f"worker_{provider_id.replace('-', '_')}", Path(script), {})
+
+
+def _worker_list_tools() -> List[str]:
+    return [tool.name for tool in asyncio.run(_SERVER.list_tools())]
+
+
+def _worker_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    # A worker runs one call at a time, so the public API may block it even for synchronous tools
+    try:
+        result = to_call_result(asyncio.run(_SERVER.call_tool(name, arguments)))
+    except Exception as e:
+        result = error_result(e)
+    return result.model_dump(by_alias=True, exclude_none=True)
+
+
+@dataclass
+class _PooledProvider:
+    script: Path
+    pool: WorkerPool
+    error: Optional[str] = None
+    loading: Optional[asyncio.Task] = None
+    load_ms: Optional[int] = None
+    calls: int = 0
+    errors: int = 0
+    tools: List[str] = field(default_factory=list)
+
+
+class ProcessProviders:
+    """FastMCP providers run in pools of pre-warmed worker processes.
+
+    For CPU-bound tools that hold the GIL (OCR, date parsing): each provider gets
+    a ``WorkerPool`` whose workers import the script once, and tool calls go to
+    the least-loaded worker, so a provider handles as many calls at once as it
+    has workers. Results are converted exactly as in ``InprocProviders``.
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, _PooledProvider] = {}
+
+    def register(
+        self,
+        provider_id: str,
+        args: List[str],
+        env: Optional[Dict[str, str]] = None,
+        size: Optional[int] = None,
+    ) -> bool:
+        """Register a provider script; returns False if ``args`` name no Python script."""
+
+        script = resolve_script(args)
+        if script is None:
+            return False
+        pool = WorkerPool(
+            provider_id,
+            size=size,
+            initializer=_warm_worker,
+            initargs=(provider_id, str(script), dict(env or {})),
+        )
+        self._providers[provider_id] = _PooledProvider(script=script, pool=pool)
+        return True
+
+    def __contains__(self, provider_id: str) -> bool:
+        return provider_id in self._providers
+
+    def ids(self) -> List[str]:
+        return list(self._providers)
+
+    async def load(self, provider_id: str) -> bool:
+        """Start the provider's workers once; False if they could not start."""
+
+        entry = self._providers.get(provider_id)
+        if entry is None:
+            return False
+        if entry.loading is None:
+            entry.loading = asyncio.ensure_future(self._load(provider_id, entry))
+        await asyncio.shield(entry.loading)
+        return entry.error is None
+
+    async def _load(self, provider_id: str, entry: _PooledProvider) -> None:
+        t0 = time.perf_counter()
+        try:
+            await entry.pool.start_async()
+            entry.tools = await entry.pool.run(_worker_list_tools)
+        except Exception as e:
+            entry.error = f"{type(e).__name__}: {e}"
+            entry.pool.close()
+            print(f"Could not start worker pool for {provider_id}: {entry.error}")
+        entry.load_ms = int((time.perf_counter() - t0) * 1000)
+
+    async def list_tools(self, provider_id: str) -> List[str]:
+        if not await self.load(provider_id):
+            raise InprocError(f"Provider '{provider_id}' has no workers: {self._providers[provider_id].error}")
+        return list(self._providers[provider_id].tools)
+
+    async def call_tool(self, provider_id: str, name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Call a tool on a worker, returning what the provider would have returned over stdio."""
+
+        if not await self.load(provider_id):
+            raise InprocError(f"Provider '{provider_id}' has no workers: {self._providers[provider_id].error}")
+        entry = self._providers[provider_id]
+        entry.calls += 1
+        try:
+            result = CallToolResult.model_validate(await entry.pool.run(_worker_call, name, arguments))
+        except Exception:
+            entry.errors += 1
+            raise
+        if result.isError:
+            entry.errors += 1
+        return result
+
+    def close(self) -> None:
+        for entry in self._providers.values():
+            entry.pool.close()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            provider_id: {
+                "script": str(entry.script),
+                "loaded": entry.loading is not None and entry.loading.done() and entry.error is None,
+                "load_ms": entry.load_ms,
+                "error": entry.error,
+                "tools": entry.tools,
+                "calls": entry.calls,
+                "errors": entry.errors,
+                "pool": entry.pool.stats(),
+            }
+            for provider_id, entry in self._providers.items()
+        }
@@ -0,0 +1,86 @@
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+
+class ProviderRegistry:
+    """Provider records with id, URL and goal indexes.
+
+    The goal index is derived from the goal-to-agent capability mapping, so
+    selecting providers for an intent costs time proportional to the eligible
+    providers rather than to every registered one. All mutations go through
+    ``add``/``register_url`` under a lock so the indexes never disagree.
+    """
+
+    def __init__(self, goal_capabilities: Dict[str, List[str]]):
+        self._aligned: Dict[str, FrozenSet[str]] = {
+            goal: frozenset(ids) for goal, ids in goal_capabilities.items()
+        }
+        self._goals_by_id: Dict[str, List[str]] = {}
+        for goal, ids in goal_capabilities.items():
+            for provider_id in ids:
+                self._goals_by_id.setdefault(provider_id, []).append(goal)
+        self._providers: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_url: Dict[str, Dict[str, Any]] = {}
+        self._by_goal: Dict[str, List[Dict[str, Any]]] = {goal: [] for goal in goal_capabilities}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+    def all(self) -> List[Dict[str, Any]]:
+        return self._providers
+
+    def get(self, provider_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(provider_id)
+
+    def by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        return self._by_url.get(url)
+
+    def aligned_ids(self, goal: str) -> Optional[FrozenSet[str]]:
+        """Provider ids mapped to ``goal``, or None when the goal is unmapped."""
+        return self._aligned.get(goal)
+
+    def is_aligned(self, goal: str, provider_id: str) -> bool:
+        aligned = self._aligned.get(goal)
+        return aligned is None or provider_id in aligned
+
+    def eligible(self, goal: str) -> List[Dict[str, Any]]:
+        """Providers mapped to ``goal``; every provider if the goal is unmapped or none are loaded."""
+        return self._by_goal.get(goal) or self._providers
+
+    def add(self, provider: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._index(provider)
+        return provider
+
+    def register_url(self, name: str, url: str) -> Tuple[str, Dict[str, Any]]:
+        """Add an HTTP provider or rename the one already registered at ``url``."""
+        with self._lock:
+            existing = self._by_url.get(url)
+            if existing is not None:
+                existing["name"] = name
+                return "updated", existing
+            new_id = f"agent-{len(self._providers) + 1}"
+            while new_id in self._by_id:
+                new_id = f"{new_id}-1"
+            provider = {"id": new_id, "name": name, "url": url}
+            self._index(provider)
+            return "registered", provider
+
+    def _index(self, provider: Dict[str, Any]) -> None:
+        provider_id = provider["id"]
+        previous = self._by_id.get(provider_id)
+        if previous is not None:
+            self._providers.remove(previous)
+            for members in self._by_goal.values():
+                if previous in members:
+                    members.remove(previous)
+            if self._by_url.get(previous.get("url")) is previous:
+                del self._by_url[previous["url"]]
+        self._providers.append(provider)
+        self._by_id[provider_id] = provider
+        if provider.get("url") and provider["url"] != "stdio":
+            self._by_url[provider["url"]] = provider
+        for goal in self._goals_by_id.get(provider_id, []):
+            self._by_goal[goal].append(provider)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from cache import TTLCache
+
+PRUNE_EVERY = 100
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Content-addressed cache of deterministic tool results.
+
+    Keys hash the provider, tool name and canonical arguments; arguments that
+    name a file are keyed by a hash of the file contents, so re-submitting the
+    same image under another path still hits. Lookups go through a bounded
+    in-memory LRU+TTL tier, then an optional sqlite tier (``RESULT_CACHE_PATH``)
+    that survives restarts. Cached values are shared and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        path: Optional[str] = None,
+        disk_max_entries: Optional[int] = None,
+    ):
+        self.ttl_seconds = ttl_seconds or float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+        self._memory = TTLCache(
+            maxsize=maxsize or int(os.getenv("RESULT_CACHE_SIZE", "1024")),
+            ttl_seconds=self.ttl_seconds,
+        )
+        # Digest per (path, size, mtime) so unchanged files are not re-read on every lookup
+        self._file_digests = TTLCache(maxsize=4096, ttl_seconds=self.ttl_seconds)
+        self.path = path if path is not None else os.getenv("RESULT_CACHE_PATH")
+        self.disk_max_entries = disk_max_entries or int(os.getenv("RESULT_CACHE_DISK_MAX_ENTRIES", "10000"))
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        if self.path:
+            self._open_db()
+
+    def _open_db(self) -> None:
+        try:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS results_expires ON results (expires_at)")
+            self._db = db
+        except sqlite3.Error as e:
+            print(f"Result cache disk tier disabled ({self.path}): {e}")
+            self._db = None
+
+    def key(
+        self,
+        provider_id: str,
+        tool: str,
+        args: Dict[str, Any],
+        file_args: Iterable[str] = (),
+    ) -> Optional[str]:
+        """Cache key for a tool call, or None if a file argument cannot be read."""
+
+        canonical: Dict[str, Any] = dict(args)
+        for name in file_args:
+            value = canonical.get(name)
+            if not value:
+                continue
+            try:
+                st = os.stat(value)
+                stamp = (value, st.st_size, st.st_mtime_ns)
+                digest = self._file_digests.get(stamp)
+                if digest is None:
+                    digest = file_digest(value)
+                    self._file_digests.set(stamp, digest)
+            except OSError:
+                return None
+            canonical[name] = {"sha256": digest}
+        payload = json.dumps(
+            {"provider": provider_id, "tool": tool, "args": canonical},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._memory.get(key)
+        if value is not None:
+            self.stats_counters["memory_hits"] += 1
+            return value
+        if self._db is not None:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None and row[1] > time.time():
+                value = json.loads(row[0])
+                self._memory.set(key, value, ttl_seconds=row[1] - time.time())
+                self.stats_counters["disk_hits"] += 1
+                return value
+        self.stats_counters["misses"] += 1
+        return None
+
+    def set(self, key: str, provider_id: str, value: Any) -> None:
+        self._memory.set(key, value)
+        self.stats_counters["stores"] += 1
+        if self._db is None:
+            return
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, provider, value, expires_at) VALUES (?, ?, ?, ?)",
+                (key, provider_id, encoded, time.time() + self.ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune()
+
+    def _prune(self) -> None:
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        excess = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.disk_max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY expires_at LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        disk_entries = None
+        if self._db is not None:
+            with self._lock:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            **self.stats_counters,
+            "memory": self._memory.stats(),
+            "disk_path": self.path,
+            "disk_entries": disk_entries,
+        }
@@ -1,30 +1,248 @@
+import asyncio
+import hashlib
+import json
 import os
-from typing import Any, Dict, Optional
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
 import httpx
 
+from http_pool import create_http_client
+import metrics
+
 
 class SpoonOSClient:
-    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
         self.base = base_url or os.getenv("SPOONOS_API", "http://localhost:8080")
         self.key = api_key or os.getenv("SPOONOS_API_KEY", "dev")
         self.headers = {"Authorization": f"Bearer {self.key}"}
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # One keep-alive client per SpoonOS endpoint; created lazily and reused across calls
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client(
+                max_connections=int(os.getenv("SPOONOS_MAX_CONNECTIONS", "50")),
+                per_host=int(os.getenv("SPOONOS_MAX_CONNECTIONS", "50")),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def spawn(self, manifest: Dict[str, Any]) -> str:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            r = await client.post(f"{self.base}/v1/sandboxes", json=manifest, headers=self.headers)
-            r.raise_for_status()
-            data = r.json()
-            return data.get("id") or data.get("sandboxId") or data.get("sandbox_id")
+        r = await self.client.post(f"{self.base}/v1/sandboxes", json=manifest, headers=self.headers, timeout=5.0)
+        r.raise_for_status()
+        data = r.json()
+        return data.get("id") or data.get("sandboxId") or data.get("sandbox_id")
 
     async def call_json(self, sandbox_id: str, route: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.post(
-                f"{self.base}/v1/sandboxes/{sandbox_id}/call",
-                json={"route": route, "input": payload},
-                headers=self.headers,
-            )
+        r = await self.client.post(
+            f"{self.base}/v1/sandboxes/{sandbox_id}/call",
+            json={"route": route, "input": payload},
+            headers=self.headers,
+            timeout=10.0,
+        )
+        r.raise_for_status()
+        return r.json()
+
+    async def destroy(self, sandbox_id: str) -> None:
+        try:
+            r = await self.client.delete(f"{self.base}/v1/sandboxes/{sandbox_id}", headers=self.headers, timeout=5.0)
             r.raise_for_status()
-            return r.json()
+        except httpx.HTTPError as e:
+            print(f"SpoonOS destroy failed for {sandbox_id}: {e}")
 
     def logs_url(self, sandbox_id: str) -> str:
-        return f"{self.base}/v1/sandboxes/{sandbox_id}/logs"
\ No newline at end of file
+        return f"{self.base}/v1/sandboxes/{sandbox_id}/logs"
+
+
+REFILL_BACKOFF_SECONDS = 30.0
+
+
+def manifest_key(manifest: Dict[str, Any]) -> str:
+    """Stable key for a manifest so equal manifests share warm sandboxes."""
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()[:16]
+
+
+@dataclass
+class _Sandbox:
+    id: str
+    created_at: float
+    expires_at: Optional[float]
+    last_used: float
+
+    def expired(self, now: float, idle_seconds: float) -> bool:
+        if self.expires_at is not None and now >= self.expires_at:
+            return True
+        return now - self.last_used > idle_seconds
+
+
+@dataclass
+class _ManifestPool:
+    manifest: Dict[str, Any]
+    size: int
+    idle: List[_Sandbox] = field(default_factory=list)
+    leased: int = 0
+    spawned: int = 0
+    hits: int = 0
+    misses: int = 0
+    evicted: int = 0
+    refilling: Optional[asyncio.Task] = None
+    retry_after: float = 0.0
+
+
+class SandboxPool:
+    """Warm pool of pre-spawned SpoonOS sandboxes keyed by manifest.
+
+    ``lease()`` hands out an idle sandbox for one proposal or execute call and
+    spawns one only when none is warm. Sandboxes are discarded when the call
+    fails, when they sit idle longer than ``idle_seconds`` or when the
+    manifest's ``resources.timeout_ms`` lifetime has passed; the pool then
+    refills to ``size`` in the background.
+    """
+
+    def __init__(
+        self,
+        client: SpoonOSClient,
+        size: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        refill_interval: float = 5.0,
+    ):
+        self.client = client
+        self.size = size if size is not None else int(os.getenv("SPOONOS_POOL_SIZE", "2"))
+        self.idle_seconds = idle_seconds or float(os.getenv("SPOONOS_POOL_IDLE_SECONDS", "120"))
+        self.refill_interval = refill_interval
+        self._pools: Dict[str, _ManifestPool] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def register(self, manifest: Dict[str, Any], size: Optional[int] = None) -> str:
+        key = manifest_key(manifest)
+        if key not in self._pools:
+            self._pools[key] = _ManifestPool(manifest=manifest, size=self.size if size is None else size)
+        return key
+
+    async def start(self) -> None:
+        await asyncio.gather(*(self._refill(pool) for pool in self._pools.values()))
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._maintain_loop())
+
+    async def close(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+        doomed = []
+        for pool in self._pools.values():
+            if pool.refilling is not None:
+                pool.refilling.cancel()
+            doomed.extend(sb.id for sb in pool.idle)
+            pool.idle.clear()
+        await asyncio.gather(*(self.client.destroy(sid) for sid in doomed), return_exceptions=True)
+
+    @asynccontextmanager
+    async def lease(self, manifest: Dict[str, Any]) -> AsyncIterator[str]:
+        """Lease a sandbox id; it returns to the pool only if the block succeeds."""
+        pool = self._pools[self.register(manifest)]
+        sandbox = self._take_idle(pool)
+        if sandbox is None:
+            pool.misses += 1
+            sandbox = await self._spawn(pool)
+        else:
+            pool.hits += 1
+        pool.leased += 1
+        healthy = False
+        try:
+            yield sandbox.id
+            healthy = True
+        finally:
+            pool.leased -= 1
+            now = time.monotonic()
+            sandbox.last_used = now
+            if healthy and not sandbox.expired(now, self.idle_seconds) and len(pool.idle) < pool.size:
+                pool.idle.append(sandbox)
+            else:
+                pool.evicted += 1
+                asyncio.create_task(self.client.destroy(sandbox.id))
+            self._schedule_refill(pool)
+
+    def _take_idle(self, pool: _ManifestPool) -> Optional[_Sandbox]:
+        now = time.monotonic()
+        while pool.idle:
+            sandbox = pool.idle.pop()
+            if not sandbox.expired(now, self.idle_seconds):
+                return sandbox
+            pool.evicted += 1
+            asyncio.create_task(self.client.destroy(sandbox.id))
+        return None
+
+    async def _spawn(self, pool: _ManifestPool) -> _Sandbox:
+        with metrics.track(pool.manifest.get("name") or "unknown", "spoonos_spawn"):
+            sandbox_id = await self.client.spawn(pool.manifest)
+        now = time.monotonic()
+        timeout_ms = (pool.manifest.get("resources") or {}).get("timeout_ms")
+        pool.spawned += 1
+        return _Sandbox(
+            id=sandbox_id,
+            created_at=now,
+            expires_at=now + timeout_ms / 1000.0 if timeout_ms else None,
+            last_used=now,
+        )
+
+    async def _refill(self, pool: _ManifestPool) -> None:
+        while len(pool.idle) + pool.leased < pool.size:
+            try:
+                sandbox = await self._spawn(pool)
+            except Exception as e:
+                print(f"SpoonOS pool could not warm {pool.manifest.get('name')}: {e}")
+                pool.retry_after = time.monotonic() + REFILL_BACKOFF_SECONDS
+                return
+            pool.idle.append(sandbox)
+
+    def _schedule_refill(self, pool: _ManifestPool) -> None:
+        if time.monotonic() < pool.retry_after:
+            return
+        if pool.refilling is None or pool.refilling.done():
+            pool.refilling = asyncio.create_task(self._refill(pool))
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for pool in self._pools.values():
+            keep = []
+            for sandbox in pool.idle:
+                if sandbox.expired(now, self.idle_seconds):
+                    pool.evicted += 1
+                    asyncio.create_task(self.client.destroy(sandbox.id))
+                else:
+                    keep.append(sandbox)
+            pool.idle[:] = keep
+
+    async def _maintain_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refill_interval)
+            self._evict_expired()
+            for pool in self._pools.values():
+                self._schedule_refill(pool)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: {
+                "name": pool.manifest.get("name"),
+                "size": pool.size,
+                "idle": len(pool.idle),
+                "leased": pool.leased,
+                "spawned": pool.spawned,
+                "hits": pool.hits,
+                "misses": pool.misses,
+                "evicted": pool.evicted,
+            }
+            for key, pool in self._pools.items()
+        }
\ No newline at end of file
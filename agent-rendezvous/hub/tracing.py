@@ -0,0 +1,238 @@
+import asyncio
+import heapq
+import os
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# Large /jobs batches open a span per intent and bid; spans past this cap are counted, not kept
+MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "10000"))
+
+
+class Span:
+    """A timed step of a request; start and end are monotonic, in ms since the trace started."""
+
+    __slots__ = ("name", "trace", "attrs", "children", "events", "start_ms", "end_ms", "status", "error")
+
+    def __init__(self, name: str, trace: "Trace", attrs: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.attrs = attrs
+        self.children: List["Span"] = []
+        # Instants recorded with event(): {"name", "at_ms", "attrs"}
+        self.events: List[Dict[str, Any]] = []
+        self.start_ms = trace.elapsed_ms()
+        self.end_ms: Optional[float] = None
+        self.status = "running"
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ms is None else round(self.end_ms - self.start_ms, 3)
+
+    def finish(self, exc: Optional[BaseException] = None) -> None:
+        self.end_ms = self.trace.elapsed_ms()
+        if exc is None:
+            self.status = "ok"
+        elif isinstance(exc, asyncio.CancelledError):
+            self.status = "cancelled"
+        else:
+            self.status = "error"
+            self.error = str(getattr(exc, "detail", None) or exc) or type(exc).__name__
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attrs": self.attrs,
+            "children": [child.to_dict() for child in self.children],
+        }
+        if self.events:
+            data["events"] = [
+                {"name": e["name"], "at_ms": round(e["at_ms"], 3), "attrs": e["attrs"]} for e in self.events
+            ]
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class Trace:
+    """Span tree of one hub request, identified by ``trace_id``."""
+
+    def __init__(self, kind: str, **attrs: Any):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.timestamp = int(time.time() * 1000)
+        self._t0 = time.perf_counter()
+        self.spans = 0
+        self.dropped_spans = 0
+        self.root = Span(kind, self, attrs)
+        # Response a request chooses to keep with its trace, e.g. /orchestrate's ranked proposals
+        self.result: Optional[Dict[str, Any]] = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms if self.root.end_ms is not None else round(self.elapsed_ms(), 3)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """Spans and recorded events below the root, depth first, as flat ``{"event": name, ...attrs}``
+        records with timings; an event has a ``duration_ms`` of 0."""
+        events: List[Dict[str, Any]] = []
+
+        def walk(span: Span, depth: int) -> None:
+            # Child spans and events in the order they started
+            items = sorted(
+                [(child.start_ms, child) for child in span.children] + [(e["at_ms"], e) for e in span.events],
+                key=lambda item: item[0],
+            )
+            for at_ms, item in items:
+                if isinstance(item, Span):
+                    events.append({
+                        "event": item.name,
+                        **item.attrs,
+                        "depth": depth,
+                        "start_ms": round(at_ms, 3),
+                        "duration_ms": item.duration_ms,
+                        "status": item.status,
+                    })
+                    walk(item, depth + 1)
+                else:
+                    events.append({
+                        "event": item["name"],
+                        **item["attrs"],
+                        "depth": depth,
+                        "start_ms": round(at_ms, 3),
+                        "duration_ms": 0,
+                        "status": "ok",
+                    })
+
+        walk(self.root, 0)
+        return events
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "kind": self.kind,
+            "timestamp": self.timestamp,
+            "duration_ms": self.duration_ms,
+            "status": self.root.status,
+            "spans": self.spans,
+            "dropped_spans": self.dropped_spans,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "root": self.root.to_dict()}
+
+
+CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class TraceStore:
+    """The last ``size`` finished traces, oldest dropped first, looked up by id or by duration."""
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or int(os.getenv("TRACE_BUFFER_SIZE", "1000"))
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self.recorded = 0
+
+    def add(self, trace: Trace) -> None:
+        self._traces[trace.trace_id] = trace
+        self.recorded += 1
+        while len(self._traces) > self.size:
+            self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return self._traces.get(trace_id)
+
+    def latest(self, kind: Optional[str] = None) -> Optional[Trace]:
+        for trace in reversed(self._traces.values()):
+            if kind is None or trace.kind == kind:
+                return trace
+        return None
+
+    def slowest(self, n: int = 10, kind: Optional[str] = None) -> List[Trace]:
+        traces = (t for t in self._traces.values() if kind is None or t.kind == kind)
+        return heapq.nlargest(n, traces, key=lambda t: t.duration_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": self.size, "stored": len(self._traces), "recorded": self.recorded}
+
+
+TRACES = TraceStore()
+
+
+class span:
+    """Record a child span of the current one (or of ``parent``) for the duration of the block.
+
+    Outside a trace this does nothing, so library code can open spans freely.
+    Tasks created inside the block inherit it as their parent span.
+    """
+
+    __slots__ = ("name", "attrs", "parent", "span", "_token")
+
+    def __init__(self, name: str, /, parent: Optional[Span] = None, **attrs: Any):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.span: Optional[Span] = None
+
+    def __enter__(self) -> Optional[Span]:
+        parent = self.parent or CURRENT_SPAN.get()
+        if parent is None:
+            return None
+        if parent.trace.spans >= MAX_SPANS:
+            parent.trace.dropped_spans += 1
+            return None
+        parent.trace.spans += 1
+        self.span = Span(self.name, parent.trace, self.attrs)
+        parent.children.append(self.span)
+        self._token = CURRENT_SPAN.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.span is None:
+            return
+        self.span.finish(exc)
+        CURRENT_SPAN.reset(self._token)
+
+
+class trace:
+    """Start a trace for a request, make its root the current span, and store it when the block exits."""
+
+    def __init__(self, kind: str, **attrs: Any):
+        self.trace = Trace(kind, **attrs)
+
+    def __enter__(self) -> Trace:
+        self._token = CURRENT_SPAN.set(self.trace.root)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        CURRENT_SPAN.reset(self._token)
+        finish(self.trace, exc)
+
+
+def finish(trace: Trace, exc: Optional[BaseException] = None) -> None:
+    """Close a trace's root span and store the trace."""
+    trace.root.finish(exc)
+    TRACES.add(trace)
+
+
+def event(name: str, /, **attrs: Any) -> None:
+    """Record an instant, such as a decision, on the current span, if there is one."""
+    current = CURRENT_SPAN.get()
+    if current is not None:
+        current.events.append({"name": name, "at_ms": current.trace.elapsed_ms(), "attrs": attrs})
+
+
+def annotate(**attrs: Any) -> None:
+    """Add attributes to the current span, if there is one."""
+    current = CURRENT_SPAN.get()
+    if current is not None:
+        current.attrs.update(attrs)
@@ -1,7 +1,11 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
-import re
 import json
-import dateparser
+import dates
 
 mcp = FastMCP("poster-ocr-regex")
 
@@ -12,10 +16,10 @@ def extract_event_regex(text: str) -> str:
     if lines:
         title = lines[0][:120]
     date_candidate = None
-    m = re.search(r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:,\s*\d{4})?(?:\s+\d{1,2}:\d{2}\s*(?:AM|PM))?", text, re.IGNORECASE)
+    m = dates.POSTER_DATE_RE.search(text)
     if m:
         date_candidate = m.group(0)
-    parsed = dateparser.parse(date_candidate or text, settings={"PREFER_DATES_FROM": "future"})
+    parsed = dates.parse_date(date_candidate or text, prefer_future=True)
     event = {
         "title": title or "",
         "start": parsed.isoformat() if parsed else "",
@@ -1,6 +1,6 @@
 from mcp.server.fastmcp import FastMCP
 import json
-from jsonschema import validate, Draft202012Validator
+from jsonschema import Draft202012Validator
 
 mcp = FastMCP("event-validator")
 
@@ -15,14 +15,51 @@ schema = {
     "required": ["title", "start"],
 }
 
+# Checked and compiled once; validators are safe to share between calls
+Draft202012Validator.check_schema(schema)
+VALIDATOR = Draft202012Validator(schema)
+
+
+def check_event(item) -> dict:
+    """All schema errors for one event (an object or its JSON text), plus the ``validate_event`` verdict."""
+    try:
+        data = json.loads(item) if isinstance(item, str) else item
+    except Exception as e:
+        return {"valid": False, "errors": [{"path": "$", "message": str(e)}], "result": f"Invalid: {str(e)}"}
+    errors = list(VALIDATOR.iter_errors(data))
+    return {
+        "valid": not errors,
+        "errors": [{"path": e.json_path, "message": e.message, "validator": e.validator} for e in errors],
+        # Same text as validate_event, which reports the first error
+        "result": f"Invalid: {str(errors[0])}" if errors else "Valid",
+    }
+
+
+def check_item(item) -> dict:
+    """``check_event`` with ``ok``, turning an unexpected failure into that item's error."""
+    try:
+        return {"ok": True, **check_event(item)}
+    except Exception as e:
+        return {"ok": False, "valid": False, "errors": [], "error": f"{type(e).__name__}: {e}"}
+
+
 @mcp.tool()
 def validate_event(event_json: str) -> str:
     try:
         data = json.loads(event_json)
-        Draft202012Validator(schema).validate(data)
+        VALIDATOR.validate(data)
         return "Valid"
     except Exception as e:
         return f"Invalid: {str(e)}"
 
+
+@mcp.tool()
+def validate_events(events_json: str) -> str:
+    """Validate a JSON array of events (objects or JSON strings); returns one result per item, in order."""
+    events = json.loads(events_json)
+    if not isinstance(events, list):
+        raise ValueError("events_json must be a JSON array")
+    return json.dumps([{"index": i, **check_item(item)} for i, item in enumerate(events)])
+
 if __name__ == "__main__":
     mcp.run()
@@ -1,8 +1,32 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
 from spoon_ai.tools.base import BaseTool
-from openai import OpenAI
-import os
+from openai import AsyncOpenAI
+from functools import lru_cache
 import asyncio
+import os
+from rate_limit import KeyedRateLimiter
+from completion_cache import DEFAULT_SYSTEM_PROMPT, CompletionCache, completion_key, completion_settings
+
+MODEL, TEMPERATURE = completion_settings("chatgpt")
+# Completions in flight at once in this process, across all callers
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+# Per API key; 0 disables rate limiting
+REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+
+CONCURRENCY = asyncio.Semaphore(MAX_CONCURRENCY)
+RATE_LIMITS = KeyedRateLimiter(REQUESTS_PER_MINUTE)
+COMPLETIONS = CompletionCache()
+
+
+@lru_cache(maxsize=None)
+def client(api_key: str) -> AsyncOpenAI:
+    # One long-lived client per key keeps its HTTP connections alive; OPENAI_BASE_URL is honoured
+    return AsyncOpenAI(api_key=api_key)
 
 
 class ChatGPTTool(BaseTool):
@@ -17,20 +41,28 @@ class ChatGPTTool(BaseTool):
         "required": ["prompt"],
     }
 
-    async def execute(self, prompt: str, system: str = "You are helpful") -> str:
+    async def execute(self, prompt: str, system: str = DEFAULT_SYSTEM_PROMPT) -> str:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             return "Missing OPENAI_API_KEY"
-        client = OpenAI(api_key=api_key)
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
-        return resp.choices[0].message.content or ""
+        key = completion_key("chatgpt", MODEL, system, prompt, TEMPERATURE)
+        cached = COMPLETIONS.get(key)
+        if cached is not None:
+            return cached
+        await RATE_LIMITS.acquire(api_key)
+        async with CONCURRENCY:
+            resp = await client(api_key).chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=TEMPERATURE,
+            )
+        text = resp.choices[0].message.content or ""
+        if text:
+            COMPLETIONS.set(key, "chatgpt", text)
+        return text
 
 
 mcp = FastMCP("chatgpt")
@@ -40,9 +72,9 @@ tool_instance = ChatGPTTool()
 
 
 @mcp.tool()
-def chat_complete(text: str, system: str = "You are helpful") -> str:
-    return asyncio.get_event_loop().run_until_complete(tool_instance.execute(prompt=text, system=system))
+async def chat_complete(text: str, system: str = DEFAULT_SYSTEM_PROMPT) -> str:
+    return await tool_instance.execute(prompt=text, system=system)
 
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
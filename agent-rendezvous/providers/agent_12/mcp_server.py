@@ -1,8 +1,41 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
 from spoon_ai.tools.base import BaseTool
-import google.generativeai as genai
-import os
+import httpx
 import asyncio
+import os
+from typing import Optional
+from rate_limit import KeyedRateLimiter
+from completion_cache import DEFAULT_SYSTEM_PROMPT, CompletionCache, completion_key, completion_settings
+
+MODEL, TEMPERATURE = completion_settings("gemini")
+BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
+TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+# Completions in flight at once in this process, across all callers
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+# Per API key; 0 disables rate limiting
+REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+
+CONCURRENCY = asyncio.Semaphore(MAX_CONCURRENCY)
+RATE_LIMITS = KeyedRateLimiter(REQUESTS_PER_MINUTE)
+COMPLETIONS = CompletionCache()
+_HTTP: Optional[httpx.AsyncClient] = None
+
+
+def http_client() -> httpx.AsyncClient:
+    """One keep-alive client for the process; the key is sent per request."""
+    global _HTTP
+    if _HTTP is None or _HTTP.is_closed:
+        _HTTP = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY),
+        )
+    return _HTTP
 
 
 class GeminiTool(BaseTool):
@@ -18,14 +51,33 @@ class GeminiTool(BaseTool):
         "required": ["prompt"],
     }
 
-    async def execute(self, prompt: str, system: str = "You are helpful", model: str = "gemini-1.5-flash") -> str:
+    async def execute(self, prompt: str, system: str = DEFAULT_SYSTEM_PROMPT, model: str = MODEL) -> str:
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             return "Missing GEMINI_API_KEY"
-        genai.configure(api_key=api_key)
-        m = genai.GenerativeModel(model, system_instruction=system)
-        resp = m.generate_content(prompt)
-        return getattr(resp, "text", "") or ""
+        key = completion_key("gemini", model, system, prompt, TEMPERATURE)
+        cached = COMPLETIONS.get(key)
+        if cached is not None:
+            return cached
+        # generateContent REST call; the google-generativeai SDK only offers async over gRPC
+        payload = {
+            "systemInstruction": {"parts": [{"text": system}]},
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+        }
+        await RATE_LIMITS.acquire(api_key)
+        async with CONCURRENCY:
+            resp = await http_client().post(
+                f"/v1beta/models/{model}:generateContent",
+                json=payload,
+                headers={"x-goog-api-key": api_key},
+            )
+        resp.raise_for_status()
+        candidates = resp.json().get("candidates") or []
+        parts = (candidates[0].get("content") or {}).get("parts", []) if candidates else []
+        text = "".join(p.get("text", "") for p in parts)
+        if text:
+            COMPLETIONS.set(key, "gemini", text)
+        return text
 
 
 mcp = FastMCP("gemini")
@@ -35,9 +87,9 @@ tool_instance = GeminiTool()
 
 
 @mcp.tool()
-def gemini_complete(text: str, system: str = "You are helpful") -> str:
-    return asyncio.get_event_loop().run_until_complete(tool_instance.execute(prompt=text, system=system))
+async def gemini_complete(text: str, system: str = DEFAULT_SYSTEM_PROMPT) -> str:
+    return await tool_instance.execute(prompt=text, system=system)
 
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
@@ -1,12 +1,16 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
-import dateparser
+import dates
 
 mcp = FastMCP("poster-ocr-dateparser")
 
 @mcp.tool()
 def parse_date(text: str) -> str:
-    d = dateparser.parse(text, settings={"PREFER_DATES_FROM": "future"})
-    return d.isoformat() if d else ""
+    return dates.to_iso(text, prefer_future=True)
 
 if __name__ == "__main__":
     mcp.run()
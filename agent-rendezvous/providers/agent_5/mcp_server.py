@@ -1,6 +1,11 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
 import json
-import dateparser
+import dates
 
 mcp = FastMCP("event-normalizer")
 
@@ -13,8 +18,8 @@ def normalize_event(data: str) -> str:
     title = (obj.get("title") or obj.get("name") or "").strip()
     start_raw = obj.get("start") or obj.get("date") or obj.get("start_time") or ""
     end_raw = obj.get("end") or obj.get("end_time") or ""
-    start = dateparser.parse(str(start_raw))
-    end = dateparser.parse(str(end_raw))
+    start = dates.parse_date(start_raw)
+    end = dates.parse_date(end_raw)
     norm = {
         "title": title,
         "start": start.isoformat() if start else "",
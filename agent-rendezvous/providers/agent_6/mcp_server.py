@@ -1,20 +1,210 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
 from geopy.geocoders import Nominatim
 from timezonefinder import TimezoneFinder
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import os
+import re
+import sqlite3
+import threading
+import time
+from cache import TTLCache
 
 mcp = FastMCP("timezone-resolver")
 
-@mcp.tool()
-def resolve_timezone(location: str) -> str:
-    geolocator = Nominatim(user_agent="agent-timezone-resolver")
+# Resolved locations are cached in memory and in sqlite; TZ_CACHE_PATH="" keeps them in memory only
+CACHE_PATH = os.getenv("TZ_CACHE_PATH", str(Path.home() / ".cache" / "agentbridge" / "timezones.sqlite"))
+CACHE_TTL_SECONDS = float(os.getenv("TZ_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Places the geocoder does not know are retried sooner
+NOT_FOUND_TTL_SECONDS = float(os.getenv("TZ_NOT_FOUND_TTL_SECONDS", str(24 * 3600)))
+GEOCODE_TIMEOUT = float(os.getenv("TZ_GEOCODE_TIMEOUT", "5"))
+USE_GAZETTEER = os.getenv("TZ_GAZETTEER", "1").lower() not in ("0", "false", "no")
+
+Resolved = Tuple[Optional[float], Optional[float], str]
+
+# name, region, country, lat, lng, tz
+_CITIES = [
+    ("San Francisco", "CA", "USA", 37.7749, -122.4194, "America/Los_Angeles"),
+    ("Santa Clara", "CA", "USA", 37.3541, -121.9552, "America/Los_Angeles"),
+    ("San Jose", "CA", "USA", 37.3382, -121.8863, "America/Los_Angeles"),
+    ("Palo Alto", "CA", "USA", 37.4419, -122.1430, "America/Los_Angeles"),
+    ("Mountain View", "CA", "USA", 37.3861, -122.0839, "America/Los_Angeles"),
+    ("Oakland", "CA", "USA", 37.8044, -122.2712, "America/Los_Angeles"),
+    ("Berkeley", "CA", "USA", 37.8715, -122.2730, "America/Los_Angeles"),
+    ("Los Angeles", "CA", "USA", 34.0522, -118.2437, "America/Los_Angeles"),
+    ("San Diego", "CA", "USA", 32.7157, -117.1611, "America/Los_Angeles"),
+    ("Seattle", "WA", "USA", 47.6062, -122.3321, "America/Los_Angeles"),
+    ("Portland", "OR", "USA", 45.5152, -122.6784, "America/Los_Angeles"),
+    ("Las Vegas", "NV", "USA", 36.1699, -115.1398, "America/Los_Angeles"),
+    ("Phoenix", "AZ", "USA", 33.4484, -112.0740, "America/Phoenix"),
+    ("Denver", "CO", "USA", 39.7392, -104.9903, "America/Denver"),
+    ("Austin", "TX", "USA", 30.2672, -97.7431, "America/Chicago"),
+    ("Dallas", "TX", "USA", 32.7767, -96.7970, "America/Chicago"),
+    ("Houston", "TX", "USA", 29.7604, -95.3698, "America/Chicago"),
+    ("Chicago", "IL", "USA", 41.8781, -87.6298, "America/Chicago"),
+    ("Atlanta", "GA", "USA", 33.7490, -84.3880, "America/New_York"),
+    ("Miami", "FL", "USA", 25.7617, -80.1918, "America/New_York"),
+    ("Washington", "DC", "USA", 38.9072, -77.0369, "America/New_York"),
+    ("New York", "NY", "USA", 40.7128, -74.0060, "America/New_York"),
+    ("Boston", "MA", "USA", 42.3601, -71.0589, "America/New_York"),
+    ("Toronto", "ON", "Canada", 43.6532, -79.3832, "America/Toronto"),
+    ("Vancouver", "BC", "Canada", 49.2827, -123.1207, "America/Vancouver"),
+    ("Mexico City", "", "Mexico", 19.4326, -99.1332, "America/Mexico_City"),
+    ("Sao Paulo", "", "Brazil", -23.5505, -46.6333, "America/Sao_Paulo"),
+    ("London", "", "UK", 51.5074, -0.1278, "Europe/London"),
+    ("Dublin", "", "Ireland", 53.3498, -6.2603, "Europe/Dublin"),
+    ("Paris", "", "France", 48.8566, 2.3522, "Europe/Paris"),
+    ("Berlin", "", "Germany", 52.5200, 13.4050, "Europe/Berlin"),
+    ("Amsterdam", "", "Netherlands", 52.3676, 4.9041, "Europe/Amsterdam"),
+    ("Madrid", "", "Spain", 40.4168, -3.7038, "Europe/Madrid"),
+    ("Zurich", "", "Switzerland", 47.3769, 8.5417, "Europe/Zurich"),
+    ("Stockholm", "", "Sweden", 59.3293, 18.0686, "Europe/Stockholm"),
+    ("Dubai", "", "UAE", 25.2048, 55.2708, "Asia/Dubai"),
+    ("Bangalore", "", "India", 12.9716, 77.5946, "Asia/Kolkata"),
+    ("Bengaluru", "", "India", 12.9716, 77.5946, "Asia/Kolkata"),
+    ("Mumbai", "", "India", 19.0760, 72.8777, "Asia/Kolkata"),
+    ("Hyderabad", "", "India", 17.3850, 78.4867, "Asia/Kolkata"),
+    ("Delhi", "", "India", 28.7041, 77.1025, "Asia/Kolkata"),
+    ("Singapore", "", "Singapore", 1.3521, 103.8198, "Asia/Singapore"),
+    ("Hong Kong", "", "China", 22.3193, 114.1694, "Asia/Hong_Kong"),
+    ("Shanghai", "", "China", 31.2304, 121.4737, "Asia/Shanghai"),
+    ("Beijing", "", "China", 39.9042, 116.4074, "Asia/Shanghai"),
+    ("Seoul", "", "South Korea", 37.5665, 126.9780, "Asia/Seoul"),
+    ("Tokyo", "", "Japan", 35.6762, 139.6503, "Asia/Tokyo"),
+    ("Sydney", "NSW", "Australia", -33.8688, 151.2093, "Australia/Sydney"),
+    ("Melbourne", "VIC", "Australia", -37.8136, 144.9631, "Australia/Melbourne"),
+]
+
+# Bare names other well-known places share (Paris, TX; Portland, ME; London, ON; ...). Only
+# their qualified forms ("Paris, France") are answered from the gazetteer.
+AMBIGUOUS_NAMES = frozenset({
+    "paris", "portland", "london", "dublin", "berlin", "washington", "delhi", "melbourne",
+    "vancouver", "austin", "miami", "atlanta", "boston", "hyderabad", "phoenix", "dallas",
+    "san jose", "oakland", "berkeley", "toronto", "sydney", "madrid", "amsterdam",
+})
+
+
+def normalize_location(location: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"\s*,\s*", ", ", location)).strip(" ,.").casefold()
+
+
+def _build_gazetteer() -> Tuple[Dict[str, Resolved], Dict[str, Resolved]]:
+    """Exact names only ("tokyo", "paris, france"), so "Paris, TX" still goes to the geocoder.
+
+    Returns the names answered directly, and the ambiguous bare names ("paris"), which
+    are only used when the geocoder cannot be reached.
+    """
+    gazetteer: Dict[str, Resolved] = {}
+    fallback: Dict[str, Resolved] = {}
+    for name, region, country, lat, lng, tz in _CITIES:
+        for suffix in ("", region, country, f"{region}, {country}" if region else ""):
+            key = normalize_location(f"{name}, {suffix}" if suffix else name)
+            target = fallback if key in AMBIGUOUS_NAMES else gazetteer
+            target.setdefault(key, (lat, lng, tz))
+    return gazetteer, fallback
+
+
+GAZETTEER, AMBIGUOUS_FALLBACK = _build_gazetteer() if USE_GAZETTEER else ({}, {})
+
+
+@lru_cache(maxsize=None)
+def geolocator() -> Nominatim:
+    return Nominatim(user_agent="agent-timezone-resolver", timeout=GEOCODE_TIMEOUT)
+
+
+@lru_cache(maxsize=None)
+def timezone_finder() -> TimezoneFinder:
+    # Loads the timezone polygons; built on the first gazetteer/cache miss and kept
+    return TimezoneFinder()
+
+
+class LocationCache:
+    """location -> (lat, lng, tz), in memory and in an optional sqlite file.
+
+    Expired rows are kept on disk so they can still answer when the geocoder is
+    unreachable.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self._memory = TTLCache(maxsize=4096, ttl_seconds=CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS locations ("
+                    "key TEXT PRIMARY KEY, lat REAL, lng REAL, tz TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                print(f"Timezone cache disk tier disabled ({path}): {e}", file=sys.stderr)
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Resolved]:
+        value = self._memory.get(key)
+        if value is not None or self._db is None:
+            return value
+        with self._lock:
+            row = self._db.execute(
+                "SELECT lat, lng, tz, expires_at FROM locations WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, ttl = (row[0], row[1], row[2]), row[3] - time.time()
+        if ttl > 0:
+            self._memory.set(key, value, ttl_seconds=ttl)
+            return value
+        return value if allow_stale else None
+
+    def set(self, key: str, value: Resolved, ttl_seconds: float) -> None:
+        self._memory.set(key, value, ttl_seconds=ttl_seconds)
+        if self._db is None:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO locations (key, lat, lng, tz, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value[0], value[1], value[2], time.time() + ttl_seconds),
+            )
+
+
+CACHE = LocationCache(CACHE_PATH)
+
+
+def lookup(location: str) -> Resolved:
+    key = normalize_location(location)
+    if not key:
+        return (None, None, "UTC")
+    hit = CACHE.get(key) or GAZETTEER.get(key)
+    if hit is not None:
+        return hit
+    try:
+        g = geolocator().geocode(location)
+    except Exception:
+        # Geocoder unreachable: an expired answer, or the best-known place of that name, beats none
+        return CACHE.get(key, allow_stale=True) or AMBIGUOUS_FALLBACK.get(key) or (None, None, "UTC")
+    if not g:
+        resolved: Resolved = (None, None, "UTC")
+        CACHE.set(key, resolved, NOT_FOUND_TTL_SECONDS)
+        return resolved
     try:
-        g = geolocator.geocode(location)
-        if not g:
-            return "UTC"
-        tz = TimezoneFinder().timezone_at(lng=g.longitude, lat=g.latitude)
-        return tz or "UTC"
+        tz = timezone_finder().timezone_at(lng=g.longitude, lat=g.latitude) or "UTC"
     except Exception:
-        return "UTC"
+        return (g.latitude, g.longitude, "UTC")
+    resolved = (g.latitude, g.longitude, tz)
+    CACHE.set(key, resolved, CACHE_TTL_SECONDS)
+    return resolved
+
+
+@mcp.tool()
+def resolve_timezone(location: str) -> str:
+    return lookup(location)[2]
 
 if __name__ == "__main__":
     mcp.run()
@@ -1,10 +1,32 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolResult, TextContent
 from ics import Calendar, Event
+import hashlib
 import json
-import dateparser
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+import dates
 
 mcp = FastMCP("ics-builder")
 
+# Read and write paths granted in spoonos.manifest.json; batch input files must sit below
+# IN_DIR and batch calendars may only be written below OUT_DIR
+IN_DIR = Path(os.getenv("ICS_IN_DIR", "/mnt/data"))
+OUT_DIR = Path(os.getenv("ICS_OUT_DIR", "/app/out"))
+CHUNK_EVENTS = int(os.getenv("ICS_CHUNK_EVENTS", "500"))
+# Calendars returned inline are held in memory and sent as one response; larger ones need out_path
+MAX_INLINE_CHARS = int(os.getenv("ICS_MAX_INLINE_CHARS", str(8 * 1024 * 1024)))
+READ_CHUNK_CHARS = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+PRODID = "-//AgentBridge//ics-builder//EN"
+
 @mcp.tool()
 def build_ics(event_data: str) -> str:
     try:
@@ -12,8 +34,8 @@ def build_ics(event_data: str) -> str:
     except Exception:
         data = {}
     title = data.get("title") or "Event"
-    start = dateparser.parse(str(data.get("start") or ""))
-    end = dateparser.parse(str(data.get("end") or ""))
+    start = dates.parse_date(data.get("start"))
+    end = dates.parse_date(data.get("end"))
     cal = Calendar()
     ev = Event()
     ev.name = title
@@ -25,5 +47,222 @@ def build_ics(event_data: str) -> str:
     cal.events.add(ev)
     return str(cal)
 
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1) without splitting UTF-8 sequences."""
+    if len(line.encode("utf-8")) <= 75:
+        return line
+    parts, current, size = [], "", 0
+    for ch in line:
+        width = len(ch.encode("utf-8"))
+        # Continuation lines start with a space, which counts towards their 75 octets
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += ch
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _stamp(value: datetime) -> str:
+    # Naive times are taken as UTC, as in build_ics
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(data: Dict[str, Any], dtstamp: str) -> str:
+    """One VEVENT, including its trailing CRLF. ISO start/end skip dateparser entirely."""
+    title = str(data.get("title") or "Event")
+    start = dates.parse_date(data.get("start"))
+    end = dates.parse_date(data.get("end"))
+    location = str(data.get("location") or "")
+    # Stable UIDs let calendar clients update events from the previous night's run instead of duplicating them
+    uid = data.get("uid") or hashlib.sha1(
+        json.dumps([title, data.get("start"), data.get("end"), location]).encode("utf-8")
+    ).hexdigest() + "@agentbridge"
+    lines = ["BEGIN:VEVENT", f"UID:{_escape(str(uid))}", f"DTSTAMP:{dtstamp}"]
+    if start:
+        lines.append(f"DTSTART:{_stamp(start)}")
+    if end:
+        lines.append(f"DTEND:{_stamp(end)}")
+    lines.append(f"SUMMARY:{_escape(title)}")
+    if location:
+        lines.append(f"LOCATION:{_escape(location)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def iter_events(events: str, events_path: str) -> Iterator[Any]:
+    """Yield events (or the exception for an unreadable one) from a JSON array or NDJSON, text or file.
+
+    Files are read incrementally: NDJSON one line at a time, a JSON array one element at a time.
+    """
+    if events_path:
+        with open(resolve_in_path(events_path), "r", encoding="utf-8") as f:
+            first = f.read(1)
+            while first and first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == "[":
+                yield from _iter_json_array(f)
+                return
+            yield from _iter_ndjson(f)
+        return
+    if events.lstrip().startswith("["):
+        yield from json.loads(events)
+        return
+    yield from _iter_ndjson(events.splitlines())
+
+
+def _iter_json_array(f: TextIO) -> Iterator[Any]:
+    """Decode a JSON array file one element at a time, holding at most one element plus a read chunk.
+
+    A malformed element ends the array, since nothing after it can be located; its error is yielded.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(READ_CHUNK_CHARS)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+        return not eof
+
+    def skip_space() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or not fill():
+                return buf[pos] if pos < len(buf) else ""
+
+    if skip_space() != "[":
+        yield ValueError("events file is not a JSON array")
+        return
+    pos += 1
+    if skip_space() == "]":
+        return
+    while True:
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError as e:
+            item, end = e, None
+        # A value may run up to the end of the buffer (e.g. a number) only once the file is exhausted
+        if end is None or (end == len(buf) and not eof):
+            if fill():
+                continue
+            if end is None:
+                yield item
+                return
+        yield item
+        pos = end
+        sep = skip_space()
+        if sep == "]":
+            return
+        if sep != ",":
+            yield ValueError(f"expected ',' or ']' after array element, found {sep or 'end of file'!r}")
+            return
+        pos += 1
+        skip_space()
+
+
+def _iter_ndjson(lines: Iterable[str]) -> Iterator[Any]:
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def iter_calendar(items: Iterable[Any], summary: Dict[str, Any]) -> Iterator[str]:
+    """Yield the calendar piece by piece, counting events and recording skipped items in ``summary``."""
+    dtstamp = _stamp(datetime.now(timezone.utc))
+    yield f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\n"
+    for index, item in enumerate(items):
+        if isinstance(item, dict):
+            try:
+                piece = vevent(item, dtstamp)
+            except Exception as e:
+                item = e
+            else:
+                summary["events"] += 1
+                yield piece
+                continue
+        summary["skipped"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            error = str(item) if isinstance(item, Exception) else "event is not a JSON object"
+            summary["errors"].append({"index": index, "error": error})
+    yield "END:VCALENDAR\r\n"
+
+
+def resolve_in_path(events_path: str) -> Path:
+    path = (IN_DIR / events_path).resolve()
+    if not path.is_relative_to(IN_DIR.resolve()):
+        raise ValueError(f"events_path must be inside {IN_DIR}")
+    return path
+
+
+def resolve_out_path(out_path: str) -> Path:
+    path = (OUT_DIR / out_path).resolve()
+    if not path.is_relative_to(OUT_DIR.resolve()):
+        raise ValueError(f"out_path must be inside {OUT_DIR}")
+    return path
+
+
+@mcp.tool()
+def build_ics_batch(events: str = "", events_path: str = "", out_path: str = "") -> CallToolResult:
+    """Build one calendar from many events, given as a JSON array or NDJSON (inline or in a file).
+
+    ``events_path`` is resolved against ``ICS_IN_DIR``. With ``out_path`` the calendar is
+    streamed to that file under ``ICS_OUT_DIR`` and the text result is a JSON summary.
+    Otherwise the calendar is returned as text chunks of ``ICS_CHUNK_EVENTS`` events each,
+    which concatenate to the full calendar; past ``ICS_MAX_INLINE_CHARS`` the call fails
+    and ``out_path`` is required. Either way the summary (event count, skipped items and
+    their errors) is the structured content.
+    """
+    summary: Dict[str, Any] = {"events": 0, "skipped": 0, "errors": []}
+    pieces = iter_calendar(iter_events(events, events_path), summary)
+    if out_path:
+        path = resolve_out_path(out_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            size = 0
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                for piece in pieces:
+                    size += f.write(piece)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        summary = {"path": str(path), "chars": size, **summary}
+        return CallToolResult(content=[TextContent(type="text", text=json.dumps(summary))], structuredContent=summary)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        size += len(piece)
+        if size > MAX_INLINE_CHARS:
+            raise ValueError(
+                f"Calendar exceeds ICS_MAX_INLINE_CHARS ({MAX_INLINE_CHARS}) after {summary['events']} events; "
+                "pass out_path to write it to a file"
+            )
+        current.append(piece)
+        if len(current) >= CHUNK_EVENTS:
+            chunks.append("".join(current))
+            current = []
+    if current:
+        chunks.append("".join(current))
+    return CallToolResult(content=[TextContent(type="text", text=c) for c in chunks], structuredContent=summary)
+
 if __name__ == "__main__":
     mcp.run()
@@ -1,17 +1,103 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "shared"))
+
 from mcp.server.fastmcp import FastMCP
-from PIL import Image
+from PIL import Image, ImageOps
 import pytesseract
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from cache import TTLCache
 
 mcp = FastMCP("ocr-generic")
 
+# Posters larger than this (longest side, in pixels) are downscaled before OCR
+MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "2000"))
+# Threshold grayscale images to black and white before OCR (0-255; 0 disables)
+BINARIZE_THRESHOLD = int(os.getenv("OCR_BINARIZE_THRESHOLD", "0"))
+TIMEOUT_SECONDS = float(os.getenv("OCR_TIMEOUT_SECONDS", "0"))
+MAX_WORKERS = int(os.getenv("OCR_MAX_WORKERS", "0")) or os.cpu_count() or 1
+
+# Text by (image content hash, preprocessing settings), so a renamed or re-uploaded poster is not re-read
+CACHE = TTLCache(
+    maxsize=int(os.getenv("OCR_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("OCR_CACHE_TTL_SECONDS", "3600")),
+)
+# pytesseract runs each OCR in its own tesseract process, and Pillow releases the GIL while
+# decoding and resizing, so threads keep that many OCR processes busy. Unlike a process
+# pool, they also work when this provider itself runs in a hub worker process.
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ocr")
+
+
+def preprocess(img: Image.Image) -> Image.Image:
+    img = ImageOps.exif_transpose(img).convert("L")
+    if max(img.size) > MAX_SIDE:
+        img.thumbnail((MAX_SIDE, MAX_SIDE), Image.LANCZOS)
+    if BINARIZE_THRESHOLD:
+        img = ImageOps.autocontrast(img).point(lambda p: 255 if p > BINARIZE_THRESHOLD else 0)
+    return img
+
+
+def ocr_file(image_path: str) -> Dict[str, Any]:
+    """OCR one image, with per-step timings in ms and the error instead of an exception."""
+    t0 = time.perf_counter()
+    timings: Dict[str, int] = {}
+    result: Dict[str, Any] = {"image_path": image_path, "text": "", "ok": False, "cached": False}
+
+    def lap(step: str, since: float) -> float:
+        now = time.perf_counter()
+        timings[step] = int((now - since) * 1000)
+        return now
+
+    try:
+        with open(image_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        result["sha256"] = digest
+        key = (digest, MAX_SIDE, BINARIZE_THRESHOLD)
+        t = lap("read", t0)
+        text = CACHE.get(key)
+        if text is not None:
+            result.update(text=text, ok=True, cached=True)
+        else:
+            with Image.open(io.BytesIO(raw)) as img:
+                result["size"] = list(img.size)
+                prepared = preprocess(img)
+            result["ocr_size"] = list(prepared.size)
+            t = lap("preprocess", t)
+            text = pytesseract.image_to_string(prepared, timeout=TIMEOUT_SECONDS)
+            lap("ocr", t)
+            CACHE.set(key, text)
+            result.update(text=text, ok=True)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    timings["total"] = int((time.perf_counter() - t0) * 1000)
+    result["ms"] = timings
+    return result
+
+
 @mcp.tool()
 def ocr_image(image_path: str) -> str:
-    try:
-        img = Image.open(image_path)
-        txt = pytesseract.image_to_string(img)
-        return txt
-    except Exception:
-        return ""
+    result = ocr_file(image_path)
+    if not result["ok"]:
+        raise RuntimeError(f"OCR failed for {image_path}: {result['error']}")
+    return result["text"]
+
+
+@mcp.tool()
+def ocr_images(image_paths: str) -> str:
+    """OCR a JSON array of image paths in parallel; returns one result per path, in order."""
+    paths = json.loads(image_paths)
+    if not isinstance(paths, list):
+        raise ValueError("image_paths must be a JSON array")
+    results = EXECUTOR.map(ocr_file, [str(p) for p in paths])
+    return json.dumps([{"index": i, **r} for i, r in enumerate(results)])
 
 if __name__ == "__main__":
     mcp.run()
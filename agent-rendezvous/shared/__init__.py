@@ -1,6 +1,10 @@
 # Shared models for Agent Rendezvous
 from .models import Intent, Proposal, Task, Result
+from .cache import TTLCache
+from .worker_pool import WorkerPool, WorkerPoolError
+from .rate_limit import KeyedRateLimiter, TokenBucket
+from .completion_cache import CompletionCache
 
-__all__ = ["Intent", "Proposal", "Task", "Result"]
+__all__ = ["Intent", "Proposal", "Task", "Result", "TTLCache", "WorkerPool", "WorkerPoolError", "TokenBucket", "KeyedRateLimiter", "CompletionCache"]
 
 
@@ -0,0 +1,77 @@
+"""Benchmark ``dates.parse_date`` against raw ``dateparser.parse``.
+
+Run from the repo root:
+
+    python shared/bench_dates.py --calls 2000
+
+The corpus mixes the ISO timestamps exchanged between agents, poster-style
+month-name dates and free-form text, with repeats as in real traffic. Both
+parsers must agree on every input.
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import dateparser  # noqa: E402
+
+import dates  # noqa: E402
+
+
+def corpus(size: int, seed: int):
+    rng = random.Random(seed)
+    today = datetime.now()
+    iso = [
+        "2025-03-14T18:00:00", "2025-03-14", "2025-11-22T08:30:00", "2025-03-14T18:00:00Z",
+        "2025-03-14T18:00:00-07:00", "2025-03-14 18:00", "2025-12-01T10:00:00.250000",
+    ]
+    poster = [
+        "Nov 22, 2025 8:30 AM", "March 14, 2025", "Mar 14 2025", "Dec 1, 2025 10:00 pm", "Jan 5",
+        today.strftime("%b %d"), (today - timedelta(days=1)).strftime("%B %d"),
+        (today + timedelta(days=1)).strftime("%b %d 9:15 AM"),
+    ]
+    free = ["14 March 2025 at 6pm", "Saturday, 22 November 2025", "22/11/2025", "next friday", "not a date"]
+    pool = [(s, False) for s in iso] + [(s, True) for s in poster] + [(s, False) for s in poster] + [
+        (s, True) for s in free
+    ]
+    return [rng.choice(pool) for _ in range(size)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    inputs = corpus(args.calls, args.seed)
+    future = {"PREFER_DATES_FROM": "future"}
+    dateparser.parse("warm up")
+    dates.parse_date("warm up")
+
+    t0 = time.perf_counter()
+    expected = [dateparser.parse(s, settings=future if f else None) for s, f in inputs]
+    raw = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = [dates.parse_date(s, prefer_future=f) for s, f in inputs]
+    fast = time.perf_counter() - t0
+
+    mismatches = [(s, f, e, a) for (s, f), e, a in zip(inputs, expected, actual) if e != a]
+    for s, f, e, a in mismatches[:10]:
+        print(f"MISMATCH {s!r} prefer_future={f}: dateparser={e} dates={a}")
+    print(f"calls:      {len(inputs)}")
+    print(f"dateparser: {raw * 1000:8.1f} ms  ({raw / len(inputs) * 1e6:7.1f} us/call)")
+    print(f"dates:      {fast * 1000:8.1f} ms  ({fast / len(inputs) * 1e6:7.1f} us/call)")
+    print(f"speedup:    {raw / fast:8.1f}x")
+    print(f"memo:       {dates.memo_info()}")
+    if mismatches:
+        sys.exit(f"{len(mismatches)} mismatches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from cache import TTLCache
+
+PRUNE_EVERY = 100
+DEFAULT_SYSTEM_PROMPT = "You are helpful"
+
+# Model (overridable through model_env) and temperature each LLM provider completes with.
+# Providers and the hub both resolve them here, so they compute the same cache keys.
+LLM_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "chatgpt": {"model_env": "OPENAI_MODEL", "model": "gpt-4o-mini", "temperature": 0.2},
+    "gemini": {"model_env": "GEMINI_MODEL", "model": "gemini-1.5-flash", "temperature": None},
+}
+
+
+def completion_settings(provider: str, env: Optional[Mapping[str, str]] = None) -> Tuple[str, Optional[float]]:
+    """Model and temperature of an LLM provider, given its environment (the process env by default)."""
+    settings = LLM_SETTINGS[provider]
+    env = os.environ if env is None else env
+    return env.get(settings["model_env"]) or settings["model"], settings["temperature"]
+
+
+def completion_key(provider: str, model: str, system: str, prompt: str, temperature: Optional[float]) -> str:
+    payload = json.dumps(
+        {"provider": provider, "model": model, "system": system, "prompt": prompt, "temperature": temperature},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """LLM completions keyed by provider, model, system prompt, prompt and temperature.
+
+    An in-memory LRU+TTL tier sits in front of a sqlite file (``COMPLETION_CACHE_PATH``)
+    that survives restarts and is shared by every provider process, and read by
+    the hub to bid cached completions at near-zero cost. Entries expire after
+    ``COMPLETION_CACHE_TTL_SECONDS``; past ``COMPLETION_CACHE_DISK_MAX_ENTRIES`` the
+    entries closest to expiry are dropped first.
+
+    With ``index=True`` (the hub), the keys on disk are also kept in memory, so
+    ``contains()`` never touches sqlite: ``load_index()`` reads them all and
+    ``refresh_index()`` picks up rows written since, both meant to run off the
+    event loop, and ``remember()`` indexes a key the caller knows was just stored.
+    Diagnostics go to stderr, since stdout is the JSON-RPC channel of the stdio
+    providers that also use this class.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        disk_max_entries: Optional[int] = None,
+        index: bool = False,
+    ):
+        self.ttl_seconds = ttl_seconds or float(os.getenv("COMPLETION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self._memory = TTLCache(
+            maxsize=maxsize or int(os.getenv("COMPLETION_CACHE_SIZE", "1024")),
+            ttl_seconds=self.ttl_seconds,
+        )
+        default_path = str(Path.home() / ".cache" / "agentbridge" / "completions.sqlite")
+        self.path = path if path is not None else os.getenv("COMPLETION_CACHE_PATH", default_path)
+        self.disk_max_entries = disk_max_entries or int(os.getenv("COMPLETION_CACHE_DISK_MAX_ENTRIES", "100000"))
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        # Key -> expires_at of every completion on disk, and the last rowid read into it
+        self._index: Optional[Dict[str, float]] = {} if index else None
+        self._index_rowid = 0
+        # Guards _index, which a refresh thread updates while the event loop reads it
+        self._index_lock = threading.Lock()
+        if self.path:
+            self._open_db()
+
+    def _open_db(self) -> None:
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            # Several provider processes and the hub share the file
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, provider TEXT NOT NULL, text TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS completions_expires ON completions (expires_at)")
+            self._db = db
+        except (OSError, sqlite3.Error) as e:
+            print(f"Completion cache disk tier disabled ({self.path}): {e}", file=sys.stderr)
+            self._db = None
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT text, expires_at FROM completions WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[1] <= time.time():
+            return None
+        return row[0], row[1]
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._memory.get(key)
+        if text is not None:
+            self.stats_counters["memory_hits"] += 1
+            return text
+        row = self._disk_get(key)
+        if row is not None:
+            self._memory.set(key, row[0], ttl_seconds=row[1] - time.time())
+            self.stats_counters["disk_hits"] += 1
+            return row[0]
+        self.stats_counters["misses"] += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Whether a completion is cached, without counting a hit or miss.
+
+        Checks memory and, when indexing, the in-memory key index; never reads sqlite.
+        """
+        if self._memory.get(key) is not None:
+            return True
+        if self._index is None:
+            return False
+        with self._index_lock:
+            expires_at = self._index.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._index[key]
+                return False
+        return True
+
+    def remember(self, key: str) -> None:
+        """Index a completion another process has just stored under ``key``."""
+        if self._index is None:
+            return
+        with self._index_lock:
+            self._index[key] = time.time() + self.ttl_seconds
+
+    def load_index(self) -> int:
+        """Read the keys of every unexpired completion on disk into the index; returns how many."""
+        if self._index is None:
+            return 0
+        with self._index_lock:
+            self._index.clear()
+            self._index_rowid = 0
+        return self.refresh_index()
+
+    def refresh_index(self) -> int:
+        """Add completions written to disk (by any process) since the last refresh; returns how many."""
+        if self._index is None or self._db is None:
+            return 0
+        try:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT rowid, key, expires_at FROM completions WHERE rowid > ? AND expires_at > ?",
+                    (self._index_rowid, time.time()),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Could not read completion cache index: {e}", file=sys.stderr)
+            return 0
+        with self._index_lock:
+            for rowid, key, expires_at in rows:
+                self._index[key] = expires_at
+                self._index_rowid = max(self._index_rowid, rowid)
+            if len(self._index) > self.disk_max_entries:
+                now = time.time()
+                for key in [k for k, expires_at in self._index.items() if expires_at <= now]:
+                    del self._index[key]
+        return len(rows)
+
+    def set(self, key: str, provider: str, text: str) -> None:
+        self._memory.set(key, text)
+        self.stats_counters["stores"] += 1
+        self.remember(key)
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO completions (key, provider, text, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, provider, text, time.time() + self.ttl_seconds),
+                )
+                self._writes += 1
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune()
+        except sqlite3.Error as e:
+            print(f"Could not store completion: {e}", file=sys.stderr)
+
+    def _prune(self) -> None:
+        self._db.execute("DELETE FROM completions WHERE expires_at <= ?", (time.time(),))
+        excess = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0] - self.disk_max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY expires_at LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        disk_entries = None
+        if self._db is not None:
+            with self._lock:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        return {
+            **self.stats_counters,
+            "memory": self._memory.stats(),
+            "disk_path": self.path,
+            "disk_entries": disk_entries,
+            "indexed_keys": None if self._index is None else len(self._index),
+        }
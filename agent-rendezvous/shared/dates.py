@@ -0,0 +1,134 @@
+"""Fast date parsing for providers.
+
+``parse_date`` tries, in order: a strict ISO-8601/RFC 3339 parse (the format
+upstream agents already emit), the month-name formats found on posters, and
+finally ``dateparser`` through a cached parser per settings and a bounded LRU
+memo. Results match ``dateparser.parse`` for the fast-path formats.
+"""
+
+import os
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+MEMO_SIZE = int(os.getenv("DATES_MEMO_SIZE", "4096"))
+
+# YYYY-MM-DD, optionally followed by [T ]HH:MM[:SS[.ffffff]] and Z or +HH:MM
+ISO_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}"
+    r"(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+)
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate(
+        [
+            ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+            ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+            ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+
+# Month-name dates as printed on posters: "Nov 22, 2025 8:30 AM", "March 14", "Jan 5 6:30 pm"
+POSTER_DATE_RE = re.compile(
+    r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:,\s*\d{4})?"
+    r"(?:\s+\d{1,2}:\d{2}\s*(?:AM|PM))?",
+    re.IGNORECASE,
+)
+_POSTER_PARTS_RE = re.compile(
+    r"(?P<month>[a-z]+)\.?\s+(?P<day>\d{1,2}),?(?:\s+(?P<year>\d{4}))?"
+    r"(?:\s+(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<ampm>am|pm)?)?",
+    re.IGNORECASE,
+)
+
+# Inputs whose meaning depends on the current time are never memoized
+_RELATIVE_RE = re.compile(
+    r"\b(?:now|today|tonight|tomorrow|yesterday|ago|in|next|last|this|hours?|minutes?|seconds?|weeks?)\b",
+    re.IGNORECASE,
+)
+
+
+def parse_iso(value: str) -> Optional[datetime]:
+    """Parse a strict ISO-8601/RFC 3339 timestamp, or return None."""
+    if not ISO_RE.fullmatch(value):
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_poster(value: str, prefer_future: bool = False, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Parse a whole-string month-name date such as "Mar 14, 2025 6:30 PM", or return None.
+
+    A missing year means the current one, or with ``prefer_future`` the next
+    one once the date has passed, as ``dateparser`` does.
+    """
+    match = _POSTER_PARTS_RE.fullmatch(value)
+    if match is None:
+        return None
+    month = _MONTHS.get(match["month"].lower())
+    if month is None:
+        return None
+    hour, minute = int(match["hour"] or 0), int(match["minute"] or 0)
+    if match["ampm"]:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match["ampm"].lower() == "pm" else 0)
+    now = now or datetime.now()
+    try:
+        parsed = datetime(int(match["year"] or now.year), month, int(match["day"]), hour, minute)
+        if prefer_future and match["year"] is None and parsed < now:
+            parsed = parsed.replace(year=now.year + 1)
+    except ValueError:
+        return None
+    return parsed
+
+
+@lru_cache(maxsize=None)
+def _parser(prefer_future: bool) -> Any:
+    # dateparser builds a new DateDataParser (and settings) for every call given settings; reuse one
+    from dateparser.date import DateDataParser
+
+    settings: Dict[str, Any] = {"PREFER_DATES_FROM": "future"} if prefer_future else {}
+    return DateDataParser(settings=settings)
+
+
+def _dateparser(value: str, prefer_future: bool) -> Optional[datetime]:
+    return _parser(prefer_future).get_date_data(value).date_obj
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _dateparser_memo(value: str, prefer_future: bool, today: date) -> Optional[datetime]:
+    # ``today`` is part of the key: year-less dates resolve differently from one day to the next
+    return _dateparser(value, prefer_future)
+
+
+def parse_date(value: Any, prefer_future: bool = False) -> Optional[datetime]:
+    """Parse a date string like ``dateparser.parse``, using the fast paths when they apply."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    parsed = parse_iso(text) or parse_poster(text, prefer_future)
+    if parsed is not None:
+        return parsed
+    if _RELATIVE_RE.search(text):
+        return _dateparser(text, prefer_future)
+    return _dateparser_memo(text, prefer_future, date.today())
+
+
+def to_iso(value: Any, prefer_future: bool = False) -> str:
+    """``parse_date(value).isoformat()``, or "" when the value is not a date."""
+    parsed = parse_date(value, prefer_future)
+    return parsed.isoformat() if parsed else ""
+
+
+def memo_info() -> Dict[str, int]:
+    info = _dateparser_memo.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
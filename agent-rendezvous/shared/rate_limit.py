@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import time
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """Async token bucket: refills ``rate`` tokens per second up to ``capacity``.
+
+    ``acquire()`` waits until enough tokens are available. Waiters are served
+    in arrival order, so a burst cannot starve earlier callers.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens``, sleeping until they are available; returns the seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= tokens
+        self.acquired += 1
+        self.waited_seconds += waited
+        return waited
+
+
+class KeyedRateLimiter:
+    """One ``TokenBucket`` per key (e.g. per API key), created on first use.
+
+    Keys are hashed, so secrets are not kept around as dictionary keys.
+    ``requests_per_minute`` of 0 disables limiting.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: Optional[float] = None):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def _id(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+    async def acquire(self, key: str) -> float:
+        if self.requests_per_minute <= 0:
+            return 0.0
+        bucket_id = self._id(key)
+        bucket = self._buckets.get(bucket_id)
+        if bucket is None:
+            bucket = self._buckets[bucket_id] = TokenBucket(self.requests_per_minute / 60.0, self.burst)
+        return await bucket.acquire()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            bucket_id: {"acquired": b.acquired, "waited_seconds": round(b.waited_seconds, 3)}
+            for bucket_id, b in self._buckets.items()
+        }
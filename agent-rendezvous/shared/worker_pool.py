@@ -0,0 +1,303 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class WorkerPoolError(Exception):
+    """Raised when a worker cannot start, or dies while running a job."""
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1 << 20)
+    except (OSError, ValueError, IndexError):
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _worker_main(conn: Any, initializer: Optional[Callable[..., Any]], initargs: Tuple[Any, ...]) -> None:
+    """Worker loop: warm up, then run jobs in order until told to stop."""
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+    except BaseException:
+        conn.send(("failed", traceback.format_exc(limit=5)))
+        return
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        job_id, fn, args, kwargs = job
+        try:
+            payload, ok = fn(*args, **kwargs), True
+        except BaseException as e:
+            payload, ok = (type(e).__name__, str(e)), False
+        try:
+            conn.send((job_id, ok, payload, current_rss_mb()))
+        except Exception as e:
+            # The result could not be pickled
+            conn.send((job_id, False, (type(e).__name__, str(e)), current_rss_mb()))
+
+
+class _Worker:
+    def __init__(self, index: int, process: Any, conn: Any):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.pid: Optional[int] = None
+        self.inflight: Dict[int, Future] = {}
+        self.tasks = 0
+        self.rss_mb = 0.0
+        self.retiring = False
+        self.started_at = time.monotonic()
+        self.send_lock = threading.Lock()
+
+
+class WorkerPool:
+    """Pool of pre-warmed worker processes for CPU-bound, GIL-holding work.
+
+    Every worker runs ``initializer(*initargs)`` once at start-up, so heavy
+    imports and models are loaded before the first job. Jobs are picklable
+    top-level callables sent to the worker with the fewest jobs in flight
+    (round-robin among ties) and run one at a time per worker, so throughput
+    scales with ``size`` instead of one call per interpreter. After
+    ``max_tasks`` jobs, or once its RSS exceeds ``max_rss_mb``, a worker is
+    recycled: a replacement is spawned and the old worker stops once its
+    queued jobs are done, serving on in the meantime if nothing else can. A worker
+    that dies fails its in-flight jobs with ``WorkerPoolError`` and is replaced.
+
+    Usable from threads (``submit`` returns a concurrent future) and from
+    asyncio (``run``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        size: Optional[int] = None,
+        initializer: Optional[Callable[..., Any]] = None,
+        initargs: Tuple[Any, ...] = (),
+        max_tasks: Optional[int] = None,
+        max_rss_mb: Optional[float] = None,
+        start_timeout: float = 60.0,
+        start_method: Optional[str] = None,
+    ):
+        self.name = name
+        self.size = size or int(os.getenv("WORKER_POOL_SIZE", "0")) or os.cpu_count() or 1
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_tasks = max_tasks if max_tasks is not None else int(os.getenv("WORKER_POOL_MAX_TASKS", "1000"))
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else float(os.getenv("WORKER_POOL_MAX_RSS_MB", "1024"))
+        self.start_timeout = start_timeout
+        # Forking a threaded parent is unsafe, so workers are spawned by default
+        self._ctx = multiprocessing.get_context(start_method or os.getenv("WORKER_POOL_START_METHOD", "spawn"))
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._indexes = itertools.count()
+        self._rr = 0
+        self._closed = False
+        self.stats_counters = {"jobs": 0, "failed": 0, "recycled": 0, "crashed": 0}
+
+    def start(self) -> None:
+        """Spawn ``size`` workers and wait until all are warm; raises if any fails to start."""
+        with self._start_lock:
+            with self._lock:
+                missing = self.size - sum(not w.retiring for w in self._workers)
+            started = []
+            try:
+                for _ in range(missing):
+                    started.append(self._spawn())
+            except Exception:
+                for worker in started:
+                    self._stop(worker)
+                raise
+            with self._lock:
+                self._workers.extend(started)
+                # Retiring workers kept serving until now; stop those with nothing left to finish
+                idle_retired = [w for w in self._workers if w.retiring and not w.inflight] if started else []
+                for worker in idle_retired:
+                    self._workers.remove(worker)
+        for worker in idle_retired:
+            self._stop(worker)
+        for worker in started:
+            threading.Thread(target=self._read, args=(worker,), name=f"{self.name}-reader", daemon=True).start()
+
+    async def start_async(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.start)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.initializer, self.initargs),
+            name=f"{self.name}-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(next(self._indexes), process, parent_conn)
+        if not parent_conn.poll(self.start_timeout):
+            self._stop(worker)
+            raise WorkerPoolError(f"Worker for {self.name} did not start within {self.start_timeout}s")
+        try:
+            status, detail = parent_conn.recv()
+        except (EOFError, OSError):
+            status, detail = "failed", f"exit code {process.exitcode}"
+        if status != "ready":
+            self._stop(worker)
+            raise WorkerPoolError(f"Worker for {self.name} failed to start: {detail}")
+        worker.pid = detail
+        return worker
+
+    def _replace_async(self) -> None:
+        def replace() -> None:
+            try:
+                self.start()
+            except Exception as e:
+                print(f"Could not replace {self.name} worker: {e}")
+
+        if not self._closed:
+            threading.Thread(target=replace, name=f"{self.name}-respawn", daemon=True).start()
+
+    def _pick(self) -> _Worker:
+        # Retiring workers still take jobs while their replacement is warming up
+        candidates = [w for w in self._workers if not w.retiring] or self._workers
+        if not candidates:
+            raise WorkerPoolError(f"No live workers in pool {self.name}")
+        least = min(len(w.inflight) for w in candidates)
+        idle = [w for w in candidates if len(w.inflight) == least]
+        self._rr += 1
+        return idle[self._rr % len(idle)]
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``fn(*args, **kwargs)`` on the least-loaded worker."""
+        if self._closed:
+            raise WorkerPoolError(f"Pool {self.name} is closed")
+        future: Future = Future()
+        with self._lock:
+            worker = self._pick()
+            job_id = next(self._job_ids)
+            worker.inflight[job_id] = future
+            self.stats_counters["jobs"] += 1
+        try:
+            with worker.send_lock:
+                worker.conn.send((job_id, fn, args, kwargs))
+        except Exception as e:
+            with self._lock:
+                worker.inflight.pop(job_id, None)
+            future.set_exception(WorkerPoolError(f"Could not send job to {self.name} worker: {e}"))
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _read(self, worker: _Worker) -> None:
+        while True:
+            try:
+                job_id, ok, payload, rss_mb = worker.conn.recv()
+            except (EOFError, OSError):
+                self._lost(worker)
+                return
+            with self._lock:
+                future = worker.inflight.pop(job_id, None)
+                worker.tasks += 1
+                worker.rss_mb = rss_mb
+                recycle = not worker.retiring and (
+                    worker.tasks >= self.max_tasks > 0 or rss_mb > self.max_rss_mb > 0
+                )
+                if recycle:
+                    worker.retiring = True
+                    self.stats_counters["recycled"] += 1
+                drained = (
+                    worker.retiring
+                    and not worker.inflight
+                    and any(not w.retiring for w in self._workers)
+                )
+                if drained:
+                    self._workers.remove(worker)
+                if not ok:
+                    self.stats_counters["failed"] += 1
+            if recycle:
+                self._replace_async()
+            if future is not None and not future.cancelled():
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(WorkerPoolError(f"{payload[0]}: {payload[1]}"))
+            if drained:
+                self._stop(worker)
+                return
+
+    def _lost(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            orphans = list(worker.inflight.values())
+            worker.inflight.clear()
+            crashed = not worker.retiring and not self._closed
+            if crashed:
+                self.stats_counters["crashed"] += 1
+        for future in orphans:
+            if not future.done():
+                future.set_exception(WorkerPoolError(f"{self.name} worker {worker.pid} exited"))
+        if crashed:
+            self._replace_async()
+
+    def _stop(self, worker: _Worker, timeout: float = 5.0) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        try:
+            with worker.send_lock:
+                worker.conn.send(None)
+        except Exception:
+            pass
+        worker.process.join(timeout)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join(timeout)
+        worker.conn.close()
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._stop(worker)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = [
+                {
+                    "pid": w.pid,
+                    "inflight": len(w.inflight),
+                    "tasks": w.tasks,
+                    "rss_mb": round(w.rss_mb, 1),
+                    "retiring": w.retiring,
+                    "uptime_s": int(time.monotonic() - w.started_at),
+                }
+                for w in self._workers
+            ]
+        return {
+            **self.stats_counters,
+            "size": self.size,
+            "max_tasks": self.max_tasks,
+            "max_rss_mb": self.max_rss_mb,
+            "workers": workers,
+        }
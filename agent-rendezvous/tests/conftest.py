@@ -0,0 +1,180 @@
+import importlib.util
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "hub"))
+sys.path.insert(0, str(ROOT / "shared"))
+
+
+class StubLLMServer:
+    """OpenAI and Gemini completion endpoints on a local port.
+
+    Each response echoes the prompt after ``delay`` seconds; the server counts
+    requests and distinct client connections so tests can check session reuse.
+    """
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.requests = 0
+        self.connections: set = set()
+        self.api_keys: list = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                with stub._lock:
+                    stub.requests += 1
+                    stub.connections.add(self.client_address)
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))))
+                time.sleep(stub.delay)
+                if "chat/completions" in self.path:
+                    stub.api_keys.append(self.headers.get("authorization", "").removeprefix("Bearer "))
+                    out: Dict[str, Any] = {
+                        "id": "stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [{
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": "openai:" + body["messages"][1]["content"]},
+                        }],
+                    }
+                else:
+                    stub.api_keys.append(self.headers.get("x-goog-api-key"))
+                    text = body["contents"][0]["parts"][0]["text"]
+                    out = {"candidates": [{"content": {"parts": [{"text": "gemini:" + text}]}}]}
+                data = json.dumps(out).encode()
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "StubLLMServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeSpoonOS:
+    """SpoonOS sandbox API on a local port: spawn, call and destroy, with counters.
+
+    A call to a sandbox that was never spawned or was destroyed gets a 404, so a
+    test sees it if the pool hands out a dead sandbox.
+    """
+
+    def __init__(self):
+        self.spawned: list = []
+        self.destroyed: list = []
+        self.live: set = set()
+        self.calls: list = []
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def reply(self, status: int, out: Dict[str, Any]) -> None:
+                data = json.dumps(out).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("content-length", 0)))
+                parts = self.path.strip("/").split("/")
+                with fake._lock:
+                    if parts == ["v1", "sandboxes"]:
+                        sandbox_id = f"sb{len(fake.spawned)}"
+                        fake.spawned.append(sandbox_id)
+                        fake.live.add(sandbox_id)
+                        return self.reply(200, {"id": sandbox_id})
+                    sandbox_id = parts[2]
+                    fake.calls.append(sandbox_id)
+                    if sandbox_id not in fake.live:
+                        return self.reply(404, {"error": "no such sandbox"})
+                self.reply(200, {"status": "OK", "data": {"sandbox": sandbox_id}})
+
+            def do_DELETE(self):
+                sandbox_id = self.path.strip("/").split("/")[2]
+                with fake._lock:
+                    fake.destroyed.append(sandbox_id)
+                    fake.live.discard(sandbox_id)
+                self.reply(200, {})
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "FakeSpoonOS":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def llm_stub() -> Iterator[StubLLMServer]:
+    server = StubLLMServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def spoonos() -> Iterator[FakeSpoonOS]:
+    server = FakeSpoonOS().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def llm_env(llm_stub: StubLLMServer, monkeypatch: pytest.MonkeyPatch) -> Dict[str, str]:
+    """Environment pointing both LLM providers at the stub, with the disk completion cache off."""
+    env = {
+        "OPENAI_API_KEY": "sk-test",
+        "OPENAI_BASE_URL": llm_stub.url + "/v1",
+        "GEMINI_API_KEY": "gm-test",
+        "GEMINI_BASE_URL": llm_stub.url,
+        "COMPLETION_CACHE_PATH": "",
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return env
+
+
+def load_provider(agent: str) -> Any:
+    """Import a provider's mcp_server.py fresh, so module-level clients and semaphores start unbound."""
+    path = ROOT / "providers" / agent / "mcp_server.py"
+    spec = importlib.util.spec_from_file_location(f"test_{agent}_mcp_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
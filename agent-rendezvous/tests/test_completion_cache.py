@@ -0,0 +1,66 @@
+import threading
+import time
+
+from completion_cache import CompletionCache
+
+
+def test_index_sees_other_writers_without_reading_sqlite_on_contains(tmp_path):
+    path = str(tmp_path / "completions.sqlite")
+    provider = CompletionCache(path=path)
+    provider.set("old", "chatgpt", "cached before startup")
+    hub = CompletionCache(path=path, index=True)
+    assert hub.load_index() == 1
+
+    provider.set("new", "chatgpt", "cached by the provider process")
+    # Not read until the next refresh, since contains() never queries sqlite
+    hub._db.close()
+    assert hub.contains("old")
+    assert not hub.contains("new")
+
+    hub._open_db()
+    assert hub.refresh_index() == 1
+    assert hub.contains("new")
+    assert hub.refresh_index() == 0
+    assert hub.stats()["indexed_keys"] == 2
+    provider.close()
+    hub.close()
+
+
+def test_index_drops_expired_keys(tmp_path):
+    path = str(tmp_path / "completions.sqlite")
+    hub = CompletionCache(path=path, ttl_seconds=0.001, index=True)
+    hub.set("key", "gemini", "text")
+    hub._memory.clear()
+    time.sleep(0.01)
+    assert not hub.contains("key")
+    hub.close()
+
+
+def test_refresh_while_the_loop_reads_and_writes_the_index(tmp_path):
+    path = str(tmp_path / "completions.sqlite")
+    writer = CompletionCache(path=path)
+    for i in range(2000):
+        writer.set(f"disk{i}", "chatgpt", "text")
+    hub = CompletionCache(path=path, index=True, disk_max_entries=10)
+    errors = []
+
+    def refresh():
+        try:
+            for _ in range(20):
+                hub.load_index()
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=refresh)
+    thread.start()
+    i = 0
+    while thread.is_alive():
+        hub.remember(f"new{i}")
+        hub.contains(f"disk{i % 2000}")
+        i += 1
+    thread.join()
+    assert errors == []
+    hub.remember("known")
+    assert hub.contains("known")
+    writer.close()
+    hub.close()
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+import main
+from estimator import LatencyEstimator
+from models import Intent, Task
+
+
+class Recorder(LatencyEstimator):
+    """Estimator that also remembers what it was told."""
+
+    def __init__(self):
+        super().__init__(path="")
+        self.cancelled = []
+        self.executed = []
+
+    def observe_execution(self, provider_id, goal, latency_ms, success=True, cost_usd=None):
+        self.executed.append((provider_id, success))
+        super().observe_execution(provider_id, goal, latency_ms, success=success, cost_usd=cost_usd)
+
+    def observe_cancelled(self, provider_id, goal, elapsed_ms, claimed_latency_ms):
+        self.cancelled.append(provider_id)
+        super().observe_cancelled(provider_id, goal, elapsed_ms, claimed_latency_ms)
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Candidates whose behaviour is (delay in seconds, succeeds), keyed by provider id.
+
+    A delay of None waits for ``plans["gate"]``, an event set once, so attempts can finish together.
+    """
+    plans = {}
+
+    async def execute_on_provider(provider, proposal_data, intent, task):
+        delay, ok = plans[provider["id"]]
+        if delay is None:
+            await plans["gate"].wait()
+        else:
+            await asyncio.sleep(delay)
+        if not ok:
+            raise main.ExecutionError(f"{provider['id']} failed")
+        return {"winner": provider["id"], "result": {"status": "OK", "data": {}}}
+
+    estimator = Recorder()
+    monkeypatch.setattr(main, "execute_on_provider", execute_on_provider)
+    monkeypatch.setattr(main, "ESTIMATOR", estimator)
+    return plans, estimator
+
+
+def hedged(plans, delay_ms):
+    candidates = [
+        ({"id": pid, "name": pid}, {"est_latency_ms": 100, "_agent": pid})
+        for pid in plans
+    ]
+    intent = Intent(goal="hedge_test", inputs={})
+    main.HEDGE_POLICIES["hedge_test"] = {"delay_ms": delay_ms, "max_parallel": 2}
+
+    async def run():
+        gate = plans["gate"] = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, gate.set)
+        return await main.execute_hedged(candidates, intent, Task(goal="hedge_test", inputs={}))
+
+    try:
+        return asyncio.run(run())
+    finally:
+        plans.pop("gate", None)
+        del main.HEDGE_POLICIES["hedge_test"]
+
+
+def test_failure_during_a_hedge_starts_the_next_candidate_at_once(providers):
+    plans, _ = providers
+    # The primary fails just after the hedge starts; the hedge itself is slow
+    plans.update({"a": (0.06, False), "b": (1.0, True), "c": (0.01, True)})
+    response = hedged(plans, delay_ms=50)
+    attempts = {a["agent"]: a for a in response["attempt"]["attempts"]}
+    assert response["winner"] == "c"
+    assert attempts["c"]["kind"] == "fallback"
+    # Started when "a" failed, not a hedge delay after "b" started
+    assert attempts["c"]["started_ms"] < attempts["b"]["started_ms"] + 40
+    assert attempts["b"]["outcome"] == "cancelled"
+
+
+def test_attempts_finishing_together_are_not_cancelled(providers):
+    plans, estimator = providers
+    plans.update({"a": (None, True), "b": (None, True)})
+    response = hedged(plans, delay_ms=10)
+    outcomes = {a["agent"]: a["outcome"] for a in response["attempt"]["attempts"]}
+    assert response["winner"] == "a"
+    assert outcomes == {"a": "won", "b": "finished"}
+    assert estimator.cancelled == []
+    assert sorted(estimator.executed) == [("a", True), ("b", True)]
+
+
+def test_hedge_policy_overrides_merge_per_goal(tmp_path):
+    policies = main.load_hedge_policies('{"extract_event": {"max_parallel": 3}, "default": {"delay_fraction": 0.5}}')
+    assert policies["extract_event"] == {"max_parallel": 3}
+    assert policies["default"]["delay_fraction"] == 0.5
+    assert policies["default"]["latency_multiplier"] == 2.0
+    assert policies["summarize_text"]["delay_fraction"] == 0.4
+
+    path = tmp_path / "hedge.json"
+    path.write_text(json.dumps({"summarize_text": {"delay_ms": 300}}))
+    assert main.load_hedge_policies(str(path))["summarize_text"] == {"delay_fraction": 0.4, "max_parallel": 2, "delay_ms": 300}
+    assert main.load_hedge_policies("") is main.HEDGE_POLICIES
+
+    with pytest.raises(ValueError):
+        main.load_hedge_policies('{"default": {"max_paralel": 3}}')
+    with pytest.raises(ValueError):
+        main.load_hedge_policies('{"default": {"max_parallel": "3"}}')
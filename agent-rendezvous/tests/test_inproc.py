@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+import sys
+
+import inproc
+from conftest import ROOT
+from inproc import InprocProviders
+
+VALIDATOR = [str(ROOT / "providers" / "agent_10" / "mcp_server.py")]
+
+
+def test_installed_fastmcp_supports_direct_calls():
+    assert inproc.direct_calls_unsupported() is None
+
+
+def test_inproc_results_match_stdio_shape():
+    providers = InprocProviders(max_workers=2)
+    assert providers.register("event-validator", VALIDATOR)
+
+    async def run():
+        events = json.dumps([{"title": "x"}])
+        return (
+            await providers.list_tools("event-validator"),
+            await providers.call_tool("event-validator", "validate_events", {"events_json": events}),
+            await providers.call_tool("event-validator", "no_such_tool", {}),
+        )
+
+    tools, ok, unknown = asyncio.run(run())
+    providers.close()
+    assert "validate_events" in tools
+    assert not ok.isError
+    assert json.loads(ok.content[0].text)[0]["valid"] is False
+    assert unknown.isError
+    assert providers.stats()["event-validator"]["errors"] == 1
+
+
+def test_unsupported_fastmcp_falls_back_to_stdio(monkeypatch):
+    monkeypatch.setattr(inproc, "direct_calls_unsupported", lambda: "tool manager changed")
+    providers = InprocProviders(max_workers=1)
+    assert not providers.register("event-validator", VALIDATOR)
+    assert "event-validator" not in providers
+    providers.close()
+
+
+def test_import_keeps_provider_env_and_sys_path_to_itself(tmp_path, monkeypatch):
+    script = tmp_path / "provider.py"
+    script.write_text(
+        "import os, sys\n"
+        "from mcp.server.fastmcp import FastMCP\n"
+        "sys.path.insert(0, '/provider/only')\n"
+        "GREETING = os.getenv('INPROC_TEST_GREETING')\n"
+        "mcp = FastMCP('p')\n"
+    )
+    monkeypatch.setenv("INPROC_TEST_GREETING", "hub")
+    sys_path = list(sys.path)
+    server = inproc.import_provider("inproc_test_env", script, {"INPROC_TEST_GREETING": "provider", "INPROC_TEST_ONLY": "1"})
+    module = sys.modules.pop("inproc_test_env")
+    assert server is module.mcp
+    assert module.GREETING == "provider"
+    assert os.environ["INPROC_TEST_GREETING"] == "hub"
+    assert "INPROC_TEST_ONLY" not in os.environ
+    assert sys.path == sys_path
@@ -0,0 +1,27 @@
+import asyncio
+import json
+
+import main
+from models import Intent
+
+
+def test_failed_job_is_streamed_with_its_index(monkeypatch):
+    async def bid_for_job(intent, index, parent=None):
+        if intent.goal == "broken":
+            raise RuntimeError("registry unavailable")
+        return [], {"requested": 0}
+
+    monkeypatch.setattr(main, "bid_for_job", bid_for_job)
+
+    async def intents():
+        for goal in ("summarize_text", "broken", "translate_text"):
+            yield Intent(goal=goal, inputs={})
+
+    async def run():
+        return [json.loads(line) async for line in main.stream_jobs(intents(), None, sse=False)]
+
+    lines = asyncio.run(run())
+    assert lines[-1]["done"] and lines[-1]["jobs"] == 3
+    by_index = {line["index"]: line for line in lines[:-1]}
+    assert by_index[1] == {"index": 1, "error": "registry unavailable"}
+    assert by_index[0]["proposals"] == [] and by_index[2]["winner"] is None
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from conftest import load_provider
+from rate_limit import KeyedRateLimiter
+
+
+def test_chatgpt_reuses_one_client_and_connection(llm_env, llm_stub):
+    chatgpt = load_provider("agent_11")
+
+    async def run():
+        first = chatgpt.client("sk-test")
+        texts = [await chatgpt.tool_instance.execute(prompt=f"hello {i}") for i in range(5)]
+        return first, texts
+
+    first, texts = asyncio.run(run())
+    assert texts == [f"openai:hello {i}" for i in range(5)]
+    assert chatgpt.client("sk-test") is first
+    assert chatgpt.client.cache_info().currsize == 1
+    assert llm_stub.requests == 5
+    assert len(llm_stub.connections) == 1
+
+
+def test_gemini_reuses_one_http_session(llm_env, llm_stub):
+    gemini = load_provider("agent_12")
+
+    async def run():
+        session = gemini.http_client()
+        texts = [await gemini.tool_instance.execute(prompt=f"hello {i}") for i in range(5)]
+        return session, texts
+
+    session, texts = asyncio.run(run())
+    assert texts == [f"gemini:hello {i}" for i in range(5)]
+    assert gemini.http_client() is session
+    assert llm_stub.api_keys == ["gm-test"] * 5
+    assert len(llm_stub.connections) == 1
+
+
+def test_concurrent_completions_overlap_on_the_shared_client(llm_env, llm_stub):
+    chatgpt = load_provider("agent_11")
+
+    async def run():
+        return await asyncio.gather(*(chatgpt.tool_instance.execute(prompt=f"q{i}") for i in range(8)))
+
+    started = time.perf_counter()
+    texts = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    assert texts == [f"openai:q{i}" for i in range(8)]
+    # Eight 0.2 s completions in well under eight times the latency
+    assert elapsed < 4 * llm_stub.delay
+    assert chatgpt.client.cache_info().currsize == 1
+    assert len(llm_stub.connections) <= chatgpt.MAX_CONCURRENCY
+
+
+def test_repeated_prompt_is_served_from_the_completion_cache(llm_env, llm_stub):
+    gemini = load_provider("agent_12")
+
+    async def run():
+        return [await gemini.tool_instance.execute(prompt="same") for _ in range(3)]
+
+    assert asyncio.run(run()) == ["gemini:same"] * 3
+    assert llm_stub.requests == 1
+
+
+def test_rate_limiter_throttles_per_key():
+    # 600 requests per minute is one token every 0.1 s, with a burst of one
+    limiter = KeyedRateLimiter(600, burst=1)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(limiter.acquire("key-a") for _ in range(4)))
+        throttled = time.perf_counter() - started
+        started = time.perf_counter()
+        await limiter.acquire("key-b")
+        fresh = time.perf_counter() - started
+        return throttled, fresh
+
+    throttled, fresh = asyncio.run(run())
+    assert throttled >= 0.28
+    assert fresh < 0.05
+    stats = limiter.stats()
+    assert sorted(s["acquired"] for s in stats.values()) == [1, 4]
+    assert "key-a" not in stats
+
+
+def test_rate_limiter_disabled_at_zero():
+    limiter = KeyedRateLimiter(0)
+
+    async def run():
+        return await asyncio.gather(*(limiter.acquire("key") for _ in range(100)))
+
+    assert asyncio.run(run()) == [0.0] * 100
+    assert limiter.stats() == {}
+
+
+def test_provider_rate_limit_spaces_upstream_calls(llm_env, llm_stub):
+    llm_stub.delay = 0.0
+    gemini = load_provider("agent_12")
+    gemini.RATE_LIMITS = KeyedRateLimiter(600, burst=1)
+
+    async def run():
+        return await asyncio.gather(*(gemini.tool_instance.execute(prompt=f"r{i}") for i in range(3)))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    assert time.perf_counter() - started >= 0.18
+    assert llm_stub.requests == 3
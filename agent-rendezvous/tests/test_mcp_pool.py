@@ -0,0 +1,166 @@
+import asyncio
+import sys
+import time
+
+from mcp import StdioServerParameters
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, ErrorData
+
+from conftest import ROOT
+from mcp_pool import McpSessionPool, PooledSession, transport_failed
+
+
+def chatgpt_pool(env, session_concurrency=8, size=1, min_idle=0):
+    """A pool for the chatgpt provider, completing against the stub server."""
+    pool = McpSessionPool(size=size, min_idle=min_idle, start_timeout=60.0, call_timeout=30.0)
+    pool.register(
+        "chatgpt",
+        StdioServerParameters(
+            command=sys.executable,
+            args=[str(ROOT / "providers" / "agent_11" / "mcp_server.py")],
+            env=env,
+        ),
+        session_concurrency=session_concurrency,
+    )
+    return pool
+
+
+async def complete(pool, text):
+    async with pool.session("chatgpt") as session:
+        result = await session.call_tool("chat_complete", {"text": text})
+    assert not result.isError
+    return result.content[0].text
+
+
+def test_concurrent_calls_share_one_session(llm_env, llm_stub):
+    pool = chatgpt_pool(llm_env)
+
+    async def run():
+        # Spawn the session before timing the calls
+        await complete(pool, "warm")
+        started = time.perf_counter()
+        texts = await asyncio.gather(*(complete(pool, f"q{i}") for i in range(8)))
+        elapsed = time.perf_counter() - started
+        stats = pool.stats()["chatgpt"]
+        await pool.close()
+        return texts, elapsed, stats
+
+    texts, elapsed, stats = asyncio.run(run())
+    assert texts == [f"openai:q{i}" for i in range(8)]
+    assert elapsed < 4 * llm_stub.delay
+    assert stats["spawned"] == 1
+    assert stats["crashed"] == 0
+    assert len(llm_stub.connections) <= 8
+
+
+def test_cancelled_call_leaves_shared_session_serving_the_others(llm_env, llm_stub):
+    pool = chatgpt_pool(llm_env)
+    restarts = []
+    pool.on_restart = restarts.append
+
+    async def run():
+        await complete(pool, "warm")
+        others = [asyncio.create_task(complete(pool, f"q{i}")) for i in range(4)]
+        loser = asyncio.create_task(complete(pool, "cancel me"))
+        await asyncio.sleep(llm_stub.delay / 4)
+        loser.cancel()
+        texts = await asyncio.gather(*others)
+        cancelled = loser.cancelled()
+        # A timed-out call is also just abandoned, not a crash
+        try:
+            await asyncio.wait_for(complete(pool, "too slow"), llm_stub.delay / 4)
+        except asyncio.TimeoutError:
+            timed_out = True
+        after = await complete(pool, "after")
+        stats = pool.stats()["chatgpt"]
+        await pool.close()
+        return texts, cancelled, timed_out, after, stats
+
+    texts, cancelled, timed_out, after, stats = asyncio.run(run())
+    assert cancelled and timed_out
+    assert texts == [f"openai:q{i}" for i in range(4)]
+    assert after == "openai:after"
+    assert stats["spawned"] == 1
+    assert stats["crashed"] == 0
+    assert stats["in_flight"] == 0
+    assert restarts == []
+
+
+def test_tool_error_does_not_retire_the_session(llm_env, llm_stub):
+    pool = chatgpt_pool(llm_env)
+
+    async def run():
+        async with pool.session("chatgpt") as session:
+            unknown = await session.call_tool("no_such_tool", {})
+        after = await complete(pool, "after")
+        stats = pool.stats()["chatgpt"]
+        await pool.close()
+        return unknown, after, stats
+
+    unknown, after, stats = asyncio.run(run())
+    assert unknown.isError
+    assert after == "openai:after"
+    assert stats["spawned"] == 1
+    assert stats["crashed"] == 0
+
+
+def test_checkout_during_ping_reuses_the_idle_session(llm_env, llm_stub):
+    llm_stub.delay = 0.0
+    pool = chatgpt_pool(llm_env, session_concurrency=1, size=2, min_idle=1)
+
+    async def run():
+        await pool.start()
+        ping = asyncio.create_task(pool._ping_idle())
+        await asyncio.sleep(0)
+        text = await complete(pool, "during ping")
+        await ping
+        stats = pool.stats()["chatgpt"]
+        await pool.close()
+        return text, stats
+
+    text, stats = asyncio.run(run())
+    assert text == "openai:during ping"
+    assert stats["spawned"] == 1
+    assert stats["idle"] == 1
+
+
+def test_close_also_closes_checked_out_sessions(llm_env, llm_stub):
+    pool = chatgpt_pool(llm_env)
+
+    async def run():
+        async with pool.session("chatgpt"):
+            (pooled,) = pool._providers["chatgpt"].leases
+            await pool.close()
+            closed = pooled._task.done()
+        return closed, pooled.alive
+
+    closed, alive = asyncio.run(run())
+    assert closed
+    assert not alive
+
+
+def test_only_transport_failures_count_as_crashes():
+    pooled = PooledSession("p", StdioServerParameters(command="true"), 1.0)
+    assert transport_failed(pooled, RuntimeError("no session"))
+
+    async def alive():
+        pooled._task = asyncio.create_task(asyncio.sleep(1))
+        pooled.session = object()
+        try:
+            return {
+                "cancelled": transport_failed(pooled, asyncio.CancelledError()),
+                "timeout": transport_failed(pooled, asyncio.TimeoutError()),
+                "tool": transport_failed(pooled, McpError(ErrorData(code=-32602, message="bad params"))),
+                "closed": transport_failed(pooled, McpError(ErrorData(code=CONNECTION_CLOSED, message="closed"))),
+                "pipe": transport_failed(pooled, BrokenPipeError()),
+            }
+        finally:
+            pooled._task.cancel()
+
+    assert asyncio.run(alive()) == {
+        "cancelled": False,
+        "timeout": False,
+        "tool": False,
+        "closed": True,
+        "pipe": True,
+    }
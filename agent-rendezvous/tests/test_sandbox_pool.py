@@ -0,0 +1,100 @@
+import asyncio
+
+from spoonos_client import SandboxPool, SpoonOSClient
+
+MANIFEST = {"name": "ics-builder", "resources": {"cpu": 1}}
+
+
+async def call(pool, client, manifest=MANIFEST):
+    async with pool.lease(manifest) as sandbox:
+        return (await client.call_json(sandbox, "execute", {}))["data"]["sandbox"]
+
+
+def run_pool(spoonos, scenario, **kwargs):
+    async def run():
+        client = SpoonOSClient(base_url=spoonos.url, api_key="test")
+        pool = SandboxPool(client, **kwargs)
+        try:
+            return await scenario(pool, client)
+        finally:
+            await pool.close()
+            await asyncio.sleep(0.05)
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_leases_reuse_warm_sandboxes(spoonos):
+    async def scenario(pool, client):
+        pool.register(MANIFEST)
+        await pool.start()
+        used = [await call(pool, client) for _ in range(5)]
+        return used, next(iter(pool.stats().values()))
+
+    used, stats = run_pool(spoonos, scenario, size=1)
+    assert used == ["sb0"] * 5
+    assert spoonos.spawned == ["sb0"]
+    assert stats["hits"] == 5 and stats["misses"] == 0
+
+
+def test_failed_call_evicts_the_sandbox_and_the_pool_refills(spoonos):
+    async def scenario(pool, client):
+        pool.register(MANIFEST)
+        await pool.start()
+        try:
+            async with pool.lease(MANIFEST) as sandbox:
+                raise RuntimeError(f"call on {sandbox} failed")
+        except RuntimeError:
+            pass
+        await asyncio.sleep(0.2)
+        return await call(pool, client), next(iter(pool.stats().values()))
+
+    used, stats = run_pool(spoonos, scenario, size=1)
+    assert spoonos.destroyed[0] == "sb0"
+    # The replacement was spawned in the background, so the next lease finds it warm
+    assert used == "sb1"
+    assert stats["evicted"] == 1
+    assert stats["misses"] == 0
+
+
+def test_sandbox_outliving_manifest_timeout_is_not_reused(spoonos):
+    manifest = {"name": "short-lived", "resources": {"timeout_ms": 50}}
+
+    async def scenario(pool, client):
+        first = await call(pool, client, manifest)
+        await asyncio.sleep(0.1)
+        return first, await call(pool, client, manifest)
+
+    first, second = run_pool(spoonos, scenario, size=1)
+    assert first != second
+    assert first in spoonos.destroyed
+
+
+def test_idle_sandboxes_expire_and_are_replaced_in_the_background(spoonos):
+    async def scenario(pool, client):
+        pool.register(MANIFEST)
+        await pool.start()
+        await asyncio.sleep(0.35)
+        return next(iter(pool.stats().values()))
+
+    stats = run_pool(spoonos, scenario, size=2, idle_seconds=0.1, refill_interval=0.05)
+    assert stats["evicted"] >= 2
+    assert stats["idle"] == 2
+    assert {"sb0", "sb1"} <= set(spoonos.destroyed)
+    assert len(spoonos.spawned) >= 4
+
+
+def test_burst_beyond_size_spawns_then_trims_back(spoonos):
+    async def scenario(pool, client):
+        pool.register(MANIFEST)
+        await pool.start()
+        used = await asyncio.gather(*(call(pool, client) for _ in range(3)))
+        await asyncio.sleep(0.05)
+        return used, next(iter(pool.stats().values())), list(spoonos.destroyed)
+
+    used, stats, destroyed = run_pool(spoonos, scenario, size=2)
+    assert sorted(used) == ["sb0", "sb1", "sb2"]
+    assert stats["misses"] == 1
+    assert stats["idle"] == 2
+    # The surplus sandbox is destroyed rather than kept warm
+    assert len(destroyed) == 1
@@ -0,0 +1,21 @@
+import tracing
+
+
+def test_event_is_an_instant_on_the_current_span():
+    with tracing.trace("orchestrate") as trace:
+        with tracing.span("bidding", count=2):
+            pass
+        tracing.event("winner_selected", agent="ics-builder", name="ics-builder")
+        with tracing.span("respond"):
+            pass
+    events = trace.events()
+    assert [e["event"] for e in events] == ["bidding", "winner_selected", "respond"]
+    assert events[1]["agent"] == "ics-builder"
+    assert events[1]["duration_ms"] == 0
+    # An event is not a span
+    assert trace.spans == 2
+    assert trace.to_dict()["root"]["events"][0]["name"] == "winner_selected"
+
+
+def test_event_outside_a_trace_does_nothing():
+    tracing.event("winner_selected", agent="x")